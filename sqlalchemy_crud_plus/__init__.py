@@ -1,4 +1,9 @@
+from .cache import CountCache as CountCache
+from .cache import IdentityCache as IdentityCache
+from .cache import ReadCoalescer as ReadCoalescer
+from .cache import ResultCache as ResultCache
 from .crud import CRUDPlus as CRUDPlus
+from .loading import LoadStrategyAdvisor as LoadStrategyAdvisor
 from .types import JoinConfig as JoinConfig
 
 __version__ = '1.13.2'
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Sequence
+
+from sqlalchemy import Column, ColumnElement, ColumnExpressionArgument, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from sqlalchemy_crud_plus.utils import is_sync_session
+
+
+@dataclass
+class BatchProgress:
+    """Progress of an operation processed in primary key batches."""
+
+    batches: int = 0
+    rows: int = 0
+    last_key: Any = None
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+
+ProgressCallback = Callable[[BatchProgress], Awaitable[None] | None]
+
+
+def key_in(key_columns: Sequence[Column], keys: Sequence[Any]) -> ColumnElement[bool]:
+    """
+    Build the filter matching a batch of primary keys.
+
+    :param key_columns: The primary key columns
+    :param keys: Primary key values, tuples for composite primary keys
+    :return:
+    """
+    if len(key_columns) > 1:
+        return tuple_(*key_columns).in_(keys)
+    return key_columns[0].in_(keys)
+
+
+async def _sleep(session: AsyncSession, seconds: float) -> None:
+    if is_sync_session(session):
+        # The calls of `SyncCRUDPlus` run without an event loop
+        time.sleep(seconds)
+    else:
+        await asyncio.sleep(seconds)
+
+
+async def run_in_batches(
+    session: AsyncSession,
+    key_columns: Sequence[Column],
+    filters: Sequence[ColumnExpressionArgument[bool]],
+    process: Callable[[list[Any]], Awaitable[int]],
+    batch_size: int,
+    batch_interval: float = 0,
+    on_progress: ProgressCallback | None = None,
+    resume_after: Any = None,
+) -> BatchProgress:
+    """
+    Walk the primary keys of the matching rows in keyset order and process them in batches.
+
+    Each batch selects the next keys, processes them and commits, so locks and undo data are
+    bounded by the batch size. Passing the `last_key` of a reported progress as `resume_after`
+    continues an interrupted run.
+
+    :param session: SQLAlchemy async session
+    :param key_columns: The primary key columns
+    :param filters: WHERE clauses selecting the rows
+    :param process: Coroutine function processing a batch of keys, returning the number of affected rows
+    :param batch_size: Maximum number of keys per batch
+    :param batch_interval: Seconds to sleep between batches
+    :param on_progress: Callback receiving the progress after each batch
+    :param resume_after: Only process keys greater than this key
+    :return:
+    """
+    if batch_size <= 0:
+        raise ValueError('batch_size must be greater than 0')
+
+    composite = len(key_columns) > 1
+    key = tuple_(*key_columns) if composite else key_columns[0]
+    progress = BatchProgress(last_key=resume_after)
+
+    while True:
+        stmt = select(*key_columns).where(*filters).order_by(*key_columns).limit(batch_size)
+        if progress.last_key is not None:
+            stmt = stmt.where(key > (tuple_(*progress.last_key) if composite else progress.last_key))
+        result = await session.execute(stmt)
+        keys = [tuple(row) if composite else row[0] for row in result]
+        if not keys:
+            await session.commit()
+            break
+
+        rows = await process(keys)
+        await session.commit()
+
+        progress.batches += 1
+        progress.rows += rows
+        progress.last_key = keys[-1]
+        if on_progress is not None:
+            callback_result = on_progress(progress)
+            if inspect.isawaitable(callback_result):
+                await callback_result
+
+        if len(keys) < batch_size:
+            break
+        if batch_interval:
+            await _sleep(session, batch_interval)
+
+    return progress
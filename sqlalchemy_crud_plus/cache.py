@@ -0,0 +1,907 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import copy
+import hashlib
+import inspect
+import json
+import sys
+import time
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from datetime import time as dt_time
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Mapping, Sequence, TypeVar, cast
+from uuid import UUID
+
+from sqlalchemy import ClauseElement, Table, event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction
+from sqlalchemy.sql.util import find_tables
+
+from sqlalchemy_crud_plus.errors import CacheBackendError
+from sqlalchemy_crud_plus.types import Model
+from sqlalchemy_crud_plus.utils import instance_to_row, is_sync_session, merge_rows
+
+T = TypeVar('T')
+
+_PENDING_INVALIDATIONS_KEY = '_sqlalchemy_crud_plus_pending_invalidations'
+
+# Sentinel of a cache lookup that found nothing, `None` is a valid cached value
+MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    """Counters collected by a cache instance."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    coalesced: int = 0
+    errors: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class _Flight:
+    """A loader task in flight and the number of callers awaiting it."""
+
+    __slots__ = ('task', 'waiters', 'abandoned')
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+        self.abandoned = False
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key, so only the first caller runs the loader.
+
+    The loader runs in a task of its own that every caller awaits, so a cancelled follower does not
+    cancel the others. The loader works on the first caller's session, which its request scope closes
+    or reuses once that caller is gone, so a cancelled first caller abandons the flight: the task is
+    cancelled and the callers still waiting run the call again with their own loaders. The task is
+    also cancelled once no caller awaits it anymore.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, _Flight] = {}
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    def _done(self, key: Hashable, flight: _Flight) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        if not flight.task.cancelled():
+            # Mark as retrieved, callers cancelled meanwhile never await the exception
+            flight.task.exception()
+
+    async def do(self, key: Hashable, loader: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run the loader, or wait for the result of an identical call that is already in flight.
+
+        :param key: The key identifying identical calls
+        :param loader: The coroutine function producing the result
+        :return:
+        """
+        while True:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._inflight[key] = _Flight(asyncio.ensure_future(loader()))
+                flight.task.add_done_callback(lambda _, flight=flight: self._done(key, flight))
+            else:
+                self.coalesced += 1
+
+            flight.waiters += 1
+            try:
+                # Unlike awaiting the task, waiting on it tells its cancellation apart from the caller's
+                await asyncio.wait([flight.task])
+            finally:
+                flight.waiters -= 1
+                if not flight.task.done() and (leader or not flight.waiters):
+                    flight.abandoned = True
+                    if self._inflight.get(key) is flight:
+                        del self._inflight[key]
+                    flight.task.cancel()
+
+            if not (flight.abandoned and flight.task.cancelled()):
+                return flight.task.result()
+
+    def forget(self, key: Hashable) -> None:
+        """
+        Detach the call in flight for a key, later calls run their own loader.
+
+        :param key: The key identifying identical calls
+        :return:
+        """
+        self._inflight.pop(key, None)
+
+
+class LRUStore:
+    """
+    In-process key-value store with TTL expiry, LRU eviction and tag-based invalidation.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = 60.0, clock: Callable[[], float] = time.monotonic):
+        if maxsize <= 0:
+            raise ValueError('maxsize must be greater than 0')
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = CacheStats()
+        self._data: OrderedDict[Hashable, tuple[float | None, Any, frozenset[str]]] = OrderedDict()
+        self._tags: dict[str, set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, MISSING, record=False) is not MISSING
+
+    def get(self, key: Hashable, default: Any = None, record: bool = True) -> Any:
+        """
+        Get a value, refreshing its LRU position.
+
+        :param key: The cache key
+        :param default: Returned when the key is missing or expired
+        :param record: If `True`, count the lookup in the hit/miss statistics
+        :return:
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            if record:
+                self.stats.misses += 1
+            return default
+
+        expires_at, value, _ = entry
+        if expires_at is not None and expires_at <= self.clock():
+            self._remove(key)
+            self.stats.expirations += 1
+            if record:
+                self.stats.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        if record:
+            self.stats.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[str] = (), ttl: float | None = None) -> None:
+        """
+        Store a value.
+
+        :param key: The cache key
+        :param value: The value to store
+        :param tags: Tags used to invalidate the entry, usually table names
+        :param ttl: Time to live in seconds, defaults to the store TTL
+        :return:
+        """
+        if key in self._data:
+            self._remove(key)
+
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = self.clock() + ttl if ttl is not None else None
+        tags = frozenset(tags)
+        self._data[key] = (expires_at, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+        while len(self._data) > self.maxsize:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self.stats.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        """
+        Delete a value.
+
+        :param key: The cache key
+        :return:
+        """
+        if key not in self._data:
+            return False
+        self._remove(key)
+        return True
+
+    def invalidate(self, tag: str) -> int:
+        """
+        Delete every value stored with the tag.
+
+        :param tag: The tag to invalidate
+        :return:
+        """
+        keys = self._tags.pop(tag, set())
+        for key in keys:
+            self._remove(key)
+        self.stats.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._tags.clear()
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, tags = self._data.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class CacheBackend(ABC):
+    """
+    Storage backend of serialized query results.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """
+        Get a stored value.
+
+        :param key: The cache key
+        :return:
+        """
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float | None = None, tags: Iterable[str] = ()) -> None:
+        """
+        Store a value.
+
+        :param key: The cache key
+        :param value: The serialized value
+        :param ttl: Time to live in seconds, `None` means no expiry
+        :param tags: Tags used to invalidate the value, usually table names
+        :return:
+        """
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """
+        Delete a stored value.
+
+        :param key: The cache key
+        :return:
+        """
+
+    @abstractmethod
+    async def invalidate(self, tag: str) -> None:
+        """
+        Delete every value stored with the tag.
+
+        :param tag: The tag to invalidate
+        :return:
+        """
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """
+        Delete every stored value.
+        """
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process backend with LRU size bounds.
+    """
+
+    def __init__(self, maxsize: int = 1024, clock: Callable[[], float] = time.monotonic):
+        self.store = LRUStore(maxsize=maxsize, ttl=None, clock=clock)
+
+    async def get(self, key: str) -> bytes | None:
+        return self.store.get(key, record=False)
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None, tags: Iterable[str] = ()) -> None:
+        self.store.set(key, value, tags=tags, ttl=ttl)
+
+    async def delete(self, key: str) -> None:
+        self.store.delete(key)
+
+    async def invalidate(self, tag: str) -> None:
+        self.store.invalidate(tag)
+
+    async def clear(self) -> None:
+        self.store.clear()
+
+
+class CountCache:
+    """
+    Cache for `CRUDPlus.count` results with TTL, LRU bounds and single-flight loading.
+
+    Entries are tagged with the tables the count statement reads from and are invalidated
+    by any write issued through a `CRUDPlus` instance using this cache.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.store = LRUStore(maxsize=maxsize, ttl=ttl, clock=clock)
+        self.single_flight = SingleFlight()
+
+    @property
+    def stats(self) -> CacheStats:
+        stats = self.store.stats
+        stats.coalesced = self.single_flight.coalesced
+        return stats
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    async def get_or_load(
+        self,
+        session: AsyncSession,
+        stmt: ClauseElement,
+        loader: Callable[[], Awaitable[int]],
+    ) -> int:
+        """
+        Get the cached count of a statement or load it.
+
+        :param session: SQLAlchemy async session
+        :param stmt: The count statement
+        :param loader: The coroutine function executing the statement
+        :return:
+        """
+        key = statement_cache_key(stmt, session)
+        if key is None:
+            return await loader()
+
+        tables = get_statement_tables(stmt)
+        # The session sees its own uncommitted writes, which must not leak to other sessions
+        if has_pending_invalidation(session, self, tables):
+            return await loader()
+
+        value = self.store.get(key, MISSING)
+        if value is not MISSING:
+            return value
+
+        async def load() -> int:
+            result = await loader()
+            self.store.set(key, result, tags=tables)
+            return result
+
+        return await self.single_flight.do(key, load)
+
+    def invalidate(self, table: str) -> int:
+        """
+        Invalidate the counts that read from a table.
+
+        :param table: The table name
+        :return:
+        """
+        return self.store.invalidate(table)
+
+    def clear(self) -> None:
+        self.store.clear()
+
+
+_TAG = '__crud_plus__'
+
+_DECODERS: dict[str, Callable[[Any], Any]] = {
+    'datetime': datetime.fromisoformat,
+    'date': date.fromisoformat,
+    'time': dt_time.fromisoformat,
+    'timedelta': lambda value: timedelta(seconds=value),
+    'decimal': Decimal,
+    'uuid': UUID,
+    'bytes': base64.b64decode,
+}
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {_TAG: 'datetime', 'value': value.isoformat()}
+    if isinstance(value, date):
+        return {_TAG: 'date', 'value': value.isoformat()}
+    if isinstance(value, dt_time):
+        return {_TAG: 'time', 'value': value.isoformat()}
+    if isinstance(value, timedelta):
+        return {_TAG: 'timedelta', 'value': value.total_seconds()}
+    if isinstance(value, Decimal):
+        return {_TAG: 'decimal', 'value': str(value)}
+    if isinstance(value, UUID):
+        return {_TAG: 'uuid', 'value': str(value)}
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {_TAG: 'bytes', 'value': base64.b64encode(value).decode()}
+    raise TypeError(f'{type(value).__name__} values cannot be cached, pass the ResultCache dumps and loads')
+
+
+def _decode_object(obj: dict[str, Any]) -> Any:
+    if len(obj) == 2 and obj.get(_TAG) in _DECODERS and 'value' in obj:
+        return _DECODERS[obj[_TAG]](obj['value'])
+    return obj
+
+
+def dumps_rows(rows: Any) -> bytes:
+    """
+    Encode row data as JSON, tagging the date, time, decimal, UUID and binary values.
+
+    :param rows: The row data
+    :return:
+    """
+    return json.dumps(rows, default=_encode_value, separators=(',', ':')).encode()
+
+
+def loads_rows(data: bytes) -> Any:
+    """
+    Decode row data encoded by `dumps_rows`.
+
+    Only JSON values and the tagged types are ever built, so data read back from a shared
+    backend cannot run code, unlike pickle.
+
+    :param data: The encoded row data
+    :return:
+    """
+    return json.loads(data, object_hook=_decode_object)
+
+
+class ResultCache:
+    """
+    Second-level cache of entity query results with pluggable storage backends.
+
+    Results are stored as serialized column data, never as live ORM instances, and are
+    merged into the caller's session on hit. Entries are tagged with the tables the
+    statement reads from and are invalidated by writes through `CRUDPlus` instances
+    using this cache. Backend failures fall back to the database.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend | None = None,
+        ttl: float | None = 60.0,
+        dumps: Callable[[Any], bytes] = dumps_rows,
+        loads: Callable[[bytes], Any] = loads_rows,
+    ):
+        """
+        :param backend: The storage backend, defaults to an in-process `MemoryCacheBackend`
+        :param ttl: Time to live of entries in seconds, `None` means no expiry
+        :param dumps: Serializer of row data, defaults to the tagged JSON of `dumps_rows`
+        :param loads: Deserializer of row data, defaults to `loads_rows`
+        """
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.ttl = ttl
+        self.dumps = dumps
+        self.loads = loads
+        self.stats = CacheStats()
+        self._statements = LRUStore(maxsize=512, ttl=None)
+
+    def _describe(self, session: AsyncSession, stmt: ClauseElement) -> tuple[str, frozenset[str]] | None:
+        cache_key = stmt._generate_cache_key()
+        if cache_key is None:
+            return None
+
+        bind = session.get_bind()
+        described = self._statements.get((bind.dialect.name, cache_key.key), record=False)
+        if described is None:
+            # Compiled SQL is stable across processes, unlike the structural cache key
+            sql = str(stmt.compile(dialect=bind.dialect))
+            described = sql, get_statement_tables(stmt)
+            self._statements.set((bind.dialect.name, cache_key.key), described)
+
+        sql, tables = described
+        params = tuple(_freeze(bindparam.effective_value) for bindparam in cache_key.bindparams)
+        url = bind.engine.url.render_as_string(hide_password=True)
+        digest = hashlib.sha256(repr((url, sql, params)).encode()).hexdigest()
+        return digest, tables
+
+    async def get_or_load(
+        self,
+        session: AsyncSession,
+        stmt: ClauseElement,
+        model: type[Model],
+        loader: Callable[[], Awaitable[Sequence[Model]]],
+    ) -> list[Model]:
+        """
+        Get the cached entities of a statement or load them.
+
+        :param session: SQLAlchemy async session
+        :param stmt: The select statement of the model entities
+        :param model: The SQLAlchemy model class
+        :param loader: The coroutine function executing the statement
+        :return:
+        """
+        described = self._describe(session, stmt)
+        if described is None:
+            return list(await loader())
+
+        key, tables = described
+        if has_pending_invalidation(session, self, tables):
+            return list(await loader())
+
+        try:
+            data = await self.backend.get(key)
+        except (CacheBackendError, OSError):
+            self.stats.errors += 1
+            data = None
+
+        if data is not None:
+            self.stats.hits += 1
+            return await session.run_sync(merge_rows, model, self.loads(data))
+
+        self.stats.misses += 1
+        instances = list(await loader())
+        try:
+            data = self.dumps([instance_to_row(instance) for instance in instances])
+            await self.backend.set(key, data, ttl=self.ttl, tags=tables)
+        except (CacheBackendError, OSError, TypeError, ValueError):
+            self.stats.errors += 1
+        return instances
+
+    async def invalidate(self, table: str) -> None:
+        """
+        Invalidate the results that read from a table.
+
+        :param table: The table name
+        :return:
+        """
+        try:
+            await self.backend.invalidate(table)
+        except (CacheBackendError, OSError):
+            self.stats.errors += 1
+        else:
+            self.stats.invalidations += 1
+
+    async def clear(self) -> None:
+        await self.backend.clear()
+
+
+class ReadCoalescer:
+    """
+    Coalesce identical entity reads that are in flight at the same time.
+
+    The first caller executes the statement, concurrent callers with the same compiled
+    statement and parameters await its result as row data and merge it into their own
+    session. Writes through `CRUDPlus` detach the reads in flight on the written tables,
+    so callers arriving after a write never receive a result loaded before it.
+    """
+
+    def __init__(self) -> None:
+        self.single_flight = SingleFlight()
+        self._tags: dict[str, set[Hashable]] = {}
+
+    @property
+    def coalesced(self) -> int:
+        return self.single_flight.coalesced
+
+    def __len__(self) -> int:
+        return len(self.single_flight)
+
+    async def load(
+        self,
+        session: AsyncSession,
+        stmt: ClauseElement,
+        model: type[Model],
+        loader: Callable[[], Awaitable[Sequence[Model]]],
+    ) -> list[Model]:
+        """
+        Load the entities of a statement, or wait for an identical load in flight.
+
+        :param session: SQLAlchemy async session
+        :param stmt: The select statement of the model entities
+        :param model: The SQLAlchemy model class
+        :param loader: The coroutine function executing the statement
+        :return:
+        """
+        key = statement_cache_key(stmt, session)
+        if key is None:
+            return list(await loader())
+
+        tables = get_statement_tables(stmt)
+        if has_pending_invalidation(session, self, tables):
+            return list(await loader())
+
+        instances: list[Model] | None = None
+
+        async def load() -> list[dict[str, Any]]:
+            nonlocal instances
+            for table in tables:
+                self._tags.setdefault(table, set()).add(key)
+            try:
+                instances = list(await loader())
+            finally:
+                for table in tables:
+                    keys = self._tags.get(table)
+                    if keys is not None:
+                        keys.discard(key)
+                        if not keys:
+                            del self._tags[table]
+            return [instance_to_row(instance) for instance in instances]
+
+        rows = await self.single_flight.do(key, load)
+        if instances is not None:
+            return instances
+        return await session.run_sync(merge_rows, model, rows)
+
+    def invalidate(self, table: str) -> int:
+        """
+        Detach the reads in flight on a table.
+
+        :param table: The table name
+        :return:
+        """
+        keys = self._tags.pop(table, set())
+        for key in keys:
+            self.single_flight.forget(key)
+        return len(keys)
+
+
+_IMMUTABLE = (str, bytes, int, float, Decimal, UUID, date, dt_time, timedelta, type(None))
+
+
+def _copy_row(row: Mapping[str, Any]) -> dict[str, Any]:
+    return {key: value if isinstance(value, _IMMUTABLE) else copy.deepcopy(value) for key, value in row.items()}
+
+
+class IdentityCache:
+    """
+    Read-through cache of single rows looked up by primary key or by a declared unique column.
+
+    Values are immutable snapshots of the row data. Mutable column values, such as JSON or
+    array data, are copied in and out of the cache, so live instances never share them with
+    the snapshots. Misses are cached as well, with a shorter TTL, so repeated lookups of missing
+    keys do not reach the database.
+
+    Keys and tags include the table name, so the `CRUDPlus` instances of several models can
+    share one cache.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        ttl: float | None = 300.0,
+        negative_ttl: float | None = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param maxsize: Maximum number of cached keys
+        :param ttl: Time to live of found rows in seconds
+        :param negative_ttl: Time to live of misses in seconds, `0` disables negative caching
+        :param clock: Monotonic clock used for expiry
+        """
+        self.store = LRUStore(maxsize=maxsize, ttl=ttl, clock=clock)
+        self.negative_ttl = negative_ttl
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.store.stats
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    @staticmethod
+    def pk_tag(table: str, pk: Any) -> str:
+        """
+        Get the tag of every key cached for a primary key.
+
+        :param table: The table name
+        :param pk: The primary key value, a tuple for composite primary keys
+        :return:
+        """
+        return f'{table}:pk:{pk!r}'
+
+    @staticmethod
+    def negative_tag(table: str) -> str:
+        """
+        Get the tag of the misses cached for a table.
+
+        :param table: The table name
+        :return:
+        """
+        return f'{table}:negative'
+
+    def get(self, session: AsyncSession, key: Hashable) -> Mapping[str, Any] | None | object:
+        """
+        Get the snapshot cached for a key.
+
+        :param session: SQLAlchemy async session
+        :param key: The lookup key
+        :return: The snapshot, `None` for a cached miss, or `MISSING` if the key has to be loaded
+        """
+        if has_pending_invalidation(session, self):
+            return MISSING
+        snapshot = self.store.get(key, MISSING)
+        if isinstance(snapshot, Mapping) and any(not isinstance(v, _IMMUTABLE) for v in snapshot.values()):
+            return MappingProxyType(_copy_row(snapshot))
+        return snapshot
+
+    def set(
+        self,
+        session: AsyncSession,
+        key: Hashable,
+        row: dict[str, Any] | None,
+        pk: Any,
+        table: str,
+    ) -> None:
+        """
+        Cache the row found for a key.
+
+        :param session: SQLAlchemy async session
+        :param key: The lookup key, including the table name
+        :param row: The row data, `None` if no row was found
+        :param pk: The primary key of the row or of the lookup
+        :param table: The table name
+        :return:
+        """
+        # The session sees its own uncommitted writes, which must not leak to other sessions
+        if has_pending_invalidation(session, self):
+            return
+
+        tags = {table}
+        if pk is not None:
+            tags.add(self.pk_tag(table, pk))
+        if row is not None:
+            self.store.set(key, MappingProxyType(_copy_row(row)), tags=tags)
+        elif self.negative_ttl:
+            tags.add(self.negative_tag(table))
+            self.store.set(key, None, tags=tags, ttl=self.negative_ttl)
+
+    def invalidate(self, tag: str) -> int:
+        """
+        Invalidate the keys cached with a tag.
+
+        :param tag: The table name, a primary key tag or a negative tag
+        :return:
+        """
+        return self.store.invalidate(tag)
+
+    def clear(self) -> None:
+        self.store.clear()
+
+    def memory_usage(self) -> int:
+        """
+        Estimate the memory used by the cached snapshots in bytes.
+        """
+        total = 0
+        for key, (_, value, _) in self.store._data.items():
+            total += sys.getsizeof(key)
+            if value is not None:
+                total += sys.getsizeof(value) + sum(sys.getsizeof(v) for v in value.values())
+        return total
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def statement_cache_key(stmt: ClauseElement, session: AsyncSession | Session | None = None) -> Hashable | None:
+    """
+    Build a hashable key from the statement structure and its bound parameter values.
+
+    :param stmt: The SQLAlchemy statement
+    :param session: If provided, the key is scoped to the database the session is bound to
+    :return: `None` if the statement cannot be cached
+    """
+    cache_key = stmt._generate_cache_key()
+    if cache_key is None:
+        return None
+
+    params = tuple(_freeze(bindparam.effective_value) for bindparam in cache_key.bindparams)
+    if session is None:
+        return cache_key.key, params
+
+    return session.get_bind().engine.url, cache_key.key, params
+
+
+def get_statement_tables(stmt: ClauseElement) -> frozenset[str]:
+    """
+    Get the names of the tables a statement reads from, including joined and subquery tables.
+
+    :param stmt: The SQLAlchemy statement
+    :return:
+    """
+    tables = set(find_tables(stmt, include_aliases=True, include_selects=True))
+    get_final_froms = getattr(stmt, 'get_final_froms', None)
+    if get_final_froms is not None:
+        for from_clause in get_final_froms():
+            tables.update(find_tables(from_clause, include_aliases=True, include_joins=True))
+    names = set()
+    for table in tables:
+        if isinstance(table, Table):
+            names.add(table.fullname)
+    return frozenset(names)
+
+
+def _sync_session(session: AsyncSession | Session) -> Session:
+    # Also unwraps the session shim of `SyncCRUDPlus`
+    return cast(Session, getattr(session, 'sync_session', session))
+
+
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _complete(awaitable: Awaitable[Any]) -> None:
+    # In-process backends complete without suspending, so no event loop is needed
+    steps = awaitable.__await__()
+    try:
+        steps.send(None)
+    except StopIteration:
+        return
+    steps.close()
+    raise RuntimeError('Cache backends waiting on an event loop cannot be invalidated by sync sessions')
+
+
+def _invalidate_pending(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is not None:
+        return
+    pending = session.info.pop(_PENDING_INVALIDATIONS_KEY, None)
+    if pending:
+        for cache, tag in pending:
+            result = cache.invalidate(tag)
+            if not inspect.isawaitable(result):
+                continue
+            if is_sync_session(session):
+                # The sync sessions of `SyncCRUDPlus` run without an event loop
+                _complete(result)
+                continue
+            # Transaction events are synchronous, asynchronous backends are invalidated in the background
+            task = asyncio.ensure_future(result)
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+
+
+async def invalidate_on_write(session: AsyncSession | Session, cache: Any, tag: str) -> None:
+    """
+    Invalidate a cache tag now and again when the session transaction ends.
+
+    The second invalidation discards entries loaded by other sessions while the write was
+    not yet visible to them.
+
+    :param session: The session the write was issued on
+    :param cache: Any object with an `invalidate(tag)` method, which may be a coroutine function
+    :param tag: The tag to invalidate, usually the table name
+    :return:
+    """
+    result = cache.invalidate(tag)
+    if inspect.isawaitable(result):
+        await result
+    sync_session = _sync_session(session)
+    pending = sync_session.info.get(_PENDING_INVALIDATIONS_KEY)
+    if pending is None:
+        pending = sync_session.info[_PENDING_INVALIDATIONS_KEY] = set()
+        if not event.contains(sync_session, 'after_transaction_end', _invalidate_pending):
+            event.listen(sync_session, 'after_transaction_end', _invalidate_pending)
+    pending.add((cache, tag))
+
+
+def has_pending_invalidation(
+    session: AsyncSession | Session,
+    cache: Any,
+    tags: Iterable[str] | None = None,
+) -> bool:
+    """
+    Check whether the session has uncommitted writes affecting the tags of a cache.
+
+    :param session: SQLAlchemy session
+    :param cache: The cache instance
+    :param tags: The tags to check, `None` checks any tag of the cache
+    :return:
+    """
+    pending = _sync_session(session).info.get(_PENDING_INVALIDATIONS_KEY)
+    if not pending:
+        return False
+    if tags is None:
+        return any(pending_cache is cache for pending_cache, _ in pending)
+    return any((cache, tag) in pending for tag in tags)
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+
+from typing import Any, Awaitable, Callable, Mapping
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from sqlalchemy_crud_plus.errors import ConcurrentReadError
+from sqlalchemy_crud_plus.types import SessionSource
+from sqlalchemy_crud_plus.utils import as_sessionmaker
+
+ReadCall = Callable[[AsyncSession], Awaitable[Any]]
+
+
+async def gather_reads(
+    sessions: SessionSource,
+    reads: Mapping[str, ReadCall],
+    concurrency: int = 5,
+    timeout: float | None = None,
+) -> dict[str, Any]:
+    """
+    Execute independent reads concurrently, each on its own session from a session factory.
+
+    An `AsyncSession` cannot be used by concurrent tasks, so every read gets a short-lived session
+    of its own. Instances returned by the reads are detached when their session closes, so
+    relationships have to be loaded eagerly through `load_strategies` or `join_conditions`.
+
+    :param sessions: Engine or sessionmaker the read sessions are created from
+    :param reads: Coroutine functions running a read on a session, by result name,
+        e.g. `{'total': lambda s: crud.count(s)}`
+    :param concurrency: Maximum number of reads, and so pooled connections, in flight at the same time
+    :param timeout: Seconds each read has to complete, `None` disables the timeout
+    :return: The result of each read by name
+    """
+    if concurrency <= 0:
+        raise ValueError('concurrency must be greater than 0')
+
+    sessionmaker = as_sessionmaker(sessions)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(read: ReadCall) -> Any:
+        async with semaphore:
+            async with sessionmaker() as session:
+                return await asyncio.wait_for(read(session), timeout)
+
+    names = list(reads)
+    # Cancelling the caller cancels every read still running through gather
+    outcomes = await asyncio.gather(*[run(reads[name]) for name in names], return_exceptions=True)
+
+    results: dict[str, Any] = {}
+    errors: dict[str, BaseException] = {}
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, BaseException):
+            if not isinstance(outcome, Exception):
+                raise outcome
+            errors[name] = outcome
+        else:
+            results[name] = outcome
+
+    if errors:
+        summary = ', '.join(f'{name}: {error!r}' for name, error in errors.items())
+        raise ConcurrentReadError(f'{len(errors)} of {len(names)} reads failed: {summary}', errors, results)
+    return results
@@ -1,24 +1,55 @@
 from datetime import datetime, timezone
-from typing import Any, Generic, Sequence, cast
+from functools import partial
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Generic, Hashable, Mapping, Sequence, cast
 
+from pydantic import BaseModel
 from sqlalchemy import (
     Column,
+    ColumnElement,
     ColumnExpressionArgument,
     CursorResult,
+    Executable,
     Row,
+    RowMapping,
     Select,
+    Table,
+    UniqueConstraint,
+    and_,
+    bindparam,
+    case,
     delete,
+    distinct,
     func,
     insert,
     inspect,
     select,
+    tuple_,
     update,
 )
+from sqlalchemy.engine import Dialect
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from sqlalchemy_crud_plus.errors import CompositePrimaryKeysError, ModelColumnError, MultipleResultsError
+from sqlalchemy_crud_plus.batch import BatchProgress, ProgressCallback, key_in, run_in_batches
+from sqlalchemy_crud_plus.cache import (
+    MISSING,
+    CountCache,
+    IdentityCache,
+    ReadCoalescer,
+    ResultCache,
+    invalidate_on_write,
+)
+from sqlalchemy_crud_plus.errors import (
+    CompositePrimaryKeysError,
+    ModelColumnError,
+    MultipleResultsError,
+    StaleVersionError,
+)
+from sqlalchemy_crud_plus.loading import LoadStrategyAdvisor, default_load_advisor
 from sqlalchemy_crud_plus.types import (
+    AggregateMetrics,
     CreateSchema,
+    DiffStats,
     JoinConditions,
     LoadOptions,
     LoadStrategies,
@@ -30,17 +61,67 @@ from sqlalchemy_crud_plus.types import (
 from sqlalchemy_crud_plus.utils import (
     apply_join_conditions,
     apply_sorting,
+    build_aggregate_metrics,
     build_load_strategies,
+    build_schema_options,
+    compile_load_plan,
+    get_column,
     has_join_fill_result,
+    instance_to_row,
+    merge_rows,
     parse_filters,
+    parse_having,
 )
 
+if TYPE_CHECKING:
+    from sqlalchemy_crud_plus.write_behind import WriteBehindBuffer
+
 
 class CRUDPlus(Generic[Model]):
-    def __init__(self, model: type[Model]):
+    def __init__(
+        self,
+        model: type[Model],
+        count_cache: CountCache | None = None,
+        result_cache: ResultCache | None = None,
+        identity_cache: IdentityCache | None = None,
+        read_coalescer: ReadCoalescer | None = None,
+        version_column: str | None = None,
+        load_advisor: LoadStrategyAdvisor | None = None,
+        write_behind: 'WriteBehindBuffer | None' = None,
+    ):
+        """
+        :param model: The SQLAlchemy model class
+        :param count_cache: Optional cache for `count` results, invalidated by writes through this instance
+        :param result_cache: Optional cache for entity results of `select_model`, `select_models` and
+            `select_models_order`, invalidated by writes through this instance
+        :param identity_cache: Optional read-through cache for `select_model` primary key lookups and
+            `select_model_by_column` lookups on a unique column, invalidated by writes through this instance
+        :param read_coalescer: Optional coalescing of identical `select_model`, `select_models` and
+            `select_models_order` reads that are in flight at the same time
+        :param version_column: Integer column incremented by every update, used by `update_model` and
+            `bulk_update_models` for optimistic concurrency checks, defaults to the mapper's `version_id_col`
+        :param load_advisor: Advisor choosing the strategy of relationships loaded with the `auto` loading
+            strategy and observing their fan-out, defaults to `default_load_advisor`
+        :param write_behind: Optional buffer merging `update_model_deferred` updates of the same row and
+            writing them behind in bulk
+        """
         self.model = model
         self.model_column_names = [column.key for column in model.__table__.columns]
         self.primary_key = self._get_primary_key()
+        self.count_cache = count_cache
+        self.result_cache = result_cache
+        self.identity_cache = identity_cache
+        self.read_coalescer = read_coalescer
+        self.load_advisor = load_advisor or default_load_advisor
+        self.write_behind = write_behind
+        self.diff_stats = DiffStats()
+        self._cache_tag = cast(Table, model.__table__).fullname
+        self._unique_columns = self._get_unique_columns()
+        self.version_column = version_column or self._get_version_column()
+        if self.version_column is not None and self.version_column not in self.model_column_names:
+            raise ModelColumnError(f'Column {self.version_column} is not found in {self.model}')
+        if write_behind is not None:
+            write_behind.bind(self)
 
     def _get_primary_key(self) -> Column | list[Column]:
         """
@@ -53,6 +134,74 @@ class CRUDPlus(Generic[Model]):
         else:
             return list(primary_key)
 
+    def _get_unique_columns(self) -> set[str]:
+        """
+        Get the attribute names of the columns declared unique on their own.
+        """
+        mapper = inspect(self.model)
+        table = cast(Table, self.model.__table__)
+        columns = [column for column in table.columns if column.unique]
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint) and len(constraint.columns) == 1:
+                columns.extend(constraint.columns)
+        for index in table.indexes:
+            if index.unique and len(index.columns) == 1:
+                columns.extend(index.columns)
+        return {mapper.get_property_by_column(column).key for column in columns}
+
+    def _get_version_column(self) -> str | None:
+        """
+        Get the key of the version counter column configured on the mapper.
+        """
+        mapper = inspect(self.model)
+        if mapper.version_id_col is None:
+            return None
+        return mapper.get_property_by_column(mapper.version_id_col).key
+
+    def _apply_version(
+        self, data: dict[str, Any], expected_version: Any = None
+    ) -> tuple[dict[str, Any], list[ColumnExpressionArgument[bool]]]:
+        """
+        Increment the version column in the update data and build the expected version filter.
+
+        :param data: The update data, a version value in it is taken as the expected version
+        :param expected_version: The version the row is expected to have
+        :return:
+        """
+        if self.version_column is None:
+            return data, []
+
+        data = dict(data)
+        data_version = data.pop(self.version_column, None)
+        if expected_version is None:
+            expected_version = data_version
+
+        column = getattr(self.model, self.version_column)
+        data[self.version_column] = column + 1
+        return data, [] if expected_version is None else [column == expected_version]
+
+    def _diff_data(self, data: dict[str, Any], current: Any) -> dict[str, Any] | None:
+        """
+        Keep the update data that differs from the current state of the row.
+
+        :param data: The update data, a version value in it is kept as the expected version
+        :param current: A loaded instance or a snapshot dictionary of the row, values missing from it count as changed
+        :return: The changed data, `None` if nothing changed
+        """
+        state = current if isinstance(current, Mapping) else inspect(current).dict
+        changed = {
+            key: value
+            for key, value in data.items()
+            if key != self.version_column and (key not in state or state[key] != value)
+        }
+        self.diff_stats.compared += 1
+        if not changed:
+            self.diff_stats.skipped += 1
+            return None
+        if self.version_column in data:
+            changed[self.version_column] = data[self.version_column]
+        return changed
+
     def _get_pk_filter(self, pk: Any | list[Any]) -> list[ColumnExpressionArgument[bool]]:
         """
         Get the primary key filter(s).
@@ -67,6 +216,198 @@ class CRUDPlus(Generic[Model]):
         else:
             return [self.primary_key == pk]
 
+    async def _invalidate_caches(self, session: AsyncSession, identity_tags: Sequence[str] | None = None) -> None:
+        """
+        Invalidate cached reads of the model table after a write.
+
+        :param session: The session the write was issued on
+        :param identity_tags: Identity cache tags affected by the write, defaults to the whole table
+        :return:
+        """
+        if self.count_cache is not None:
+            await invalidate_on_write(session, self.count_cache, self._cache_tag)
+        if self.result_cache is not None:
+            await invalidate_on_write(session, self.result_cache, self._cache_tag)
+        if self.identity_cache is not None:
+            for tag in identity_tags or [self._cache_tag]:
+                await invalidate_on_write(session, self.identity_cache, tag)
+        if self.read_coalescer is not None:
+            await invalidate_on_write(session, self.read_coalescer, self._cache_tag)
+
+    def _get_identity_key(self, pk: Any | Sequence[Any]) -> Any:
+        return tuple(pk) if isinstance(self.primary_key, list) else pk
+
+    def _get_unique_lookup_key(
+        self,
+        whereclause: Sequence[ColumnExpressionArgument[bool]],
+        load_options: LoadOptions | None,
+        load_strategies: LoadStrategies | None,
+        join_conditions: JoinConditions | None,
+        kwargs: dict[str, Any],
+    ) -> tuple[str, str, str, Any] | None:
+        """
+        Get the identity cache key of a lookup by a single equality filter on a unique column.
+
+        :return: `None` if the lookup cannot be served from the identity cache
+        """
+        if whereclause or load_options or load_strategies or join_conditions or len(kwargs) != 1:
+            return None
+        ((key, value),) = kwargs.items()
+        column = key[:-4] if key.endswith('__eq') else key
+        if column not in self._unique_columns or value is None:
+            return None
+        try:
+            hash(value)
+        except TypeError:
+            return None
+        return self._cache_tag, 'unique', column, value
+
+    async def _select_identity(
+        self,
+        session: AsyncSession,
+        identity_cache: IdentityCache,
+        key: Hashable,
+        stmt: Select,
+        pk: Any = None,
+    ) -> Model | None:
+        """
+        Serve a single row lookup from the identity cache or load and cache it.
+
+        :param session: SQLAlchemy async session
+        :param identity_cache: The identity cache
+        :param key: The lookup key
+        :param stmt: The select statement loading the row
+        :param pk: The primary key of the lookup, if known
+        :return:
+        """
+        snapshot = identity_cache.get(session, key)
+        if snapshot is None:
+            return None
+        if snapshot is not MISSING:
+            instances = await session.run_sync(merge_rows, self.model, [dict(cast(Mapping[str, Any], snapshot))])
+            return instances[0]
+
+        query = await session.execute(stmt)
+        instance = query.scalars().first()
+        if instance is not None:
+            identity = inspect(instance).identity
+            pk = identity if isinstance(self.primary_key, list) else identity[0]
+        identity_cache.set(
+            session,
+            key,
+            instance_to_row(instance) if instance is not None else None,
+            pk,
+            self._cache_tag,
+        )
+        return instance
+
+    async def _select_entities(
+        self,
+        session: AsyncSession,
+        stmt: Select,
+        load_options: LoadOptions | None,
+        load_strategies: LoadStrategies | None,
+        join_conditions: JoinConditions | None,
+    ) -> list[Model] | None:
+        """
+        Serve an entity select through the result cache and the read coalescer.
+
+        Loader options and joined entities are not part of the shared row data.
+
+        :param session: SQLAlchemy async session
+        :param stmt: The select statement of the model entities
+        :param load_options: SQLAlchemy loading options
+        :param load_strategies: Relationship loading strategies
+        :param join_conditions: JOIN conditions for relationships
+        :return: `None` if the select has to be executed directly
+        """
+        if self.result_cache is None and self.read_coalescer is None:
+            return None
+        if load_options or load_strategies:
+            return None
+        if join_conditions and has_join_fill_result(join_conditions):
+            return None
+
+        loader = partial(self._execute_scalars, session, stmt)
+        if self.read_coalescer is not None:
+            loader = partial(self.read_coalescer.load, session, stmt, self.model, loader)
+        if self.result_cache is not None:
+            return await self.result_cache.get_or_load(session, stmt, self.model, loader)
+        return list(await loader())
+
+    def _get_schema_load_options(
+        self, load_options: LoadOptions | None, response_schema: type[BaseModel] | None
+    ) -> LoadOptions | None:
+        """
+        Add the loading options of a response schema to the loading options.
+
+        :param load_options: SQLAlchemy loading options
+        :param response_schema: Pydantic schema whose fields select the loaded columns and relationships
+        :return:
+        """
+        if response_schema is None:
+            return load_options
+        return [*(load_options or []), *build_schema_options(self.model, response_schema)]
+
+    def _observe_fanout(self, load_strategies: LoadStrategies | None, instances: Sequence[Any]) -> None:
+        """
+        Record the fan-out of the collections loaded with the `auto` loading strategy.
+
+        :param load_strategies: Relationship loading strategies
+        :param instances: The queried instances
+        :return:
+        """
+        if load_strategies:
+            keys = compile_load_plan(self.model, load_strategies).auto
+            if keys:
+                self.load_advisor.observe(self.model, keys, instances)
+
+    @staticmethod
+    async def _execute_scalars(session: AsyncSession, stmt: Select) -> Sequence[Any]:
+        query = await session.execute(stmt)
+        return query.scalars().all()
+
+    async def _execute_in_batches(
+        self,
+        session: AsyncSession,
+        filters: Sequence[ColumnExpressionArgument[bool]],
+        build_stmt: Callable[[ColumnElement[bool]], Executable],
+        batch_size: int,
+        batch_interval: float,
+        on_progress: ProgressCallback | None,
+        resume_after: Any,
+    ) -> int:
+        """
+        Execute a write on the rows matching the filters in primary key batches, committing each batch.
+
+        :param session: SQLAlchemy async session
+        :param filters: WHERE clauses selecting the rows
+        :param build_stmt: Function building the write statement restricted to a batch filter
+        :param batch_size: Maximum number of rows per batch
+        :param batch_interval: Seconds to sleep between batches
+        :param on_progress: Callback receiving the `BatchProgress` after each batch
+        :param resume_after: Only process rows with a primary key greater than this key
+        :return:
+        """
+        key_columns = self.primary_key if isinstance(self.primary_key, list) else [self.primary_key]
+
+        async def process(keys: list[Any]) -> int:
+            result = cast(CursorResult[Any], await session.execute(build_stmt(key_in(key_columns, keys))))
+            await self._invalidate_caches(session)
+            return result.rowcount
+
+        progress = await run_in_batches(
+            session,
+            key_columns,
+            filters,
+            process,
+            batch_size,
+            batch_interval=batch_interval,
+            on_progress=on_progress,
+            resume_after=resume_after,
+        )
+        return progress.rows
+
     async def create_model(
         self,
         session: AsyncSession,
@@ -91,6 +432,7 @@ class CRUDPlus(Generic[Model]):
 
         ins = self.model(**obj_data)
         session.add(ins)
+        await self._invalidate_caches(session, identity_tags=[IdentityCache.negative_tag(self._cache_tag)])
 
         if flush:
             await session.flush()
@@ -126,6 +468,7 @@ class CRUDPlus(Generic[Model]):
             ins_list.append(ins)
 
         session.add_all(ins_list)
+        await self._invalidate_caches(session, identity_tags=[IdentityCache.negative_tag(self._cache_tag)])
 
         if flush:
             await session.flush()
@@ -162,6 +505,7 @@ class CRUDPlus(Generic[Model]):
         if use_returning:
             stmt = stmt.returning(self.model)
         result = await session.execute(stmt, objs)
+        await self._invalidate_caches(session, identity_tags=[IdentityCache.negative_tag(self._cache_tag)])
 
         if flush:
             await session.flush()
@@ -192,9 +536,40 @@ class CRUDPlus(Generic[Model]):
         filters = list(whereclause)
 
         if kwargs:
+            if self.count_cache is not None:
+                # Normalize the filter order so equivalent calls share a cache entry
+                kwargs = dict(sorted(kwargs.items()))
             filters.extend(parse_filters(self.model, **kwargs))
 
-        if isinstance(self.primary_key, list):
+        stmt = self._count_stmt(filters, join_conditions)
+
+        if self.count_cache is not None:
+            return await self.count_cache.get_or_load(session, stmt, lambda: self._execute_count(session, stmt))
+
+        return await self._execute_count(session, stmt)
+
+    def _count_stmt(
+        self,
+        filters: Sequence[ColumnExpressionArgument[bool]],
+        join_conditions: JoinConditions | None = None,
+    ) -> Select:
+        """
+        Construct the count statement.
+
+        :param filters: WHERE clauses to apply to the query
+        :param join_conditions: JOIN conditions for relationships
+        :return:
+        """
+        if join_conditions:
+            # One-to-many joins repeat the model rows, so the distinct primary keys are counted
+            if isinstance(self.primary_key, list):
+                keys = select(*self.primary_key).distinct().select_from(self.model)
+                if filters:
+                    keys = keys.where(*filters)
+                keys = apply_join_conditions(self.model, keys, join_conditions)
+                return select(func.count()).select_from(keys.subquery())
+            stmt = select(func.count(distinct(self.primary_key))).select_from(self.model)
+        elif isinstance(self.primary_key, list):
             stmt = select(func.count()).select_from(self.model)
         else:
             stmt = select(func.count(self.primary_key)).select_from(self.model)
@@ -205,6 +580,10 @@ class CRUDPlus(Generic[Model]):
         if join_conditions:
             stmt = apply_join_conditions(self.model, stmt.select_from(self.model), join_conditions)
 
+        return stmt
+
+    @staticmethod
+    async def _execute_count(session: AsyncSession, stmt: Select) -> int:
         query = await session.execute(stmt)
         total_count = query.scalar()
         return total_count if total_count is not None else 0
@@ -238,6 +617,253 @@ class CRUDPlus(Generic[Model]):
         query = await session.execute(stmt)
         return query.scalars().first() is not None
 
+    def _count_many_stmt(
+        self,
+        dialect: Dialect,
+        whereclause: Sequence[ColumnExpressionArgument[bool]],
+        facets: Mapping[str, dict[str, Any] | ColumnExpressionArgument[bool]] | None,
+        group_by: str | list[str] | None,
+        join_conditions: JoinConditions | None,
+        kwargs: dict[str, Any],
+    ) -> tuple[Select, list[str], int]:
+        """
+        Construct the statement counting every facet in one scan.
+
+        :return: The statement, the facet names and the number of group columns
+        """
+        group_names = [group_by] if isinstance(group_by, str) else list(group_by or [])
+        if not facets and not group_names:
+            raise ValueError('At least one facet or group_by column is required')
+
+        # FILTER (WHERE ...) is supported by PostgreSQL and SQLite 3.30+, other dialects count a CASE expression
+        supports_filter = dialect.name == 'postgresql' or (
+            dialect.name == 'sqlite' and (dialect.server_version_info or (0,)) >= (3, 30)
+        )
+        conditions: list[ColumnExpressionArgument[bool] | None] = []
+        for facet in (facets or {}).values():
+            if isinstance(facet, dict):
+                conditions.append(and_(*parse_filters(self.model, **facet)) if facet else None)
+            else:
+                conditions.append(facet)
+        if not facets:
+            conditions.append(None)
+
+        filters = list(whereclause)
+        if kwargs:
+            filters.extend(parse_filters(self.model, **kwargs))
+        group_columns = [get_column(self.model, name) for name in group_names]
+
+        primary_key = self.primary_key
+        if join_conditions and isinstance(primary_key, list):
+            # One-to-many joins repeat the model rows, each row is reduced to whether it matches a facet
+            key_columns = [column.label(f'_pk_{i}') for i, column in enumerate(primary_key)]
+            group_labels = [column.label(f'_group_{i}') for i, column in enumerate(group_columns)]
+            flags = [
+                func.max(case((condition, 1), else_=0)).label(f'_facet_{i}')
+                for i, condition in enumerate(conditions)
+                if condition is not None
+            ]
+            rows = select(*key_columns, *group_labels, *flags).select_from(self.model)
+            if filters:
+                rows = rows.where(*filters)
+            rows = apply_join_conditions(self.model, rows, join_conditions)
+            rows = rows.group_by(*primary_key, *group_columns).subquery()
+
+            counts = [
+                func.count() if condition is None else func.count(case((rows.c[f'_facet_{i}'] == 1, 1)))
+                for i, condition in enumerate(conditions)
+            ]
+            groups = [rows.c[f'_group_{i}'] for i in range(len(group_columns))]
+            stmt = select(*groups, *counts)
+            if groups:
+                stmt = stmt.group_by(*groups)
+            return stmt, list(facets or {}), len(group_columns)
+
+        counts = []
+        for condition in conditions:
+            if join_conditions and not isinstance(primary_key, list):
+                # One-to-many joins repeat the model rows, so the distinct primary keys are counted
+                if condition is None:
+                    counts.append(func.count(distinct(primary_key)))
+                elif supports_filter:
+                    counts.append(func.count(distinct(primary_key)).filter(condition))
+                else:
+                    counts.append(func.count(distinct(case((condition, primary_key)))))
+            elif condition is None:
+                counts.append(func.count())
+            elif supports_filter:
+                counts.append(func.count().filter(condition))
+            else:
+                counts.append(func.count(case((condition, 1))))
+
+        stmt = select(*group_columns, *counts).select_from(self.model)
+        if filters:
+            stmt = stmt.where(*filters)
+
+        if join_conditions:
+            stmt = apply_join_conditions(self.model, stmt.select_from(self.model), join_conditions)
+
+        if group_columns:
+            stmt = stmt.group_by(*group_columns)
+
+        return stmt, list(facets or {}), len(group_columns)
+
+    async def count_many(
+        self,
+        session: AsyncSession,
+        *whereclause: ColumnExpressionArgument[bool],
+        facets: Mapping[str, dict[str, Any] | ColumnExpressionArgument[bool]] | None = None,
+        group_by: str | list[str] | None = None,
+        join_conditions: JoinConditions | None = None,
+        **kwargs: Any,
+    ) -> dict[Any, Any]:
+        """
+        Count the records matching several facet filters in a single statement over the base filters.
+
+        :param session: SQLAlchemy async session
+        :param whereclause: Additional WHERE clauses shared by every facet
+        :param facets: Facet filters by facet name, using field__operator=value syntax or a WHERE clause
+        :param group_by: Column name(s) whose value distribution is counted
+        :param join_conditions: JOIN conditions for relationships
+        :param kwargs: Filter expressions shared by every facet using field__operator=value syntax
+        :return: The count of each facet. With `group_by`, the counts per group value (a tuple for several
+            columns), which are the facet counts if facets are given
+        """
+        stmt, names, group_size = self._count_many_stmt(
+            session.get_bind().dialect, whereclause, facets, group_by, join_conditions, kwargs
+        )
+        query = await session.execute(stmt)
+
+        if not group_size:
+            row = query.one()
+            return {name: count or 0 for name, count in zip(names, row)}
+
+        distribution: dict[Any, Any] = {}
+        for row in query:
+            key = row[0] if group_size == 1 else tuple(row[:group_size])
+            counts = row[group_size:]
+            distribution[key] = {name: count or 0 for name, count in zip(names, counts)} if names else counts[0]
+        return distribution
+
+    def _aggregate_stmt(
+        self,
+        whereclause: Sequence[ColumnExpressionArgument[bool]],
+        metrics: AggregateMetrics,
+        group_by: str | list[str] | None,
+        having: dict[str, Any] | None,
+        sort_columns: SortColumns | None,
+        sort_orders: SortOrders,
+        join_conditions: JoinConditions | None,
+        limit: int | None,
+        kwargs: dict[str, Any],
+    ) -> Select:
+        """
+        Construct the aggregate statement.
+
+        :return:
+        """
+        group_names = [group_by] if isinstance(group_by, str) else list(group_by or [])
+        if not metrics and not group_names:
+            raise ValueError('At least one metric or group_by column is required')
+
+        group_columns = [get_column(self.model, name) for name in group_names]
+        expressions = build_aggregate_metrics(self.model, metrics)
+        labels = {name: expression.label(name) for name, expression in expressions.items()}
+        stmt = select(*group_columns, *labels.values()).select_from(self.model)
+
+        filters = list(whereclause)
+        if kwargs:
+            filters.extend(parse_filters(self.model, **kwargs))
+        if filters:
+            stmt = stmt.where(*filters)
+
+        if join_conditions:
+            stmt = apply_join_conditions(self.model, stmt.select_from(self.model), join_conditions)
+
+        if group_columns:
+            stmt = stmt.group_by(*group_columns)
+        if having:
+            stmt = stmt.having(*parse_having(expressions, **having))
+        if sort_columns:
+            stmt = apply_sorting(self.model, stmt, sort_columns, sort_orders, labels=labels)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        return stmt
+
+    async def aggregate(
+        self,
+        session: AsyncSession,
+        *whereclause: ColumnExpressionArgument[bool],
+        metrics: AggregateMetrics,
+        group_by: str | list[str] | None = None,
+        having: dict[str, Any] | None = None,
+        sort_columns: SortColumns | None = None,
+        sort_orders: SortOrders = None,
+        join_conditions: JoinConditions | None = None,
+        limit: int | None = None,
+        **kwargs: Any,
+    ) -> Sequence[RowMapping]:
+        """
+        Compute aggregate metrics in the database, optionally per group.
+
+        :param session: SQLAlchemy async session
+        :param whereclause: Additional WHERE clauses
+        :param metrics: Aggregate function and column name by metric name, e.g. `{'total': ('sum', 'amount')}`,
+            `('count', '*')` counts rows
+        :param group_by: Column name(s) to group by
+        :param having: Filter expressions on metrics using metric__operator=value syntax
+        :param sort_columns: Group column or metric names to sort by
+        :param sort_orders: Sort orders ('asc' or 'desc')
+        :param join_conditions: JOIN conditions for relationships
+        :param limit: Maximum number of groups to return
+        :param kwargs: Filter expressions using field__operator=value syntax
+        :return: One mapping of group columns and metrics per group
+        """
+        stmt = self._aggregate_stmt(
+            whereclause, metrics, group_by, having, sort_columns, sort_orders, join_conditions, limit, kwargs
+        )
+        query = await session.execute(stmt)
+        return query.mappings().all()
+
+    async def aggregate_stream(
+        self,
+        session: AsyncSession,
+        *whereclause: ColumnExpressionArgument[bool],
+        metrics: AggregateMetrics,
+        group_by: str | list[str] | None = None,
+        having: dict[str, Any] | None = None,
+        sort_columns: SortColumns | None = None,
+        sort_orders: SortOrders = None,
+        join_conditions: JoinConditions | None = None,
+        limit: int | None = None,
+        yield_per: int = 1000,
+        **kwargs: Any,
+    ) -> AsyncIterator[RowMapping]:
+        """
+        Compute aggregate metrics in the database and stream the groups, for results with many groups.
+
+        :param session: SQLAlchemy async session
+        :param whereclause: Additional WHERE clauses
+        :param metrics: Aggregate function and column name by metric name, e.g. `{'total': ('sum', 'amount')}`,
+            `('count', '*')` counts rows
+        :param group_by: Column name(s) to group by
+        :param having: Filter expressions on metrics using metric__operator=value syntax
+        :param sort_columns: Group column or metric names to sort by
+        :param sort_orders: Sort orders ('asc' or 'desc')
+        :param join_conditions: JOIN conditions for relationships
+        :param limit: Maximum number of groups to return
+        :param yield_per: Number of groups fetched from the server-side cursor at a time
+        :param kwargs: Filter expressions using field__operator=value syntax
+        :return:
+        """
+        stmt = self._aggregate_stmt(
+            whereclause, metrics, group_by, having, sort_columns, sort_orders, join_conditions, limit, kwargs
+        )
+        result = await session.stream(stmt.execution_options(yield_per=yield_per))
+        async for row in result.mappings():
+            yield row
+
     async def select_model(
         self,
         session: AsyncSession,
@@ -246,6 +872,7 @@ class CRUDPlus(Generic[Model]):
         load_options: LoadOptions | None = None,
         load_strategies: LoadStrategies | None = None,
         join_conditions: JoinConditions | None = None,
+        response_schema: type[BaseModel] | None = None,
         **kwargs: Any,
     ) -> Sequence[Row[tuple[Model, ...]] | None] | Model | None:
         """
@@ -257,9 +884,11 @@ class CRUDPlus(Generic[Model]):
         :param load_options: SQLAlchemy loading options
         :param load_strategies: Relationship loading strategies
         :param join_conditions: JOIN conditions for relationships
+        :param response_schema: Pydantic schema whose fields select the loaded columns and relationships
         :param kwargs: Filter expressions using field__operator=value syntax
         :return:
         """
+        load_options = self._get_schema_load_options(load_options, response_schema)
         filters = list(whereclause)
         filters.extend(self._get_pk_filter(pk))
 
@@ -275,17 +904,30 @@ class CRUDPlus(Generic[Model]):
             stmt = apply_join_conditions(self.model, stmt.select_from(self.model), join_conditions)
 
         if load_strategies:
-            rel_options = build_load_strategies(self.model, load_strategies)
+            rel_options = build_load_strategies(self.model, load_strategies, self.load_advisor)
             if rel_options:
                 stmt = stmt.options(*rel_options)
 
+        plain_lookup = not (whereclause or kwargs or load_options or load_strategies or join_conditions)
+        if self.identity_cache is not None and plain_lookup:
+            identity_pk = self._get_identity_key(pk)
+            return await self._select_identity(
+                session, self.identity_cache, (self._cache_tag, 'pk', identity_pk), stmt, identity_pk
+            )
+
+        instances = await self._select_entities(session, stmt, load_options, load_strategies, join_conditions)
+        if instances is not None:
+            return instances[0] if instances else None
+
         query = await session.execute(stmt)
 
         if join_conditions:
             if has_join_fill_result(join_conditions):
                 return query.first()
 
-        return query.scalars().first()
+        instance = query.scalars().first()
+        self._observe_fanout(load_strategies, [instance])
+        return instance
 
     async def select_model_by_column(
         self,
@@ -294,6 +936,7 @@ class CRUDPlus(Generic[Model]):
         load_options: LoadOptions | None = None,
         load_strategies: LoadStrategies | None = None,
         join_conditions: JoinConditions | None = None,
+        response_schema: type[BaseModel] | None = None,
         **kwargs: Any,
     ) -> Sequence[Row[tuple[Model, ...]] | None] | Model | None:
         """
@@ -304,9 +947,11 @@ class CRUDPlus(Generic[Model]):
         :param load_options: SQLAlchemy loading options
         :param load_strategies: Relationship loading strategies
         :param join_conditions: JOIN conditions for relationships
+        :param response_schema: Pydantic schema whose fields select the loaded columns and relationships
         :param kwargs: Filter expressions using field__operator=value syntax
         :return:
         """
+        load_options = self._get_schema_load_options(load_options, response_schema)
         stmt = await self.select(
             *whereclause,
             load_options=load_options,
@@ -315,6 +960,10 @@ class CRUDPlus(Generic[Model]):
             **kwargs,
         )
 
+        unique_key = self._get_unique_lookup_key(whereclause, load_options, load_strategies, join_conditions, kwargs)
+        if self.identity_cache is not None and unique_key is not None:
+            return await self._select_identity(session, self.identity_cache, unique_key, stmt)
+
         query = await session.execute(stmt)
 
         if join_conditions:
@@ -323,12 +972,36 @@ class CRUDPlus(Generic[Model]):
 
         return query.scalars().first()
 
+    async def select_snapshot(self, session: AsyncSession, pk: Any | Sequence[Any]) -> Mapping[str, Any] | None:
+        """
+        Query the row data of a primary key as an immutable snapshot, without attaching an instance to the session.
+
+        :param session: SQLAlchemy async session
+        :param pk: Primary key value(s) - single value or tuple for composite keys
+        :return:
+        """
+        identity_pk = self._get_identity_key(pk)
+        if self.identity_cache is not None:
+            snapshot = self.identity_cache.get(session, (self._cache_tag, 'pk', identity_pk))
+            if snapshot is not MISSING:
+                return cast(Mapping[str, Any] | None, snapshot)
+
+        columns = [attr.class_attribute.label(attr.key) for attr in inspect(self.model).column_attrs]
+        query = await session.execute(select(*columns).where(*self._get_pk_filter(pk)))
+        row = query.mappings().first()
+        data = dict(row) if row is not None else None
+
+        if self.identity_cache is not None:
+            self.identity_cache.set(session, (self._cache_tag, 'pk', identity_pk), data, identity_pk, self._cache_tag)
+        return MappingProxyType(data) if data is not None else None
+
     async def select(
         self,
         *whereclause: ColumnExpressionArgument[bool],
         load_options: LoadOptions | None = None,
         load_strategies: LoadStrategies | None = None,
         join_conditions: JoinConditions | None = None,
+        response_schema: type[BaseModel] | None = None,
         **kwargs,
     ) -> Select:
         """
@@ -338,9 +1011,11 @@ class CRUDPlus(Generic[Model]):
         :param load_options: SQLAlchemy loading options
         :param load_strategies: Relationship loading strategies
         :param join_conditions: JOIN conditions for relationships
+        :param response_schema: Pydantic schema whose fields select the loaded columns and relationships
         :param kwargs: Query expressions
         :return:
         """
+        load_options = self._get_schema_load_options(load_options, response_schema)
         filters = list(whereclause)
         filters.extend(parse_filters(self.model, **kwargs))
         stmt = select(self.model).where(*filters)
@@ -352,7 +1027,7 @@ class CRUDPlus(Generic[Model]):
             stmt = stmt.options(*load_options)
 
         if load_strategies:
-            rel_options = build_load_strategies(self.model, load_strategies)
+            rel_options = build_load_strategies(self.model, load_strategies, self.load_advisor)
             if rel_options:
                 stmt = stmt.options(*rel_options)
 
@@ -366,6 +1041,7 @@ class CRUDPlus(Generic[Model]):
         load_options: LoadOptions | None = None,
         load_strategies: LoadStrategies | None = None,
         join_conditions: JoinConditions | None = None,
+        response_schema: type[BaseModel] | None = None,
         **kwargs: Any,
     ) -> Select:
         """
@@ -377,9 +1053,11 @@ class CRUDPlus(Generic[Model]):
         :param load_options: SQLAlchemy loading options
         :param load_strategies: Relationship loading strategies
         :param join_conditions: JOIN conditions for relationships
+        :param response_schema: Pydantic schema whose fields select the loaded columns and relationships
         :param kwargs: Query expressions
         :return:
         """
+        load_options = self._get_schema_load_options(load_options, response_schema)
         stmt = await self.select(
             *whereclause,
             load_options=load_options,
@@ -390,6 +1068,73 @@ class CRUDPlus(Generic[Model]):
         sorted_stmt = apply_sorting(self.model, stmt, sort_columns, sort_orders)
         return sorted_stmt
 
+    async def _select_pk_first(
+        self,
+        session: AsyncSession,
+        sort_columns: SortColumns | None,
+        sort_orders: SortOrders,
+        whereclause: Sequence[ColumnExpressionArgument[bool]],
+        load_options: LoadOptions | None,
+        load_strategies: LoadStrategies | None,
+        join_conditions: JoinConditions | None,
+        limit: int | None,
+        offset: int | None,
+        kwargs: dict[str, Any],
+    ) -> list[Model]:
+        """
+        Select a page of entities in two phases: the primary keys of the page, then the entities of those keys.
+
+        The first phase only reads the filter, sort and key columns, so deep offsets scan a narrow index
+        and one-to-many joins cannot split or repeat entities. The second phase loads the full entities
+        and their eager relationships for exactly those keys, in page order.
+
+        :return:
+        """
+        if join_conditions and has_join_fill_result(join_conditions):
+            raise ValueError('pk_first cannot return joined entities with fill_result')
+
+        key_columns = self.primary_key if isinstance(self.primary_key, list) else [self.primary_key]
+        filters = list(whereclause)
+        if kwargs:
+            filters.extend(parse_filters(self.model, **kwargs))
+        stmt = select(*key_columns).select_from(self.model).where(*filters)
+
+        if join_conditions:
+            stmt = apply_join_conditions(self.model, stmt, join_conditions)
+            # DISTINCT needs the sort columns in the selection, they belong to the entity so keys stay unique
+            sort_names = sort_columns if isinstance(sort_columns, list) else [sort_columns] if sort_columns else []
+            sort_keys = [get_column(self.model, name) for name in sort_names]
+            stmt = stmt.add_columns(*[column for column in sort_keys if all(column is not key for key in key_columns)])
+            stmt = stmt.distinct()
+        if sort_columns:
+            stmt = apply_sorting(self.model, stmt, sort_columns, sort_orders)
+        # The primary key breaks ties so pages do not overlap
+        stmt = stmt.order_by(*key_columns)
+
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        if offset is not None:
+            stmt = stmt.offset(offset)
+
+        result = await session.execute(stmt)
+        keys = [tuple(row[: len(key_columns)]) for row in result]
+        if not keys:
+            return []
+
+        stmt = select(self.model).where(key_in(key_columns, [key if len(key) > 1 else key[0] for key in keys]))
+        if load_options:
+            stmt = stmt.options(*load_options)
+        if load_strategies:
+            rel_options = build_load_strategies(self.model, load_strategies, self.load_advisor)
+            if rel_options:
+                stmt = stmt.options(*rel_options)
+
+        query = await session.execute(stmt)
+        instances = {inspect(instance).identity: instance for instance in query.unique().scalars()}
+        page = [instances[key] for key in keys if key in instances]
+        self._observe_fanout(load_strategies, page)
+        return page
+
     async def select_models(
         self,
         session: AsyncSession,
@@ -397,8 +1142,10 @@ class CRUDPlus(Generic[Model]):
         load_options: LoadOptions | None = None,
         load_strategies: LoadStrategies | None = None,
         join_conditions: JoinConditions | None = None,
+        response_schema: type[BaseModel] | None = None,
         limit: int | None = None,
         offset: int | None = None,
+        pk_first: bool = False,
         **kwargs: Any,
     ) -> Sequence[Row[tuple[Model, ...] | Any] | Model]:
         """
@@ -409,11 +1156,19 @@ class CRUDPlus(Generic[Model]):
         :param load_options: SQLAlchemy loading options
         :param load_strategies: Relationship loading strategies
         :param join_conditions: JOIN conditions for relationships
+        :param response_schema: Pydantic schema whose fields select the loaded columns and relationships
         :param limit: Maximum number of results to return
         :param offset: Number of results to skip
+        :param pk_first: If `True`, select the primary keys of the page first and load the entities of those keys,
+            so joins and eager loads do not change the page
         :param kwargs: Filter expressions using field__operator=value syntax
         :return:
         """
+        load_options = self._get_schema_load_options(load_options, response_schema)
+        if pk_first:
+            return await self._select_pk_first(
+                session, None, None, whereclause, load_options, load_strategies, join_conditions, limit, offset, kwargs
+            )
         stmt = await self.select(
             *whereclause,
             load_options=load_options,
@@ -427,13 +1182,19 @@ class CRUDPlus(Generic[Model]):
         if offset is not None:
             stmt = stmt.offset(offset)
 
+        instances = await self._select_entities(session, stmt, load_options, load_strategies, join_conditions)
+        if instances is not None:
+            return instances
+
         query = await session.execute(stmt)
 
         if join_conditions:
             if has_join_fill_result(join_conditions):
                 return query.all()
 
-        return query.scalars().all()
+        instances = query.scalars().all()
+        self._observe_fanout(load_strategies, instances)
+        return instances
 
     async def select_models_order(
         self,
@@ -444,8 +1205,10 @@ class CRUDPlus(Generic[Model]):
         load_options: LoadOptions | None = None,
         load_strategies: LoadStrategies | None = None,
         join_conditions: JoinConditions | None = None,
+        response_schema: type[BaseModel] | None = None,
         limit: int | None = None,
         offset: int | None = None,
+        pk_first: bool = False,
         **kwargs: Any,
     ) -> Sequence[Row[tuple[Model, ...] | Any] | Model]:
         """
@@ -459,11 +1222,28 @@ class CRUDPlus(Generic[Model]):
         :param load_options: SQLAlchemy loading options
         :param load_strategies: Relationship loading strategies
         :param join_conditions: JOIN conditions for relationships
+        :param response_schema: Pydantic schema whose fields select the loaded columns and relationships
         :param limit: Maximum number of results to return
         :param offset: Number of results to skip
+        :param pk_first: If `True`, select the primary keys of the page first and load the entities of those keys,
+            so joins and eager loads do not change the page
         :param kwargs: Filter expressions using field__operator=value syntax
         :return:
         """
+        load_options = self._get_schema_load_options(load_options, response_schema)
+        if pk_first:
+            return await self._select_pk_first(
+                session,
+                sort_columns,
+                sort_orders,
+                whereclause,
+                load_options,
+                load_strategies,
+                join_conditions,
+                limit,
+                offset,
+                kwargs,
+            )
         stmt = await self.select_order(
             sort_columns,
             sort_orders,
@@ -479,13 +1259,69 @@ class CRUDPlus(Generic[Model]):
         if offset is not None:
             stmt = stmt.offset(offset)
 
+        instances = await self._select_entities(session, stmt, load_options, load_strategies, join_conditions)
+        if instances is not None:
+            return instances
+
         query = await session.execute(stmt)
 
         if join_conditions:
             if has_join_fill_result(join_conditions):
                 return query.all()
 
-        return query.scalars().all()
+        instances = query.scalars().all()
+        self._observe_fanout(load_strategies, instances)
+        return instances
+
+    async def select_rows(
+        self,
+        session: AsyncSession,
+        *whereclause: ColumnExpressionArgument[bool],
+        sort_columns: SortColumns | None = None,
+        sort_orders: SortOrders = None,
+        join_conditions: JoinConditions | None = None,
+        response_schema: type[BaseModel] | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+        **kwargs: Any,
+    ) -> list[dict[str, Any]]:
+        """
+        Query the column values of the matching rows as plain dictionaries, without building model instances.
+
+        Row data is cheap to materialize on the event loop, schema validation and JSON encoding of
+        large results can then run in a pool through a `RowSerializer`.
+
+        :param session: SQLAlchemy async session
+        :param whereclause: Additional WHERE clauses
+        :param sort_columns: Column names to sort by
+        :param sort_orders: Sort orders ('asc' or 'desc')
+        :param join_conditions: JOIN conditions for relationships
+        :param response_schema: Pydantic schema whose fields matching columns are selected, defaults to every column
+        :param limit: Maximum number of results to return
+        :param offset: Number of results to skip
+        :param kwargs: Filter expressions using field__operator=value syntax
+        :return:
+        """
+        if sort_columns is not None:
+            stmt = await self.select_order(
+                sort_columns, sort_orders, *whereclause, join_conditions=join_conditions, **kwargs
+            )
+        else:
+            stmt = await self.select(*whereclause, join_conditions=join_conditions, **kwargs)
+
+        attrs = inspect(self.model).column_attrs
+        keys = [attr.key for attr in attrs]
+        if response_schema is not None:
+            keys = [key for key in keys if key in response_schema.model_fields]
+        stmt = stmt.with_only_columns(*[attrs[key].class_attribute.label(key) for key in keys])
+
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        if offset is not None:
+            stmt = stmt.offset(offset)
+
+        query = await session.execute(stmt)
+        return [dict(row) for row in query.mappings()]
 
     async def update_model(
         self,
@@ -494,6 +1330,8 @@ class CRUDPlus(Generic[Model]):
         obj: UpdateSchema | dict[str, Any],
         flush: bool = False,
         commit: bool = False,
+        expected_version: Any = None,
+        current: Model | Mapping[str, Any] | None = None,
         **kwargs,
     ) -> int:
         """
@@ -504,14 +1342,31 @@ class CRUDPlus(Generic[Model]):
         :param obj: A pydantic schema or dictionary containing the update data
         :param flush: If `True`, flush all object changes to the database. Default is `False`.
         :param commit: If `True`, commits the transaction immediately. Default is `False`.
+        :param expected_version: Only update the row if its version column still has this value,
+            defaults to the version value in the update data. Returns `0` if the row was changed concurrently.
+        :param current: The loaded instance or a snapshot dictionary of the row. Only the columns whose new
+            value differs from it are written, and if none does, no statement is executed and `0` is returned
         :param kwargs: Additional model data not included in the pydantic schema.
         :return:
         """
         filters = self._get_pk_filter(pk)
         data = obj if isinstance(obj, dict) else obj.model_dump(exclude_unset=True)
         data.update(kwargs)
-        stmt = update(self.model).where(*filters).values(**data)
+        if current is not None:
+            changed = self._diff_data(data, current)
+            if changed is None:
+                return 0
+            data = changed
+        data, version_filters = self._apply_version(data, expected_version)
+        stmt = update(self.model).where(*filters, *version_filters).values(**data)
         result = cast(CursorResult[Any], await session.execute(stmt))
+        await self._invalidate_caches(
+            session,
+            identity_tags=[
+                IdentityCache.pk_tag(self._cache_tag, self._get_identity_key(pk)),
+                IdentityCache.negative_tag(self._cache_tag),
+            ],
+        )
 
         if flush:
             await session.flush()
@@ -520,6 +1375,146 @@ class CRUDPlus(Generic[Model]):
 
         return result.rowcount
 
+    async def update_model_deferred(
+        self, pk: Any | Sequence[Any], obj: UpdateSchema | dict[str, Any], **kwargs
+    ) -> None:
+        """
+        Buffer an update of an instance by model's primary key in the write-behind buffer.
+
+        Updates of the same row are merged and written in bulk by the buffer's background task,
+        values of its increment columns are added to the stored values.
+
+        :param pk: Single value for simple primary key, or tuple for composite primary key
+        :param obj: A pydantic schema or dictionary containing the update data
+        :param kwargs: Additional model data not included in the pydantic schema
+        :return:
+        """
+        if self.write_behind is None:
+            raise ValueError('Deferred updates require a write_behind buffer')
+        data = dict(obj) if isinstance(obj, dict) else obj.model_dump(exclude_unset=True)
+        data.update(kwargs)
+        self.write_behind.add(pk, data)
+
+    async def increment(
+        self,
+        session: AsyncSession,
+        pk: Any | Sequence[Any],
+        deltas: Mapping[str, Any],
+        returning: bool = False,
+        flush: bool = False,
+        commit: bool = False,
+    ) -> Any:
+        """
+        Atomically add deltas to columns of an instance by model's primary key.
+
+        :param session: The SQLAlchemy async session
+        :param pk: Single value for simple primary key, or tuple for composite primary key
+        :param deltas: The value added to each column, e.g. `{'views': 1, 'score': -2.5}`
+        :param returning: If `True`, return the new values of the incremented columns instead of the row count,
+            `None` if the row does not exist
+        :param flush: If `True`, flush all object changes to the database
+        :param commit: If `True`, commits the transaction immediately
+        :return:
+        """
+        result = await self.increment_many(session, {pk: deltas}, returning=returning, flush=flush, commit=commit)
+        if returning:
+            return result.get(self._get_identity_key(pk))
+        return result
+
+    async def increment_many(
+        self,
+        session: AsyncSession,
+        deltas: Mapping[Any, Mapping[str, Any]],
+        returning: bool = False,
+        batch_size: int = 500,
+        flush: bool = False,
+        commit: bool = False,
+    ) -> Any:
+        """
+        Atomically add deltas to columns of many instances by model's primary key.
+
+        Each batch of rows is updated by one statement, `SET column = column + CASE pk WHEN ... END`,
+        so concurrent increments of the same rows never lose an update.
+
+        :param session: The SQLAlchemy async session
+        :param deltas: The column deltas of each row by primary key, tuples for composite primary keys
+        :param returning: If `True`, return the new values of the incremented columns of each updated row
+            by primary key instead of the row count
+        :param batch_size: Maximum number of rows per statement
+        :param flush: If `True`, flush all object changes to the database
+        :param commit: If `True`, commits the transaction immediately
+        :return:
+        """
+        if batch_size <= 0:
+            raise ValueError('batch_size must be greater than 0')
+        columns = list(dict.fromkeys(column for row in deltas.values() for column in row))
+        for column in columns:
+            if column not in self.model_column_names:
+                raise ModelColumnError(f'Column {column} is not found in {self.model}')
+
+        keys = [self._get_identity_key(pk) for pk in deltas]
+        rows = {key: deltas[pk] for key, pk in zip(keys, deltas)}
+        key_columns = self.primary_key if isinstance(self.primary_key, list) else [self.primary_key]
+        dialect = session.get_bind().dialect
+        total = 0
+        new_values: dict[Any, dict[str, Any]] = {}
+
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start : start + batch_size]
+            values, _ = self._apply_version(
+                {column: getattr(self.model, column) + self._increment_delta(batch, rows, column) for column in columns}
+            )
+            stmt = update(self.model).where(key_in(key_columns, batch)).values(values)
+            if returning and dialect.update_returning:
+                result = await session.execute(
+                    stmt.returning(*key_columns, *[getattr(self.model, column) for column in columns])
+                )
+                fetched = result.all()
+                total += len(fetched)
+            else:
+                result = cast(CursorResult[Any], await session.execute(stmt))
+                total += result.rowcount
+                fetched = []
+                if returning:
+                    # The updated rows stay locked until the transaction ends, so reading them back is safe
+                    query = select(*key_columns, *[getattr(self.model, column) for column in columns])
+                    fetched = (await session.execute(query.where(key_in(key_columns, batch)))).all()
+            for row in fetched:
+                key = tuple(row[: len(key_columns)]) if len(key_columns) > 1 else row[0]
+                new_values[key] = dict(zip(columns, row[len(key_columns) :]))
+
+        await self._invalidate_caches(
+            session,
+            identity_tags=[
+                *[IdentityCache.pk_tag(self._cache_tag, key) for key in keys],
+                IdentityCache.negative_tag(self._cache_tag),
+            ],
+        )
+
+        if flush:
+            await session.flush()
+        if commit:
+            await session.commit()
+
+        return new_values if returning else total
+
+    def _increment_delta(self, keys: list[Any], rows: Mapping[Any, Mapping[str, Any]], column: str) -> Any:
+        """
+        Build the delta of a column for a batch of rows, a CASE on the primary key if the deltas differ.
+
+        :param keys: The primary keys of the batch
+        :param rows: The column deltas of each row by primary key
+        :param column: The incremented column
+        :return:
+        """
+        values = [rows[key].get(column, 0) for key in keys]
+        if all(value == values[0] for value in values):
+            return values[0]
+        if isinstance(self.primary_key, list):
+            whens = [(and_(*self._get_pk_filter(key)), value) for key, value in zip(keys, values) if value != 0]
+            return case(*whens, else_=0)
+        return case({key: value for key, value in zip(keys, values) if value != 0}, value=self.primary_key, else_=0)
+
     async def update_model_by_column(
         self,
         session: AsyncSession,
@@ -527,6 +1522,10 @@ class CRUDPlus(Generic[Model]):
         allow_multiple: bool = False,
         flush: bool = False,
         commit: bool = False,
+        batch_size: int | None = None,
+        batch_interval: float = 0,
+        on_progress: ProgressCallback | None = None,
+        resume_after: Any = None,
         **kwargs,
     ) -> int:
         """
@@ -537,6 +1536,11 @@ class CRUDPlus(Generic[Model]):
         :param allow_multiple: If `True`, allows updating multiple records that match the filters
         :param flush: If `True`, flush all object changes to the database
         :param commit: If `True`, commits the transaction immediately
+        :param batch_size: If set, update the matching rows in primary key order in batches of this size,
+            committing each batch, requires `allow_multiple`
+        :param batch_interval: Seconds to sleep between batches
+        :param on_progress: Callback receiving the `BatchProgress` after each batch
+        :param resume_after: Only update rows with a primary key greater than this key, to resume a batched update
         :param kwargs: Filter expressions using field__operator=value syntax
         :return:
         """
@@ -545,14 +1549,31 @@ class CRUDPlus(Generic[Model]):
         if not filters:
             raise ValueError('At least one filter condition must be provided for update operation')
 
+        if batch_size is not None:
+            if not allow_multiple:
+                raise ValueError('Batched updates require allow_multiple=True')
+            data = obj if isinstance(obj, dict) else obj.model_dump(exclude_unset=True)
+            data, _ = self._apply_version(data)
+            return await self._execute_in_batches(
+                session,
+                filters,
+                lambda batch: update(self.model).where(batch, *filters).values(**data),
+                batch_size,
+                batch_interval,
+                on_progress,
+                resume_after,
+            )
+
         if not allow_multiple:
-            total_count = await self.count(session, *filters)
+            total_count = await self._execute_count(session, self._count_stmt(filters))
             if total_count > 1:
                 raise MultipleResultsError(f'Only one record is expected to be updated, found {total_count} records.')
 
         data = obj if isinstance(obj, dict) else obj.model_dump(exclude_unset=True)
+        data, _ = self._apply_version(data)
         stmt = update(self.model).where(*filters).values(**data)
         result = cast(CursorResult[Any], await session.execute(stmt))
+        await self._invalidate_caches(session)
 
         if flush:
             await session.flush()
@@ -568,6 +1589,7 @@ class CRUDPlus(Generic[Model]):
         pk_mode: bool = True,
         flush: bool = False,
         commit: bool = False,
+        current: Sequence[Model | Mapping[str, Any]] | None = None,
         **kwargs,
     ) -> int:
         """
@@ -575,12 +1597,26 @@ class CRUDPlus(Generic[Model]):
 
         :param session: The SQLAlchemy async session
         :param objs: To save a list of Pydantic schemas or dict for data
-        :param pk_mode: Primary key mode, when enabled, the data must contain the primary key data
+        :param pk_mode: Primary key mode, when enabled, the data must contain the primary key data.
+            With a version column, each row whose data has a version is only updated if its version
+            still has that value, and `StaleVersionError` lists the primary keys of the rows that were
+            changed concurrently. The other rows are already written in the open transaction when it is
+            raised, roll back to discard them
         :param flush: If `True`, flush all object changes to the database
         :param commit: If `True`, commits the transaction immediately
+        :param current: Loaded instances or snapshot dictionaries of the rows, requires `pk_mode`. Each row only
+            writes the columns whose new value differs from its current state, and unchanged rows are left out
         :param kwargs: Filter expressions using field__operator=value syntax
         :return:
         """
+        if current is not None:
+            if not pk_mode:
+                raise ValueError('Comparing against the current state requires pk_mode=True')
+            datas = [obj if isinstance(obj, dict) else obj.model_dump(exclude_unset=True) for obj in objs]
+            objs = self._diff_bulk_data(datas, current)
+            if not objs:
+                return 0
+
         if not pk_mode:
             filters = parse_filters(self.model, **kwargs)
 
@@ -589,12 +1625,19 @@ class CRUDPlus(Generic[Model]):
 
             datas = [obj if isinstance(obj, dict) else obj.model_dump(exclude_unset=True) for obj in objs]
             stmt = update(self.model).where(*filters)
+            if self.version_column is not None:
+                stmt = stmt.values({self.version_column: getattr(self.model, self.version_column) + 1})
             conn = await session.connection()
             await conn.execute(stmt, datas)
+        elif self.version_column is not None:
+            datas = [obj if isinstance(obj, dict) else obj.model_dump(exclude_unset=True) for obj in objs]
+            await self._bulk_update_versioned(session, datas)
         else:
             datas = [obj if isinstance(obj, dict) else obj.model_dump(exclude_unset=True) for obj in objs]
             await session.execute(update(self.model), datas)
 
+        await self._invalidate_caches(session)
+
         if flush:
             await session.flush()
         if commit:
@@ -602,6 +1645,187 @@ class CRUDPlus(Generic[Model]):
 
         return len(datas)
 
+    def _diff_bulk_data(
+        self, datas: list[dict[str, Any]], current: Sequence[Model | Mapping[str, Any]]
+    ) -> list[UpdateSchema | dict[str, Any]]:
+        """
+        Keep the changed data of each row, leaving out the rows without changes.
+
+        :param datas: The update data of each row, including the primary key
+        :param current: Loaded instances or snapshot dictionaries of the rows
+        :return:
+        """
+        key_names = [
+            column.key for column in (self.primary_key if isinstance(self.primary_key, list) else [self.primary_key])
+        ]
+        states: dict[tuple[Any, ...], Mapping[str, Any]] = {}
+        for row in current:
+            if isinstance(row, Mapping):
+                for name in key_names:
+                    if name not in row:
+                        raise ValueError(f'Primary key {name} is missing from the current row snapshot')
+                states[tuple(row[name] for name in key_names)] = row
+            else:
+                # The identity survives expiration, which empties the loaded state
+                state = inspect(row)
+                if state.identity is None:
+                    raise ValueError(
+                        f'Current instance {row!r} has no identity, only persistent instances are compared'
+                    )
+                states[state.identity] = state.dict
+
+        changed_datas: list[UpdateSchema | dict[str, Any]] = []
+        for data in datas:
+            for name in key_names:
+                if name not in data:
+                    raise ValueError(f'Primary key {name} is missing from the update data')
+            values = dict(data)
+            key = {name: values.pop(name) for name in key_names}
+            state = states.get(tuple(key.values()))
+            changed = values if state is None else self._diff_data(values, state)
+            if changed is not None:
+                changed_datas.append({**key, **changed})
+        return changed_datas
+
+    async def _bulk_update_versioned(self, session: AsyncSession, datas: list[dict[str, Any]]) -> None:
+        """
+        Update rows by primary key and increment their version column.
+
+        Rows without an expected version are updated with one executemany per set of columns.
+        Rows with one are updated one statement per row, whose rowcount identifies the rows that
+        lost the race, which an executemany cannot report.
+
+        :param session: The SQLAlchemy async session
+        :param datas: The update data of each row, including the primary key and optionally the expected version
+        :return:
+        """
+        mapper = inspect(self.model)
+        key_columns = self.primary_key if isinstance(self.primary_key, list) else [self.primary_key]
+        key_names = [column.key for column in key_columns]
+        version = mapper.column_attrs[cast(str, self.version_column)].columns[0]
+
+        groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+        checked = []
+        for data in datas:
+            if data.get(self.version_column) is not None:
+                checked.append(data)
+                continue
+            values = {key: value for key, value in data.items() if key not in key_names and key != self.version_column}
+            groups.setdefault(tuple(sorted(values)), []).append(
+                {
+                    **{f'_pk_{name}': data[name] for name in key_names},
+                    **{f'_set_{key}': value for key, value in values.items()},
+                }
+            )
+        for keys, params in groups.items():
+            values: dict[Any, Any] = {version: version + 1}
+            for key in keys:
+                get_column(self.model, key)
+                values[mapper.column_attrs[key].columns[0]] = bindparam(f'_set_{key}')
+            stmt = (
+                update(mapper.local_table)
+                .where(*[column == bindparam(f'_pk_{column.key}') for column in key_columns])
+                .values(values)
+            )
+            await session.execute(stmt, params)
+
+        conflicts = []
+        for data in checked:
+            values = dict(data)
+            pk = tuple(values.pop(name) for name in key_names)
+            if len(pk) == 1:
+                pk = pk[0]
+            values, version_filters = self._apply_version(values)
+            stmt = update(self.model).where(*self._get_pk_filter(pk), *version_filters).values(**values)
+            result = cast(CursorResult[Any], await session.execute(stmt))
+            if result.rowcount == 0:
+                conflicts.append(pk)
+
+        if conflicts:
+            await self._invalidate_caches(session)
+            raise StaleVersionError(
+                f'{len(checked) - len(conflicts)} of {len(checked)} version-checked records were written, '
+                f'the others were changed concurrently: {conflicts!r}',
+                conflicts,
+            )
+
+    async def claim_batch(
+        self,
+        session: AsyncSession,
+        n: int,
+        set_values: dict[str, Any],
+        *whereclause: ColumnExpressionArgument[bool],
+        sort_columns: SortColumns | None = None,
+        sort_orders: SortOrders = None,
+        flush: bool = False,
+        commit: bool = False,
+        **kwargs,
+    ) -> Sequence[Model]:
+        """
+        Atomically claim up to `n` matching rows by updating them, for using a table as a work queue.
+
+        Rows locked by concurrent claims are skipped with `FOR UPDATE SKIP LOCKED` where supported.
+        On dialects with `UPDATE ... RETURNING` (PostgreSQL, SQLite) the claim is a single statement,
+        other dialects select the locked keys first and update them in the same transaction.
+        The claimed entities are returned in no particular order.
+
+        :param session: The SQLAlchemy async session
+        :param n: Maximum number of rows to claim
+        :param set_values: The values marking the rows as claimed, they should no longer match the filters
+        :param whereclause: WHERE clauses selecting claimable rows
+        :param sort_columns: Column names to claim rows in order of, defaults to the primary key
+        :param sort_orders: Sort orders ('asc' or 'desc')
+        :param flush: If `True`, flush all object changes to the database
+        :param commit: If `True`, commits the transaction immediately
+        :param kwargs: Filter expressions using field__operator=value syntax
+        :return:
+        """
+        if n <= 0:
+            raise ValueError('n must be greater than 0')
+
+        filters = list(whereclause)
+        filters.extend(parse_filters(self.model, **kwargs))
+        key_columns = self.primary_key if isinstance(self.primary_key, list) else [self.primary_key]
+        key = tuple_(*key_columns) if len(key_columns) > 1 else key_columns[0]
+
+        candidates = select(*key_columns).where(*filters)
+        if sort_columns:
+            candidates = apply_sorting(self.model, candidates, sort_columns, sort_orders)
+        else:
+            candidates = candidates.order_by(*key_columns)
+        candidates = candidates.limit(n).with_for_update(skip_locked=True)
+
+        dialect = session.get_bind().dialect
+        data, _ = self._apply_version(set_values)
+        # MySQL supports neither UPDATE ... RETURNING nor LIMIT in an IN subquery
+        if getattr(dialect, 'update_returning', False) and dialect.name != 'mysql':
+            stmt = (
+                update(self.model)
+                .where(key.in_(candidates.scalar_subquery() if len(key_columns) == 1 else candidates))
+                .values(**data)
+                .returning(self.model)
+                .execution_options(populate_existing=True)
+            )
+            claimed = (await session.execute(stmt)).scalars().all()
+        else:
+            keys = [tuple(row) if len(key_columns) > 1 else row[0] for row in await session.execute(candidates)]
+            if keys:
+                await session.execute(update(self.model).where(key_in(key_columns, keys)).values(**data))
+                stmt = select(self.model).where(key_in(key_columns, keys)).execution_options(populate_existing=True)
+                claimed = (await session.execute(stmt)).scalars().all()
+            else:
+                claimed = []
+
+        if claimed:
+            await self._invalidate_caches(session)
+
+        if flush:
+            await session.flush()
+        if commit:
+            await session.commit()
+
+        return claimed
+
     async def delete_model(
         self,
         session: AsyncSession,
@@ -622,6 +1846,9 @@ class CRUDPlus(Generic[Model]):
 
         stmt = delete(self.model).where(*filters)
         result = cast(CursorResult[Any], await session.execute(stmt))
+        await self._invalidate_caches(
+            session, identity_tags=[IdentityCache.pk_tag(self._cache_tag, self._get_identity_key(pk))]
+        )
 
         if flush:
             await session.flush()
@@ -640,6 +1867,10 @@ class CRUDPlus(Generic[Model]):
         deleted_at_factory: datetime = datetime.now(timezone.utc),
         flush: bool = False,
         commit: bool = False,
+        batch_size: int | None = None,
+        batch_interval: float = 0,
+        on_progress: ProgressCallback | None = None,
+        resume_after: Any = None,
         **kwargs,
     ) -> int:
         """
@@ -653,6 +1884,11 @@ class CRUDPlus(Generic[Model]):
         :param deleted_at_factory: The delete time column datetime factory function
         :param flush: If `True`, flush all object changes to the database
         :param commit: If `True`, commits the transaction immediately
+        :param batch_size: If set, delete the matching rows in primary key order in batches of this size,
+            committing each batch, requires `allow_multiple`
+        :param batch_interval: Seconds to sleep between batches
+        :param on_progress: Callback receiving the `BatchProgress` after each batch
+        :param resume_after: Only delete rows with a primary key greater than this key, to resume a batched delete
         :param kwargs: Filter expressions using field__operator=value syntax
         :return:
         """
@@ -665,8 +1901,11 @@ class CRUDPlus(Generic[Model]):
         if not filters:
             raise ValueError('At least one filter condition must be provided for delete operation')
 
+        if batch_size is not None and not allow_multiple:
+            raise ValueError('Batched deletes require allow_multiple=True')
+
         if not allow_multiple:
-            total_count = await self.count(session, *filters)
+            total_count = await self._execute_count(session, self._count_stmt(filters))
             if total_count > 1:
                 raise MultipleResultsError(f'Only one record is expected to be deleted, found {total_count} records.')
 
@@ -675,6 +1914,21 @@ class CRUDPlus(Generic[Model]):
         if deleted_at_column in self.model_column_names:
             data[deleted_at_column] = deleted_at_factory
 
+        if batch_size is not None:
+            return await self._execute_in_batches(
+                session,
+                filters,
+                lambda batch: (
+                    update(self.model).where(batch, *filters).values(**data)
+                    if logical_deletion
+                    else delete(self.model).where(batch, *filters)
+                ),
+                batch_size,
+                batch_interval,
+                on_progress,
+                resume_after,
+            )
+
         stmt = (
             update(self.model).where(*filters).values(**data)
             if logical_deletion
@@ -682,6 +1936,7 @@ class CRUDPlus(Generic[Model]):
         )
 
         result = cast(CursorResult[Any], await session.execute(stmt))
+        await self._invalidate_caches(session)
 
         if flush:
             await session.flush()
@@ -689,3 +1944,66 @@ class CRUDPlus(Generic[Model]):
             await session.commit()
 
         return result.rowcount
+
+    async def purge_deleted(
+        self,
+        session: AsyncSession,
+        before: datetime,
+        archive: type[Model] | Table | None = None,
+        deleted_flag_column: str = 'is_deleted',
+        deleted_at_column: str = 'deleted_at',
+        batch_size: int = 1000,
+        batch_interval: float = 0,
+        on_progress: ProgressCallback | None = None,
+        resume_after: Any = None,
+    ) -> BatchProgress:
+        """
+        Hard-delete rows logically deleted before a cutoff, in primary key batches committed one at a time.
+
+        :param session: The SQLAlchemy async session
+        :param before: Purge rows whose delete time is earlier than this time
+        :param archive: Model or table the rows are copied to with `INSERT ... SELECT` before deletion,
+            columns are matched by name
+        :param deleted_flag_column: Column name for logical deletion flag
+        :param deleted_at_column: Column name for delete time
+        :param batch_size: Maximum number of rows per batch
+        :param batch_interval: Seconds to sleep between batches
+        :param on_progress: Callback receiving the `BatchProgress` after each batch
+        :param resume_after: Only purge rows with a primary key greater than this key, to resume a purge
+        :return:
+        """
+        table = cast(Table, self.model.__table__)
+        filters = [
+            get_column(self.model, deleted_flag_column).is_(True),
+            get_column(self.model, deleted_at_column) < before,
+        ]
+        key_columns = self.primary_key if isinstance(self.primary_key, list) else [self.primary_key]
+
+        archive_table = (
+            cast(Table, archive.__table__) if archive is not None and not isinstance(archive, Table) else archive
+        )
+        if archive_table is not None:
+            archive_columns = [column for column in table.columns if column.name in archive_table.c]
+            if not archive_columns:
+                raise ModelColumnError(f'Archive table {archive_table.fullname} has no columns of {table.fullname}')
+
+        async def process(keys: list[Any]) -> int:
+            batch = key_in(key_columns, keys)
+            if archive_table is not None:
+                source = select(*archive_columns).where(batch, *filters)
+                names = [column.name for column in archive_columns]
+                await session.execute(insert(archive_table).from_select(names, source))
+            result = cast(CursorResult[Any], await session.execute(delete(self.model).where(batch, *filters)))
+            await self._invalidate_caches(session)
+            return result.rowcount
+
+        return await run_in_batches(
+            session,
+            key_columns,
+            filters,
+            process,
+            batch_size,
+            batch_interval=batch_interval,
+            on_progress=on_progress,
+            resume_after=resume_after,
+        )
@@ -53,3 +53,50 @@ class JoinConditionError(SQLAlchemyCRUDPlusException):
 
     def __init__(self, msg: str) -> None:
         super().__init__(msg)
+
+
+class CacheBackendError(SQLAlchemyCRUDPlusException):
+    """Error raised when a cache backend operation fails."""
+
+    def __init__(self, msg: str) -> None:
+        super().__init__(msg)
+
+
+class ShardingError(SQLAlchemyCRUDPlusException):
+    """Error raised when a sharded operation cannot be routed."""
+
+    def __init__(self, msg: str) -> None:
+        super().__init__(msg)
+
+
+class ShardTimeoutError(ShardingError):
+    """Error raised when a shard does not respond in time."""
+
+    def __init__(self, msg: str) -> None:
+        super().__init__(msg)
+
+
+class PartialShardWriteError(ShardingError):
+    """Error raised when a write committed on some shards and failed on others."""
+
+    def __init__(self, msg: str, committed: dict | None = None, errors: dict | None = None) -> None:
+        super().__init__(msg)
+        self.committed = committed or {}
+        self.errors = errors or {}
+
+
+class StaleVersionError(SQLAlchemyCRUDPlusException):
+    """Error raised when version-checked updates lost the race to concurrent writers."""
+
+    def __init__(self, msg: str, conflicts: list | None = None) -> None:
+        super().__init__(msg)
+        self.conflicts = conflicts or []
+
+
+class ConcurrentReadError(SQLAlchemyCRUDPlusException):
+    """Error raised when reads executed concurrently failed."""
+
+    def __init__(self, msg: str, errors: dict | None = None, results: dict | None = None) -> None:
+        super().__init__(msg)
+        self.errors = errors or {}
+        self.results = results or {}
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, cast
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Mapper
+
+
+class LoadStrategyAdvisor:
+    """
+    Choose the loading strategy of relationships requested with the `auto` strategy.
+
+    Scalar relationships (many-to-one and one-to-one) are loaded with `joinedload`, which adds
+    at most one row per parent to the main query and saves a round trip. Collections are loaded
+    with `selectinload`, unless the average number of children per parent observed by `observe`
+    reaches `subquery_fanout`: each `selectinload` round trip binds a chunk of 500 parent keys and
+    returns chunk size times fan-out rows, while `subqueryload` fetches all children in one
+    statement joined to the parent query.
+    """
+
+    def __init__(self, subquery_fanout: float = 50.0, min_parents: int = 100):
+        """
+        :param subquery_fanout: Average children per parent from which collections use `subqueryload`
+        :param min_parents: Number of observed parents required before the fan-out is used
+        """
+        self.subquery_fanout = subquery_fanout
+        self.min_parents = min_parents
+        self._observed: dict[tuple[type, str], list[int]] = {}
+
+    def record(self, model: type, key: str, parents: int, children: int) -> None:
+        """
+        Record the number of children loaded for a number of parents.
+
+        :param model: The parent model class
+        :param key: The relationship attribute name
+        :param parents: The number of parents
+        :param children: The total number of children of the parents
+        :return:
+        """
+        totals = self._observed.setdefault((model, key), [0, 0])
+        totals[0] += parents
+        totals[1] += children
+
+    def fanout(self, model: type, key: str) -> float | None:
+        """
+        Get the average number of children per parent of a relationship.
+
+        :param model: The parent model class
+        :param key: The relationship attribute name
+        :return: `None` if fewer than `min_parents` parents were observed
+        """
+        parents, children = self._observed.get((model, key), (0, 0))
+        if parents == 0 or parents < self.min_parents:
+            return None
+        return children / parents
+
+    def choose(self, model: type, key: str) -> str:
+        """
+        Choose the loading strategy of a relationship.
+
+        :param model: The parent model class
+        :param key: The relationship attribute name
+        :return: The name of the loading strategy
+        """
+        prop = cast(Mapper, inspect(model)).relationships[key]
+        if not prop.uselist:
+            return 'joinedload'
+        fanout = self.fanout(model, key)
+        if fanout is not None and fanout >= self.subquery_fanout:
+            return 'subqueryload'
+        return 'selectinload'
+
+    def observe(self, model: type, keys: Iterable[str], instances: Iterable[Any]) -> None:
+        """
+        Record the fan-out of the loaded collections of queried instances.
+
+        :param model: The parent model class
+        :param keys: The relationship attribute names loaded with the `auto` strategy
+        :param instances: The queried instances
+        :return:
+        """
+        relationships = cast(Mapper, inspect(model)).relationships
+        collections = [key for key in keys if key in relationships and relationships[key].uselist]
+        if not collections:
+            return
+        instances = [instance for instance in instances if isinstance(instance, model)]
+        for key in collections:
+            loaded = [inspect(instance).dict[key] for instance in instances if key in inspect(instance).dict]
+            if loaded:
+                self.record(model, key, len(loaded), sum(len(children) for children in loaded))
+
+
+default_load_advisor = LoadStrategyAdvisor()
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import asyncio
+
+from typing import Any, Iterable
+
+from sqlalchemy_crud_plus.cache import CacheBackend
+from sqlalchemy_crud_plus.errors import CacheBackendError
+
+
+class _ErrorReply(str):
+    """Error reply of the server, the connection stays usable."""
+
+
+class RedisClient:
+    """
+    Minimal asyncio client speaking the Redis serialization protocol (RESP2).
+
+    Commands are sent over a single connection and serialized with a lock,
+    the connection is opened lazily and reopened after a failure.
+    """
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 6379,
+        db: int = 0,
+        password: str | None = None,
+        timeout: float | None = 5.0,
+    ):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock = asyncio.Lock()
+
+    async def execute(self, *args: Any) -> Any:
+        """
+        Execute a command and return the decoded reply.
+
+        :param args: The command name and its arguments
+        :return:
+        """
+        async with self._lock:
+            try:
+                reply = await asyncio.wait_for(self._execute(*args), self.timeout)
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+                await self._disconnect()
+                raise CacheBackendError(f'Redis command {args[0]} failed: {e!r}') from e
+            except BaseException:
+                # An interrupted command, cancelled ones included, may leave its reply unread,
+                # which the next command on the connection would read as its own
+                await self._disconnect()
+                raise
+        return self._check(reply)
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._disconnect()
+
+    async def _execute(self, *args: Any) -> Any:
+        if self._writer is None:
+            await self._connect()
+        return await self._command(*args)
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        if self.password is not None:
+            self._check(await self._command('AUTH', self.password))
+        if self.db:
+            self._check(await self._command('SELECT', self.db))
+
+    async def _disconnect(self) -> None:
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _check(reply: Any) -> Any:
+        if isinstance(reply, _ErrorReply):
+            raise CacheBackendError(f'Redis error: {reply}')
+        return reply
+
+    async def _command(self, *args: Any) -> Any:
+        assert self._reader is not None and self._writer is not None
+        self._writer.write(self._encode(args))
+        await self._writer.drain()
+        return await self._read_reply(self._reader)
+
+    @staticmethod
+    def _encode(args: tuple[Any, ...]) -> bytes:
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if isinstance(arg, bytes):
+                data = arg
+            elif isinstance(arg, str):
+                data = arg.encode()
+            else:
+                data = str(arg).encode()
+            parts.append(b'$%d\r\n%s\r\n' % (len(data), data))
+        return b''.join(parts)
+
+    async def _read_reply(self, reader: asyncio.StreamReader) -> Any:
+        line = await reader.readuntil(b'\r\n')
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b'+':
+            return payload.decode()
+        if prefix == b'-':
+            # Returned rather than raised, so the rest of the reply is still read
+            return _ErrorReply(payload.decode())
+        if prefix == b':':
+            return int(payload)
+        if prefix == b'$':
+            length = int(payload)
+            if length == -1:
+                return None
+            data = await reader.readexactly(length + 2)
+            return data[:-2]
+        if prefix == b'*':
+            length = int(payload)
+            if length == -1:
+                return None
+            return [await self._read_reply(reader) for _ in range(length)]
+        raise CacheBackendError(f'Unexpected Redis reply: {line!r}')
+
+
+# Store a value and add it to its tag sets atomically. A tag set has to outlive every value it references,
+# so its expiry is only extended, and it stays persistent while it references a value without expiry.
+# KEYS: the value key and the tag set keys, ARGV: the value and the TTL in milliseconds, empty for none
+_SET_SCRIPT = """
+if ARGV[2] == '' then
+  redis.call('SET', KEYS[1], ARGV[1])
+else
+  redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+end
+for i = 2, #KEYS do
+  local existed = redis.call('EXISTS', KEYS[i])
+  redis.call('SADD', KEYS[i], KEYS[1])
+  if ARGV[2] == '' then
+    redis.call('PERSIST', KEYS[i])
+  else
+    local ttl = redis.call('PTTL', KEYS[i])
+    if existed == 0 or (ttl >= 0 and ttl < tonumber(ARGV[2])) then
+      redis.call('PEXPIRE', KEYS[i], ARGV[2])
+    end
+  end
+end
+return 1
+"""
+
+# Delete a tag set and the values it references atomically. KEYS: the tag set key
+_INVALIDATE_SCRIPT = """
+local keys = redis.call('SMEMBERS', KEYS[1])
+for i = 1, #keys, 1000 do
+  redis.call('DEL', unpack(keys, i, math.min(i + 999, #keys)))
+end
+redis.call('DEL', KEYS[1])
+return #keys
+"""
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Backend storing values in Redis, tags are kept as Redis sets of keys.
+
+    Storing a value with its tags and invalidating a tag run as Lua scripts, so an invalidation
+    never interleaves with a write. The invalidation script deletes value keys that are not passed
+    as script keys, which standalone Redis allows but Redis Cluster does not. Size bounds are
+    enforced by the server `maxmemory` policy.
+    """
+
+    def __init__(self, client: RedisClient, prefix: str = 'sqlalchemy_crud_plus:'):
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return f'{self.prefix}{key}'
+
+    def _tag_key(self, tag: str) -> str:
+        return f'{self.prefix}tag:{tag}'
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.execute('GET', self._key(key))
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None, tags: Iterable[str] = ()) -> None:
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        px = '' if ttl is None else max(int(ttl * 1000), 1)
+        await self.client.execute('EVAL', _SET_SCRIPT, 1 + len(tag_keys), self._key(key), *tag_keys, value, px)
+
+    async def delete(self, key: str) -> None:
+        await self.client.execute('DEL', self._key(key))
+
+    async def invalidate(self, tag: str) -> None:
+        await self.client.execute('EVAL', _INVALIDATE_SCRIPT, 1, self._tag_key(tag))
+
+    async def clear(self) -> None:
+        cursor = b'0'
+        while True:
+            cursor, keys = await self.client.execute('SCAN', cursor, 'MATCH', f'{self.prefix}*', 'COUNT', 500)
+            if keys:
+                await self.client.execute('DEL', *keys)
+            if cursor in (b'0', '0'):
+                break
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import random
+import time
+
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Awaitable, Callable, Sequence, TypeVar
+
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from sqlalchemy_crud_plus.crud import CRUDPlus
+from sqlalchemy_crud_plus.types import Model, SessionSource
+from sqlalchemy_crud_plus.utils import as_sessionmaker
+
+T = TypeVar('T')
+
+
+@dataclass(eq=False)
+class Replica:
+    """A replica database and the statistics used by routing policies."""
+
+    name: str
+    sessionmaker: async_sessionmaker[AsyncSession]
+    outstanding: int = 0
+    latency: float | None = None
+    failures: int = 0
+    unavailable_until: float = 0.0
+
+    def record_latency(self, elapsed: float, smoothing: float = 0.2) -> None:
+        """
+        Update the exponentially weighted moving average of the read latency.
+
+        :param elapsed: The latency of the last read in seconds
+        :param smoothing: Weight of the last read
+        :return:
+        """
+        self.latency = elapsed if self.latency is None else (1 - smoothing) * self.latency + smoothing * elapsed
+
+
+class ReplicaPolicy(ABC):
+    """Policy choosing the replica a read is sent to."""
+
+    @abstractmethod
+    def choose(self, replicas: Sequence[Replica]) -> Replica:
+        """
+        Choose a replica.
+
+        :param replicas: The available replicas, never empty
+        :return:
+        """
+
+
+class RoundRobinPolicy(ReplicaPolicy):
+    """Send reads to each replica in turn."""
+
+    def __init__(self) -> None:
+        self._counter = itertools.count()
+
+    def choose(self, replicas: Sequence[Replica]) -> Replica:
+        return replicas[next(self._counter) % len(replicas)]
+
+
+class LeastOutstandingPolicy(ReplicaPolicy):
+    """Send reads to the replica with the fewest reads in flight."""
+
+    def choose(self, replicas: Sequence[Replica]) -> Replica:
+        return min(replicas, key=lambda replica: replica.outstanding)
+
+
+class LatencyWeightedPolicy(ReplicaPolicy):
+    """Send reads to replicas at random, weighted by the inverse of their average latency."""
+
+    def __init__(self, min_latency: float = 0.001, rng: random.Random | None = None):
+        """
+        :param min_latency: Lower bound of the latency used for weighting, in seconds
+        :param rng: Random number generator
+        """
+        self.min_latency = min_latency
+        self.rng = rng or random.Random()
+
+    def choose(self, replicas: Sequence[Replica]) -> Replica:
+        # Replicas without measurements get the weight of the fastest one so they are tried
+        weights = [1 / max(replica.latency or self.min_latency, self.min_latency) for replica in replicas]
+        return self.rng.choices(list(replicas), weights=weights)[0]
+
+
+class ReplicaRouter:
+    """
+    Route reads to replica databases and writes to the primary.
+
+    After a write, reads in the same context (task and the tasks it creates) go to the
+    primary for the read-your-writes window, so replication lag does not hide the write.
+    A replica that raises a connection-level error or exceeds the read timeout is skipped for a
+    cooldown period and the read fails over to the next replica, then to the primary. Other errors,
+    such as invalid statements, are raised without failing over.
+    """
+
+    def __init__(
+        self,
+        primary: SessionSource,
+        replicas: Sequence[SessionSource],
+        policy: ReplicaPolicy | None = None,
+        read_your_writes: float = 5.0,
+        cooldown: float = 30.0,
+        failover_errors: tuple[type[BaseException], ...] = (
+            OperationalError,
+            InterfaceError,
+            OSError,
+            asyncio.TimeoutError,
+        ),
+        clock: Callable[[], float] = time.monotonic,
+        timeout: float | None = None,
+    ):
+        """
+        :param primary: Engine or sessionmaker of the primary database
+        :param replicas: Engines or sessionmakers of the replica databases
+        :param policy: The replica selection policy, defaults to round-robin
+        :param read_your_writes: Seconds after a write during which reads in the same context go to the primary
+        :param cooldown: Seconds a failed replica is skipped
+        :param failover_errors: Errors that make a read fail over to another replica, database errors
+            invalidating the connection always do
+        :param clock: Monotonic clock
+        :param timeout: Seconds a replica read has to complete before it fails over, `None` disables the timeout
+        """
+        self.primary = as_sessionmaker(primary)
+        self.replicas = [
+            Replica(name=f'replica_{i}', sessionmaker=as_sessionmaker(replica)) for i, replica in enumerate(replicas)
+        ]
+        self.policy = policy or RoundRobinPolicy()
+        self.read_your_writes = read_your_writes
+        self.cooldown = cooldown
+        self.failover_errors = failover_errors
+        self.clock = clock
+        self.timeout = timeout
+        self._last_write: ContextVar[float | None] = ContextVar(f'last_write_{id(self)}', default=None)
+
+    @asynccontextmanager
+    async def session(self) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Open a session on the primary database.
+        """
+        async with self.primary() as session:
+            yield session
+
+    def record_write(self) -> None:
+        """
+        Open the read-your-writes window of the current context.
+        """
+        self._last_write.set(self.clock())
+
+    def reads_primary(self, session: AsyncSession) -> bool:
+        """
+        Check whether a read on a session has to be served by the primary.
+
+        :param session: The primary session of the caller
+        :return:
+        """
+        # An open transaction may hold uncommitted writes only the primary session can see
+        if session.in_transaction():
+            return True
+        last_write = self._last_write.get()
+        return last_write is not None and self.clock() - last_write < self.read_your_writes
+
+    def is_failover_error(self, error: BaseException) -> bool:
+        """
+        Check whether an error raised by a replica read makes it fail over.
+
+        :param error: The raised error
+        :return:
+        """
+        if isinstance(error, DBAPIError) and error.connection_invalidated:
+            return True
+        return isinstance(error, self.failover_errors)
+
+    def candidates(self) -> list[Replica]:
+        """
+        Get the available replicas in failover order, the policy's choice first.
+        """
+        now = self.clock()
+        available = [replica for replica in self.replicas if replica.unavailable_until <= now]
+        if not available:
+            return []
+        chosen = self.policy.choose(available)
+        return [chosen] + [replica for replica in available if replica is not chosen]
+
+    async def read(self, session: AsyncSession, reader: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        """
+        Run a read on a replica, or on the caller's session if it has to be served by the primary.
+
+        :param session: The primary session of the caller
+        :param reader: The coroutine function running the read on a session
+        :return:
+        """
+        if not self.reads_primary(session):
+            for replica in self.candidates():
+                replica.outstanding += 1
+                start = self.clock()
+                try:
+                    async with replica.sessionmaker() as replica_session:
+                        result = await asyncio.wait_for(reader(replica_session), self.timeout)
+                except Exception as e:
+                    if not self.is_failover_error(e):
+                        raise
+                    replica.failures += 1
+                    replica.unavailable_until = self.clock() + self.cooldown
+                    continue
+                finally:
+                    replica.outstanding -= 1
+                replica.record_latency(self.clock() - start)
+                return result
+
+        return await reader(session)
+
+
+class RoutingCRUDPlus(CRUDPlus[Model]):
+    """
+    `CRUDPlus` that sends `select*`, `count`, `count_many`, `exists` and `aggregate` to read replicas.
+
+    Methods take the caller's primary session like `CRUDPlus`. Reads routed to a replica
+    run on a short-lived replica session and return detached instances, so relationships
+    have to be loaded eagerly through `load_strategies` or `join_conditions`. The plain
+    dictionaries of `select_rows` are routed the same way.
+    """
+
+    def __init__(self, model: type[Model], router: ReplicaRouter, **kwargs: Any):
+        """
+        :param model: The SQLAlchemy model class
+        :param router: The replica router
+        :param kwargs: Cache options of `CRUDPlus`
+        """
+        super().__init__(model, **kwargs)
+        self.router = router
+
+    async def _invalidate_caches(self, session: AsyncSession, identity_tags: Sequence[str] | None = None) -> None:
+        # Every write goes through here, which makes it the place to open the read-your-writes window
+        self.router.record_write()
+        await super()._invalidate_caches(session, identity_tags)
+
+    async def count(self, session: AsyncSession, *args: Any, **kwargs: Any) -> int:
+        return await self.router.read(session, lambda s: super(RoutingCRUDPlus, self).count(s, *args, **kwargs))
+
+    async def count_many(self, session: AsyncSession, *args: Any, **kwargs: Any) -> dict[Any, Any]:
+        return await self.router.read(session, lambda s: super(RoutingCRUDPlus, self).count_many(s, *args, **kwargs))
+
+    async def exists(self, session: AsyncSession, *args: Any, **kwargs: Any) -> bool:
+        return await self.router.read(session, lambda s: super(RoutingCRUDPlus, self).exists(s, *args, **kwargs))
+
+    async def aggregate(self, session: AsyncSession, *args: Any, **kwargs: Any) -> Any:
+        return await self.router.read(session, lambda s: super(RoutingCRUDPlus, self).aggregate(s, *args, **kwargs))
+
+    async def select_model(self, session: AsyncSession, *args: Any, **kwargs: Any) -> Any:
+        return await self.router.read(session, lambda s: super(RoutingCRUDPlus, self).select_model(s, *args, **kwargs))
+
+    async def select_model_by_column(self, session: AsyncSession, *args: Any, **kwargs: Any) -> Any:
+        return await self.router.read(
+            session, lambda s: super(RoutingCRUDPlus, self).select_model_by_column(s, *args, **kwargs)
+        )
+
+    async def select_snapshot(self, session: AsyncSession, *args: Any, **kwargs: Any) -> Any:
+        return await self.router.read(
+            session, lambda s: super(RoutingCRUDPlus, self).select_snapshot(s, *args, **kwargs)
+        )
+
+    async def select_models(self, session: AsyncSession, *args: Any, **kwargs: Any) -> Any:
+        return await self.router.read(session, lambda s: super(RoutingCRUDPlus, self).select_models(s, *args, **kwargs))
+
+    async def select_models_order(self, session: AsyncSession, *args: Any, **kwargs: Any) -> Any:
+        return await self.router.read(
+            session, lambda s: super(RoutingCRUDPlus, self).select_models_order(s, *args, **kwargs)
+        )
+
+    async def select_rows(self, session: AsyncSession, *args: Any, **kwargs: Any) -> list[dict[str, Any]]:
+        return await self.router.read(session, lambda s: super(RoutingCRUDPlus, self).select_rows(s, *args, **kwargs))
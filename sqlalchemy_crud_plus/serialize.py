@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+
+from concurrent.futures import Executor
+from functools import lru_cache
+from types import GenericAlias
+from typing import Any, Callable, Generic, Mapping, Sequence, TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+
+Schema = TypeVar('Schema', bound=BaseModel)
+T = TypeVar('T')
+
+
+@lru_cache(maxsize=256)
+def _list_adapter(schema: type[BaseModel]) -> TypeAdapter:
+    # Built at runtime, the schema is not known to type checkers
+    items: Any = GenericAlias(list, (schema,))
+    return TypeAdapter(items)
+
+
+def _validate_chunk(schema: type[Schema], rows: Sequence[Mapping[str, Any]]) -> list[Schema]:
+    return _list_adapter(schema).validate_python(rows)
+
+
+def _json_chunk(schema: type[BaseModel], rows: Sequence[Mapping[str, Any]]) -> bytes:
+    adapter = _list_adapter(schema)
+    return adapter.dump_json(adapter.validate_python(rows))
+
+
+class RowSerializer(Generic[Schema]):
+    """
+    Validate row data into a response schema and encode it as JSON in a thread or process pool.
+
+    Rows are split into chunks that run in the executor, so the event loop keeps serving other
+    requests while a large result is serialized. With a process pool, the schema has to be importable
+    by the worker processes and the rows picklable, which the dictionaries of `select_rows` are.
+    """
+
+    def __init__(self, schema: type[Schema], executor: Executor | None = None, chunk_size: int = 1000):
+        """
+        :param schema: The Pydantic response schema
+        :param executor: Thread or process pool the chunks run in, defaults to the event loop's default executor
+        :param chunk_size: Number of rows per chunk
+        """
+        if chunk_size <= 0:
+            raise ValueError('chunk_size must be greater than 0')
+        self.schema = schema
+        self.executor = executor
+        self.chunk_size = chunk_size
+
+    async def _map(self, fn: Callable[[type[Schema], Sequence[Mapping[str, Any]]], T], rows: Sequence[Any]) -> list[T]:
+        loop = asyncio.get_running_loop()
+        rows = list(rows)
+        chunks = [rows[i : i + self.chunk_size] for i in range(0, len(rows), self.chunk_size)]
+        return list(await asyncio.gather(*[loop.run_in_executor(self.executor, fn, self.schema, c) for c in chunks]))
+
+    async def to_models(self, rows: Sequence[Mapping[str, Any]]) -> list[Schema]:
+        """
+        Validate rows into schema instances off the event loop.
+
+        :param rows: The row data
+        :return:
+        """
+        return [model for chunk in await self._map(_validate_chunk, rows) for model in chunk]
+
+    async def to_json(self, rows: Sequence[Mapping[str, Any]]) -> bytes:
+        """
+        Validate rows and encode them as a JSON array off the event loop.
+
+        :param rows: The row data
+        :return: The ready-to-send JSON bytes
+        """
+        chunks = await self._map(_json_chunk, rows)
+        # Every chunk is a JSON array, their items are joined into one
+        return b'[' + b','.join(chunk[1:-1] for chunk in chunks if chunk != b'[]') + b']'
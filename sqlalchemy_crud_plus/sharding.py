@@ -0,0 +1,386 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+
+from typing import Any, Awaitable, Callable, Generic, Hashable, Mapping, Sequence, TypeVar, cast
+
+from sqlalchemy import ColumnExpressionArgument
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from sqlalchemy_crud_plus.crud import CRUDPlus
+from sqlalchemy_crud_plus.errors import ModelColumnError, PartialShardWriteError, ShardingError, ShardTimeoutError
+from sqlalchemy_crud_plus.types import CreateSchema, Model, SessionSource, SortColumns, SortOrders, UpdateSchema
+from sqlalchemy_crud_plus.utils import as_sessionmaker, get_column
+
+T = TypeVar('T')
+
+
+class _Descending:
+    """Sort key wrapper inverting the order of the wrapped value."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __lt__(self, other: _Descending) -> bool:
+        return other.value < self.value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Descending) and self.value == other.value
+
+
+# Dialects sorting NULL values as larger than any other value, the others sort them as smaller
+_NULLS_LARGEST_DIALECTS = frozenset({'oracle', 'postgresql'})
+
+
+def _sort_key(
+    model: type[Model],
+    sort_columns: SortColumns,
+    sort_orders: SortOrders,
+    nulls_largest: bool = False,
+) -> Callable[[Any], tuple]:
+    """
+    Build the Python sort key equivalent to `apply_sorting`.
+
+    :param model: The SQLAlchemy model class
+    :param sort_columns: Column names to sort by
+    :param sort_orders: Sort orders ('asc' or 'desc')
+    :param nulls_largest: If `True`, NULL values sort last in ascending and first in descending order,
+        as on PostgreSQL and Oracle, otherwise the other way round, as on SQLite, MySQL and SQL Server
+    :return:
+    """
+    columns = sort_columns if isinstance(sort_columns, list) else [sort_columns]
+    if not sort_orders:
+        orders = ['asc'] * len(columns)
+    elif isinstance(sort_orders, list):
+        orders = sort_orders
+    else:
+        orders = [sort_orders] * len(columns)
+    keys = [(get_column(model, name).key, order == 'desc') for name, order in zip(columns, orders)]
+
+    def sort_key(instance: Any) -> tuple:
+        values = []
+        for key, descending in keys:
+            value = getattr(instance, key)
+            value = (value is None, value) if nulls_largest else (value is not None, value)
+            values.append(_Descending(value) if descending else value)
+        return tuple(values)
+
+    return sort_key
+
+
+class ShardedCRUDPlus(Generic[Model]):
+    """
+    CRUD operations on a model whose table is split across several databases by a shard key column.
+
+    Writes and reads that filter on the shard key column go to one shard. `select_models_order`,
+    `count` and `exists` without a shard key fan out to every shard concurrently and merge the
+    results. Every operation runs in its own session per shard and commits its writes; returned
+    instances are detached.
+    """
+
+    def __init__(
+        self,
+        model: type[Model],
+        shard_key: Callable[[Any], Hashable],
+        shards: Mapping[Hashable, SessionSource],
+        shard_column: str,
+        timeout: float | None = 10.0,
+    ):
+        """
+        :param model: The SQLAlchemy model class
+        :param shard_key: Function mapping a shard key column value to the shard it is stored on
+        :param shards: Engines or sessionmakers of the shards by shard name
+        :param shard_column: The shard key column
+        :param timeout: Seconds each shard has to answer a query, `None` disables the timeout
+        """
+        if not shards:
+            raise ShardingError('At least one shard is required')
+        if shard_column not in model.__table__.columns:
+            raise ModelColumnError(f'Column {shard_column} is not found in {model}')
+        self.model = model
+        self.crud = CRUDPlus(model)
+        self.shard_key = shard_key
+        self.shards: dict[Hashable, async_sessionmaker[AsyncSession]] = {
+            name: as_sessionmaker(source) for name, source in shards.items()
+        }
+        self.shard_column = shard_column
+        self.timeout = timeout
+
+    def shard_for(self, value: Any) -> Hashable:
+        """
+        Get the shard storing a shard key column value.
+
+        :param value: The shard key column value
+        :return:
+        """
+        shard = self.shard_key(value)
+        if shard not in self.shards:
+            raise ShardingError(f'Shard key {value!r} maps to unknown shard {shard!r}')
+        return shard
+
+    def _filter_shard(self, kwargs: Mapping[str, Any]) -> Hashable | None:
+        for name in (self.shard_column, f'{self.shard_column}__eq'):
+            if name in kwargs:
+                return self.shard_for(kwargs[name])
+        return None
+
+    def _require_shard(self, shard_key: Any, kwargs: Mapping[str, Any] | None = None) -> Hashable:
+        if shard_key is not None:
+            return self.shard_for(shard_key)
+        shard = self._filter_shard(kwargs or {})
+        if shard is None:
+            raise ShardingError(f'A `{self.shard_column}` value is required to route this operation')
+        return shard
+
+    async def _run(self, shard: Hashable, operation: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        async with self.shards[shard]() as session:
+            try:
+                return await asyncio.wait_for(operation(session), self.timeout)
+            except asyncio.TimeoutError:
+                raise ShardTimeoutError(f'Shard {shard!r} did not respond within {self.timeout} seconds') from None
+
+    async def _scatter(self, operation: Callable[[AsyncSession], Awaitable[T]]) -> list[T]:
+        tasks = [asyncio.ensure_future(self._run(shard, operation)) for shard in self.shards]
+        try:
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            # Do not leave the other shards running after the first failure
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def create_model(self, obj: CreateSchema, **kwargs) -> Model:
+        """
+        Create a new instance of a model on the shard of its shard key.
+
+        :param obj: The Pydantic schema containing data to be saved
+        :param kwargs: Additional model data not included in the pydantic schema
+        :return:
+        """
+        shard = self._require_shard(None, {**obj.model_dump(), **kwargs})
+        return await self._run(shard, lambda session: self.crud.create_model(session, obj, commit=True, **kwargs))
+
+    async def bulk_create_models(self, objs: list[dict[str, Any]], **kwargs) -> int:
+        """
+        Create new instances of a model, grouped by the shard of their shard key.
+
+        Each shard commits its group in its own transaction, there is no atomicity across shards.
+        If some shards fail after others committed, the committed groups stay and `PartialShardWriteError`
+        reports the committed row count and the error of each shard, so only the failed groups
+        have to be retried.
+
+        :param objs: The dict list containing data to be saved, each must contain the shard key
+        :param kwargs: Additional model data not included in the dict
+        :return: The number of created rows
+        """
+        groups: dict[Hashable, list[dict[str, Any]]] = {}
+        for obj in objs:
+            groups.setdefault(self._require_shard(None, {**obj, **kwargs}), []).append(obj)
+
+        results = await asyncio.gather(
+            *[
+                self._run(
+                    shard,
+                    lambda session, group=group: self.crud.bulk_create_models(session, group, commit=True, **kwargs),
+                )
+                for shard, group in groups.items()
+            ],
+            return_exceptions=True,
+        )
+        committed = {
+            shard: len(group)
+            for (shard, group), result in zip(groups.items(), results)
+            if not isinstance(result, BaseException)
+        }
+        errors = {shard: result for shard, result in zip(groups, results) if isinstance(result, BaseException)}
+        if errors and not committed:
+            raise next(iter(errors.values()))
+        if errors:
+            raise PartialShardWriteError(
+                f'Bulk create failed on shards {list(errors)!r}, committed on shards {list(committed)!r}',
+                committed=committed,
+                errors=errors,
+            ) from next(iter(errors.values()))
+        return len(objs)
+
+    async def select_model(
+        self,
+        pk: Any | Sequence[Any],
+        *whereclause: ColumnExpressionArgument[bool],
+        shard_key: Any = None,
+        **kwargs: Any,
+    ) -> Model | None:
+        """
+        Query by primary key on one shard, or on every shard if no shard key is given.
+
+        :param pk: Primary key value(s) - single value or tuple for composite keys
+        :param whereclause: Additional WHERE clauses
+        :param shard_key: The shard key column value of the row
+        :param kwargs: Filter expressions using field__operator=value syntax
+        :return:
+        """
+
+        async def operation(session: AsyncSession) -> Any:
+            return await self.crud.select_model(session, pk, *whereclause, **kwargs)
+
+        shard = self.shard_for(shard_key) if shard_key is not None else self._filter_shard(kwargs)
+        if shard is not None:
+            return await self._run(shard, operation)
+        return next((instance for instance in await self._scatter(operation) if instance is not None), None)
+
+    async def select_models_order(
+        self,
+        sort_columns: SortColumns,
+        sort_orders: SortOrders = None,
+        *whereclause: ColumnExpressionArgument[bool],
+        limit: int | None = None,
+        offset: int | None = None,
+        **kwargs: Any,
+    ) -> list[Model]:
+        """
+        Query sorted rows on the shard of the shard key filter, or merge the sorted rows of every shard.
+
+        :param sort_columns: Column names to sort by
+        :param sort_orders: Sort orders ('asc' or 'desc')
+        :param whereclause: Additional WHERE clauses
+        :param limit: Maximum number of results to return
+        :param offset: Number of results to skip
+        :param kwargs: Filter expressions using field__operator=value syntax
+        :return:
+        """
+        shard = self._filter_shard(kwargs)
+        if shard is not None:
+            instances = await self._run(
+                shard,
+                lambda session: self.crud.select_models_order(
+                    session, sort_columns, sort_orders, *whereclause, limit=limit, offset=offset, **kwargs
+                ),
+            )
+            return cast(list[Model], list(instances))
+
+        # Every shard may hold rows of the global page, so each returns its first offset + limit rows
+        shard_limit = None if limit is None else limit + (offset or 0)
+        dialects = set()
+
+        async def operation(session: AsyncSession) -> Sequence[Any]:
+            dialects.add(session.get_bind().dialect.name)
+            return await self.crud.select_models_order(
+                session, sort_columns, sort_orders, *whereclause, limit=shard_limit, **kwargs
+            )
+
+        results = await self._scatter(operation)
+        # The merge has to place NULL values where the shards' ORDER BY did
+        nulls_largest = {name in _NULLS_LARGEST_DIALECTS for name in dialects}
+        if len(nulls_largest) > 1:
+            raise ShardingError(f'Shards of dialects {sorted(dialects)} sort NULL values differently')
+        merged = heapq.merge(*results, key=_sort_key(self.model, sort_columns, sort_orders, nulls_largest.pop()))
+        stop = None if limit is None else (offset or 0) + limit
+        return list(itertools.islice(merged, offset or 0, stop))
+
+    async def count(self, *whereclause: ColumnExpressionArgument[bool], **kwargs: Any) -> int:
+        """
+        Count records on the shard of the shard key filter, or the sum over every shard.
+
+        :param whereclause: Additional WHERE clauses
+        :param kwargs: Filter expressions using field__operator=value syntax
+        :return:
+        """
+
+        async def operation(session: AsyncSession) -> int:
+            return await self.crud.count(session, *whereclause, **kwargs)
+
+        shard = self._filter_shard(kwargs)
+        if shard is not None:
+            return await self._run(shard, operation)
+        return sum(await self._scatter(operation))
+
+    async def exists(self, *whereclause: ColumnExpressionArgument[bool], **kwargs: Any) -> bool:
+        """
+        Check whether records exist on the shard of the shard key filter, or on any shard.
+
+        :param whereclause: Additional WHERE clauses
+        :param kwargs: Filter expressions using field__operator=value syntax
+        :return:
+        """
+
+        async def operation(session: AsyncSession) -> bool:
+            return await self.crud.exists(session, *whereclause, **kwargs)
+
+        shard = self._filter_shard(kwargs)
+        if shard is not None:
+            return await self._run(shard, operation)
+        return any(await self._scatter(operation))
+
+    async def update_model(
+        self,
+        pk: Any | Sequence[Any],
+        obj: UpdateSchema | dict[str, Any],
+        *,
+        shard_key: Any,
+        **kwargs,
+    ) -> int:
+        """
+        Update an instance by model's primary key on the shard of its shard key.
+
+        :param pk: Single value for simple primary key, or tuple for composite primary key
+        :param obj: A pydantic schema or dictionary containing the update data
+        :param shard_key: The shard key column value of the row
+        :param kwargs: Additional model data not included in the pydantic schema
+        :return:
+        """
+        shard = self._require_shard(shard_key)
+        return await self._run(shard, lambda session: self.crud.update_model(session, pk, obj, commit=True, **kwargs))
+
+    async def update_model_by_column(
+        self,
+        obj: UpdateSchema | dict[str, Any],
+        allow_multiple: bool = False,
+        **kwargs,
+    ) -> int:
+        """
+        Update records by model column filters, which must include the shard key column.
+
+        :param obj: A Pydantic schema or dictionary containing the update data
+        :param allow_multiple: If `True`, allows updating multiple records that match the filters
+        :param kwargs: Filter expressions using field__operator=value syntax
+        :return:
+        """
+        shard = self._require_shard(None, kwargs)
+        return await self._run(
+            shard,
+            lambda session: self.crud.update_model_by_column(
+                session, obj, allow_multiple=allow_multiple, commit=True, **kwargs
+            ),
+        )
+
+    async def delete_model(self, pk: Any | Sequence[Any], *, shard_key: Any) -> int:
+        """
+        Delete an instance by model's primary key on the shard of its shard key.
+
+        :param pk: Single value for simple primary key, or tuple for composite primary key
+        :param shard_key: The shard key column value of the row
+        :return:
+        """
+        shard = self._require_shard(shard_key)
+        return await self._run(shard, lambda session: self.crud.delete_model(session, pk, commit=True))
+
+    async def delete_model_by_column(self, allow_multiple: bool = False, **kwargs) -> int:
+        """
+        Delete records by model column filters, which must include the shard key column.
+
+        :param allow_multiple: If `True`, allows deleting multiple records that match the filters
+        :param kwargs: Filter expressions using field__operator=value syntax
+        :return:
+        """
+        shard = self._require_shard(None, kwargs)
+        return await self._run(
+            shard,
+            lambda session: self.crud.delete_model_by_column(
+                session, allow_multiple=allow_multiple, commit=True, **kwargs
+            ),
+        )
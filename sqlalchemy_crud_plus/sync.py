@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import inspect
+
+from functools import wraps
+from typing import Any, AsyncIterator, Callable, Coroutine, Generic, Iterator, TypeVar
+
+from sqlalchemy import Connection, Result
+from sqlalchemy.orm import Session
+
+from sqlalchemy_crud_plus.crud import CRUDPlus
+from sqlalchemy_crud_plus.types import Model
+from sqlalchemy_crud_plus.utils import mark_sync_session
+
+T = TypeVar('T')
+
+_SESSION_COROUTINES = frozenset(
+    {
+        'close',
+        'commit',
+        'delete',
+        'execute',
+        'flush',
+        'get',
+        'get_one',
+        'merge',
+        'refresh',
+        'rollback',
+        'scalar',
+        'scalars',
+    }
+)
+
+
+def _run(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine that awaits nothing but the sync session shim to completion, without an event loop.
+
+    :param coro: The coroutine
+    :return:
+    """
+    try:
+        coro.send(None)
+    except StopIteration as e:
+        return e.value
+    coro.close()
+    raise RuntimeError(
+        'The call suspended on an event loop, components such as read coalescers, write-behind buffers '
+        'and asynchronous cache backends are not supported by SyncCRUDPlus'
+    )
+
+
+async def _returning(value: T) -> T:
+    return value
+
+
+class _StreamShim:
+    """
+    Iterate a buffered sync result like an `AsyncResult`.
+    """
+
+    def __init__(self, result: Any):
+        self._result = result
+
+    def mappings(self) -> _StreamShim:
+        return _StreamShim(self._result.mappings())
+
+    def scalars(self, index: int = 0) -> _StreamShim:
+        return _StreamShim(self._result.scalars(index))
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        for row in self._result:
+            yield row
+
+
+class _ConnectionShim:
+    """
+    Expose a sync `Connection` with the awaitable `execute` of an `AsyncConnection`.
+    """
+
+    def __init__(self, conn: Connection):
+        self.sync_connection = conn
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.sync_connection, name)
+
+    async def execute(self, *args: Any, **kwargs: Any) -> Result:
+        return self.sync_connection.execute(*args, **kwargs)
+
+
+class _SessionShim:
+    """
+    Expose a sync `Session` with the awaitable methods of an `AsyncSession`.
+
+    Every awaitable completes immediately, so the `CRUDPlus` coroutines run to completion on
+    the calling thread. The session is marked as sync, so batch pauses and cache invalidations
+    never wait on an event loop, even when the calling thread runs one.
+    """
+
+    def __init__(self, session: Session):
+        mark_sync_session(session)
+        self.sync_session = session
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.sync_session, name)
+        if name in _SESSION_COROUTINES:
+            return lambda *args, **kwargs: _returning(attr(*args, **kwargs))
+        return attr
+
+    async def run_sync(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return fn(self.sync_session, *args, **kwargs)
+
+    async def connection(self, **kwargs: Any) -> _ConnectionShim:
+        return _ConnectionShim(self.sync_session.connection(**kwargs))
+
+    async def stream(self, *args: Any, **kwargs: Any) -> _StreamShim:
+        return _StreamShim(self.sync_session.execute(*args, **kwargs))
+
+
+def _shim_args(args: tuple[Any, ...], kwargs: dict[str, Any], takes_session: bool) -> tuple[Any, ...]:
+    if not takes_session:
+        return args
+    if 'session' in kwargs:
+        kwargs['session'] = _SessionShim(kwargs['session'])
+        return args
+    return (_SessionShim(args[0]), *args[1:])
+
+
+def _sync_method(name: str, method: Callable[..., Any]) -> Callable[..., Any]:
+    takes_session = 'session' in inspect.signature(method).parameters
+
+    @wraps(method)
+    def call(self: SyncCRUDPlus, *args: Any, **kwargs: Any) -> Any:
+        args = _shim_args(args, kwargs, takes_session)
+        return _run(getattr(self.crud, name)(*args, **kwargs))
+
+    return call
+
+
+def _sync_generator(name: str, method: Callable[..., Any]) -> Callable[..., Any]:
+    takes_session = 'session' in inspect.signature(method).parameters
+
+    @wraps(method)
+    def call(self: SyncCRUDPlus, *args: Any, **kwargs: Any) -> Iterator[Any]:
+        args = _shim_args(args, kwargs, takes_session)
+        iterator = getattr(self.crud, name)(*args, **kwargs)
+        try:
+            while True:
+                try:
+                    yield _run(iterator.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            _run(iterator.aclose())
+
+    return call
+
+
+class SyncCRUDPlus(Generic[Model]):
+    """
+    `CRUDPlus` for the sync `Session`, for thread and process pool workers using sync drivers.
+
+    The methods are generated from the `CRUDPlus` methods of the same name and run their coroutines
+    on the calling thread, so both share one implementation. They take a `Session` where `CRUDPlus`
+    takes an `AsyncSession`, async generators become generators, and the other attributes are those
+    of the wrapped `CRUDPlus` instance.
+
+    Components that wait on an event loop, read coalescers, write-behind buffers and asynchronous
+    cache backends, are not supported.
+    """
+
+    def __init__(self, model: type[Model], **kwargs: Any):
+        """
+        :param model: The SQLAlchemy model class
+        :param kwargs: The `CRUDPlus` options
+        """
+        if kwargs.get('read_coalescer') is not None or kwargs.get('write_behind') is not None:
+            raise ValueError('SyncCRUDPlus does not support read coalescers and write-behind buffers')
+        self.crud: CRUDPlus[Model] = CRUDPlus(model, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        if name == 'crud':
+            raise AttributeError(name)
+        return getattr(self.crud, name)
+
+
+for _name, _member in inspect.getmembers(CRUDPlus):
+    if _name.startswith('_') or _name == 'update_model_deferred':
+        continue
+    if inspect.iscoroutinefunction(_member):
+        setattr(SyncCRUDPlus, _name, _sync_method(_name, _member))
+    elif inspect.isasyncgenfunction(_member):
+        setattr(SyncCRUDPlus, _name, _sync_generator(_name, _member))
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from typing import Any, Literal, TypeVar
 
 from pydantic import BaseModel, ConfigDict, Field
-from sqlalchemy import Alias, Table
+from sqlalchemy import Alias, Select, Table
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.orm.util import AliasedClass
 from sqlalchemy.sql.base import ExecutableOption
@@ -12,8 +14,11 @@ Model = TypeVar('Model', bound=DeclarativeBase)
 CreateSchema = TypeVar('CreateSchema', bound=BaseModel)
 UpdateSchema = TypeVar('UpdateSchema', bound=BaseModel)
 
+SessionSource = AsyncEngine | async_sessionmaker[AsyncSession]
+
 # https://docs.sqlalchemy.org/en/20/orm/queryguide/relationships.html#relationship-loader-api
 RelationshipLoadingStrategyType = Literal[
+    'auto',
     'contains_eager',
     'defaultload',
     'immediateload',
@@ -38,7 +43,37 @@ ColumnLoadingStrategyType = Literal[
     'undefer_group',
 ]
 
-LoadStrategies = list[str] | dict[str, RelationshipLoadingStrategyType] | dict[str, ColumnLoadingStrategyType]
+
+@dataclass(frozen=True, eq=False)
+class LoadPlan:
+    """
+    Loading strategies validated against a model, with their loader options compiled once.
+
+    `auto` paths are resolved by the load advisor on each use, the options of the other paths are kept.
+    """
+
+    model: type[DeclarativeBase]
+    spec: tuple[tuple[str, str], ...]
+    auto: tuple[str, ...]
+    options: tuple[ExecutableOption, ...]
+
+
+LoadStrategies = (
+    list[str] | dict[str, RelationshipLoadingStrategyType] | dict[str, ColumnLoadingStrategyType] | LoadPlan
+)
+
+
+@dataclass
+class DiffStats:
+    """Counters of the updates compared against the current state of their rows."""
+
+    compared: int = 0
+    skipped: int = 0
+
+    @property
+    def skip_rate(self) -> float:
+        return self.skipped / self.compared if self.compared else 0.0
+
 
 JoinType = Literal[
     'inner',
@@ -58,9 +93,55 @@ class JoinConfig(BaseModel):
     fill_result: bool = Field(default=False, description='Whether to populate this model to the query result')
 
 
-JoinConditions = list[str | JoinConfig] | dict[str, JoinType]
+@dataclass(frozen=True, eq=False)
+class JoinStep:
+    """A validated join of a join plan."""
+
+    target: Any
+    onclause: Any
+    join_type: JoinType
+
+
+@dataclass(frozen=True, eq=False)
+class JoinPlan:
+    """
+    JOIN conditions validated against a model, applied to statements without validating them again.
+    """
+
+    model: type[DeclarativeBase]
+    steps: tuple[JoinStep, ...]
+    fill_models: tuple[Any, ...]
+
+    def apply(self, stmt: Select) -> Select:
+        """
+        Apply the joins to a statement, adding the models filled into the result.
+
+        :param stmt: SQLAlchemy Select statement
+        :return:
+        """
+        for step in self.steps:
+            stmt = stmt.join(
+                step.target, step.onclause, isouter=step.join_type == 'left', full=step.join_type == 'full'
+            )
+        if self.fill_models:
+            stmt = stmt.add_columns(*self.fill_models)
+        return stmt
+
+
+JoinConditions = list[str | JoinConfig] | dict[str, JoinType] | JoinPlan
 
 LoadOptions = list[ExecutableOption]
 
 SortColumns = str | list[str]
 SortOrders = str | list[str] | None
+
+AggregateFunctionType = Literal[
+    'count',
+    'count_distinct',
+    'sum',
+    'avg',
+    'min',
+    'max',
+]
+
+AggregateMetrics = dict[str, tuple[AggregateFunctionType, str]]
@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import time
+
+from dataclasses import dataclass, field
+from typing import Any, Literal, Sequence, cast
+
+from pydantic import BaseModel
+from sqlalchemy import Column, Insert, MetaData, Table, bindparam, delete, insert, inspect, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.engine import Dialect
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from sqlalchemy_crud_plus.batch import key_in
+from sqlalchemy_crud_plus.crud import CRUDPlus
+from sqlalchemy_crud_plus.errors import ModelColumnError
+
+OperationKind = Literal['create', 'upsert', 'update', 'delete']
+Target = CRUDPlus | Table
+
+
+@dataclass
+class UnitOfWorkReport:
+    """Statistics of a flushed unit of work."""
+
+    statements: int = 0
+    rows: int = 0
+    elapsed: float = 0.0
+    tables: list[str] = field(default_factory=list)
+
+
+def upsert_stmt(dialect: Dialect, table: Table, key_columns: Sequence[Column], update_keys: Sequence[str]) -> Insert:
+    """
+    Build an INSERT that updates the given columns when the primary key already exists.
+
+    :param dialect: The dialect the statement is executed on
+    :param table: The target table
+    :param key_columns: The primary key columns
+    :param update_keys: Names of the columns updated on conflict
+    :return:
+    """
+    if dialect.name in ('postgresql', 'sqlite'):
+        module = postgresql if dialect.name == 'postgresql' else sqlite
+        stmt = module.insert(table)
+        if not update_keys:
+            return stmt.on_conflict_do_nothing(index_elements=list(key_columns))
+        return stmt.on_conflict_do_update(
+            index_elements=list(key_columns), set_={key: stmt.excluded[key] for key in update_keys}
+        )
+    if dialect.name in ('mysql', 'mariadb'):
+        stmt = mysql.insert(table)
+        # Assigning the primary key to itself turns a duplicate into a no-op
+        keys = update_keys or [key_columns[0].key]
+        return stmt.on_duplicate_key_update({key: stmt.inserted[key] for key in keys})
+    raise ValueError(f'Upsert is not supported on {dialect.name}')
+
+
+class UnitOfWork:
+    """
+    Collect create, upsert, update and delete operations on several models and tables, and execute
+    them as grouped bulk statements in one transaction.
+
+    Operations of the same kind on the same table are merged into chunked executemany statements.
+    Inserts and upserts run parent tables first and deletes child tables first, following the
+    foreign key order of `MetaData.sorted_tables`; updates run in between. Several updates of the
+    same primary key are merged, later values winning.
+
+    Used as an async context manager, the operations are flushed when the block exits without an
+    error and discarded otherwise.
+    """
+
+    def __init__(self, session: AsyncSession, chunk_size: int = 1000, commit: bool = True):
+        """
+        :param session: SQLAlchemy async session
+        :param chunk_size: Maximum number of rows per statement
+        :param commit: If `True`, commit the transaction after the flush
+        """
+        if chunk_size <= 0:
+            raise ValueError('chunk_size must be greater than 0')
+        self.session = session
+        self.chunk_size = chunk_size
+        self.commit = commit
+        self.report: UnitOfWorkReport | None = None
+        self._tables: dict[Table, CRUDPlus | None] = {}
+        self._rows: dict[tuple[OperationKind, Table], list[dict[str, Any]]] = {}
+        self._updates: dict[Table, dict[tuple, dict[str, Any]]] = {}
+        self._deletes: dict[Table, dict[tuple, None]] = {}
+
+    async def __aenter__(self) -> UnitOfWork:
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.flush()
+        else:
+            self.clear()
+
+    def _table(self, target: Target) -> Table:
+        if isinstance(target, Table):
+            self._tables.setdefault(target, None)
+            return target
+        table = cast(Table, target.model.__table__)
+        self._tables[table] = target
+        return table
+
+    @staticmethod
+    def _key_columns(table: Table) -> list[Column]:
+        return list(table.primary_key.columns)
+
+    def _version_column(self, table: Table) -> Column | None:
+        crud = self._tables.get(table)
+        if crud is None or crud.version_column is None:
+            return None
+        return cast(Column, inspect(crud.model).column_attrs[crud.version_column].columns[0])
+
+    def _key(self, table: Table, pk: Any) -> tuple:
+        key = tuple(pk) if isinstance(pk, (tuple, list)) else (pk,)
+        if len(key) != len(table.primary_key.columns):
+            raise ValueError(f'Expected {len(table.primary_key.columns)} primary key values for {table.name}')
+        return key
+
+    @staticmethod
+    def _data(target: Target, obj: BaseModel | dict[str, Any], kwargs: dict[str, Any]) -> dict[str, Any]:
+        """
+        Get the row data of an operation keyed by column keys.
+
+        :param target: The `CRUDPlus` of the model, whose data is keyed by attribute names, or a table
+        :param obj: The Pydantic schema or dictionary containing the data
+        :param kwargs: Additional data not included in the schema
+        :return:
+        """
+        data = obj.model_dump(exclude_unset=True) if isinstance(obj, BaseModel) else dict(obj)
+        data.update(kwargs)
+        if isinstance(target, Table):
+            return data
+        column_attrs = inspect(target.model).column_attrs
+        row = {}
+        for key, value in data.items():
+            if key not in column_attrs:
+                raise ModelColumnError(f'Column {key} is not found in {target.model}')
+            row[column_attrs[key].columns[0].key] = value
+        return row
+
+    def create(self, target: Target, obj: BaseModel | dict[str, Any], **kwargs) -> None:
+        """
+        Record the creation of a row.
+
+        :param target: The `CRUDPlus` of the model, or a table such as an association table
+        :param obj: The Pydantic schema or dictionary containing the row data
+        :param kwargs: Additional row data not included in the schema
+        :return:
+        """
+        table = self._table(target)
+        self._rows.setdefault(('create', table), []).append(self._data(target, obj, kwargs))
+
+    def upsert(self, target: Target, obj: BaseModel | dict[str, Any], **kwargs) -> None:
+        """
+        Record the creation of a row, or the update of its non-key columns if its primary key exists.
+
+        :param target: The `CRUDPlus` of the model, or a table
+        :param obj: The Pydantic schema or dictionary containing the row data, including the primary key
+        :param kwargs: Additional row data not included in the schema
+        :return:
+        """
+        table = self._table(target)
+        self._rows.setdefault(('upsert', table), []).append(self._data(target, obj, kwargs))
+
+    def update(self, target: Target, pk: Any, obj: BaseModel | dict[str, Any], **kwargs) -> None:
+        """
+        Record the update of a row by primary key.
+
+        Updates through a `CRUDPlus` with a version column increment the version like `update_model`,
+        a version given in the data is not checked as the expected version and is not written.
+
+        :param target: The `CRUDPlus` of the model, or a table
+        :param pk: Single value for simple primary key, or tuple for composite primary key
+        :param obj: The Pydantic schema or dictionary containing the update data
+        :param kwargs: Additional update data not included in the schema
+        :return:
+        """
+        table = self._table(target)
+        key = self._key(table, pk)
+        self._updates.setdefault(table, {}).setdefault(key, {}).update(self._data(target, obj, kwargs))
+
+    def delete(self, target: Target, pk: Any) -> None:
+        """
+        Record the deletion of a row by primary key.
+
+        :param target: The `CRUDPlus` of the model, or a table such as an association table
+        :param pk: Single value for simple primary key, or tuple for composite primary key
+        :return:
+        """
+        table = self._table(target)
+        self._deletes.setdefault(table, {})[self._key(table, pk)] = None
+
+    def clear(self) -> None:
+        """
+        Discard the recorded operations.
+        """
+        self._tables.clear()
+        self._rows.clear()
+        self._updates.clear()
+        self._deletes.clear()
+
+    def _table_order(self) -> list[Table]:
+        """
+        Order the recorded tables by foreign key dependencies, parents first.
+        """
+        metadatas: list[MetaData] = []
+        for table in self._tables:
+            if table.metadata not in metadatas:
+                metadatas.append(table.metadata)
+        ordered = [table for metadata in metadatas for table in metadata.sorted_tables]
+        return sorted(self._tables, key=ordered.index)
+
+    def _chunks(self, rows: list[Any]) -> list[list[Any]]:
+        return [rows[i : i + self.chunk_size] for i in range(0, len(rows), self.chunk_size)]
+
+    @staticmethod
+    def _group_by_keys(rows: list[dict[str, Any]]) -> list[list[dict[str, Any]]]:
+        # executemany needs the same parameters in every row
+        groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+        return list(groups.values())
+
+    async def _execute(self, report: UnitOfWorkReport, stmt: Any, params: list[dict[str, Any]] | None = None) -> None:
+        result = await self.session.execute(stmt, params) if params is not None else await self.session.execute(stmt)
+        report.statements += 1
+        if params is not None and stmt.is_insert:
+            report.rows += len(params)
+        else:
+            report.rows += max(getattr(result, 'rowcount', 0) or 0, 0)
+
+    async def _write(self, report: UnitOfWorkReport) -> None:
+        order = self._table_order()
+        report.tables = [table.name for table in order]
+        dialect = self.session.get_bind().dialect
+
+        for table in order:
+            key_columns = self._key_columns(table)
+            for rows in self._group_by_keys(self._rows.get(('create', table), [])):
+                for chunk in self._chunks(rows):
+                    await self._execute(report, insert(table), chunk)
+            for rows in self._group_by_keys(self._rows.get(('upsert', table), [])):
+                update_keys = [key for key in rows[0] if key not in {column.key for column in key_columns}]
+                for chunk in self._chunks(rows):
+                    await self._execute(report, upsert_stmt(dialect, table, key_columns, update_keys), chunk)
+
+        for table in order:
+            updates = self._updates.get(table)
+            if not updates:
+                continue
+            key_columns = self._key_columns(table)
+            version = self._version_column(table)
+            rows = [
+                dict(
+                    {k: v for k, v in data.items() if version is None or k != version.key},
+                    **{f'_pk_{column.key}': value for column, value in zip(key_columns, key)},
+                )
+                for key, data in updates.items()
+            ]
+            # The primary key values are bound under their own names, the other parameters form the SET clause
+            stmt = update(table).where(*[column == bindparam(f'_pk_{column.key}') for column in key_columns])
+            if version is not None:
+                stmt = stmt.values({version: version + 1})
+            for group in self._group_by_keys(rows):
+                for chunk in self._chunks(group):
+                    await self._execute(report, stmt, chunk)
+
+        for table in reversed(order):
+            keys = list(self._deletes.get(table, {}))
+            key_columns = self._key_columns(table)
+            for chunk in self._chunks(keys):
+                values = chunk if len(key_columns) > 1 else [key[0] for key in chunk]
+                await self._execute(report, delete(table).where(key_in(key_columns, values)))
+
+        for crud in {crud for crud in self._tables.values() if crud is not None}:
+            await crud._invalidate_caches(self.session)
+
+    async def flush(self) -> UnitOfWorkReport:
+        """
+        Execute the recorded operations in one transaction and discard them.
+
+        With `commit`, the unit of work owns the transaction and rolls it back when a statement fails.
+        Otherwise the operations run in a savepoint of the caller's transaction and only the savepoint
+        is rolled back. Either way the recorded operations are kept after a failure, so the flush can
+        be retried.
+
+        :return: The number of statements and affected rows, and the elapsed time
+        """
+        report = UnitOfWorkReport()
+        start = time.perf_counter()
+
+        if self.commit:
+            try:
+                await self._write(report)
+                await self.session.commit()
+            except BaseException:
+                await self.session.rollback()
+                raise
+        else:
+            async with self.session.begin_nested():
+                await self._write(report)
+        self.clear()
+
+        report.elapsed = time.perf_counter() - start
+        self.report = report
+        return report
@@ -2,10 +2,14 @@ from __future__ import annotations
 
 import warnings
 
-from typing import Any, Callable
+from functools import lru_cache
+from typing import Any, Callable, Mapping, Sequence, cast, get_args
 
-from sqlalchemy import ColumnElement, Select, and_, asc, desc, or_
+from pydantic import BaseModel
+from sqlalchemy import ColumnElement, Select, and_, asc, desc, distinct, func, inspect, or_
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import (
+    Session,
     contains_eager,
     defaultload,
     defer,
@@ -20,6 +24,8 @@ from sqlalchemy.orm import (
     undefer,
     undefer_group,
 )
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.session import make_transient_to_detached
 from sqlalchemy.orm.util import AliasedClass
 from sqlalchemy.sql.base import ExecutableOption
 from sqlalchemy.sql.schema import Column
@@ -31,7 +37,19 @@ from sqlalchemy_crud_plus.errors import (
     ModelColumnError,
     SelectOperatorError,
 )
-from sqlalchemy_crud_plus.types import JoinConditions, JoinConfig, LoadStrategies, Model
+from sqlalchemy_crud_plus.loading import LoadStrategyAdvisor, default_load_advisor
+from sqlalchemy_crud_plus.types import (
+    AggregateMetrics,
+    JoinConditions,
+    JoinConfig,
+    JoinPlan,
+    JoinStep,
+    JoinType,
+    LoadPlan,
+    LoadStrategies,
+    Model,
+    SessionSource,
+)
 
 _SUPPORTED_FILTERS = {
     # Comparison: https://docs.sqlalchemy.org/en/20/core/operators.html#comparison-operators
@@ -177,7 +195,7 @@ def _create_arithmetic_filters(column: Column, op: str, value: dict[str, Any]) -
     return arithmetic_filters
 
 
-def _create_and_filters(column: Column, op: str, value: Any) -> list[ColumnElement[bool]]:
+def _create_and_filters(column: Column | ColumnElement[Any], op: str, value: Any) -> list[ColumnElement[bool]]:
     """
     Create AND filter expressions.
 
@@ -262,6 +280,7 @@ def apply_sorting(
     stmt: Select,
     sort_columns: str | list[str],
     sort_orders: str | list[str] | None = None,
+    labels: Mapping[str, ColumnElement[Any]] | None = None,
 ) -> Select:
     """
     Apply sorting to a SQLAlchemy query based on specified column names and sort orders.
@@ -270,6 +289,7 @@ def apply_sorting(
     :param stmt: The SQLAlchemy Select statement to which sorting will be applied
     :param sort_columns: Column name or list of column names to sort by
     :param sort_orders: Sort order ("asc" or "desc") or list of sort orders
+    :param labels: Labeled expressions of the selection that can be sorted by their label
     :return:
     """
     if sort_orders and not sort_columns:
@@ -295,72 +315,341 @@ def apply_sorting(
         validated_sort_orders = ['asc'] * len(sort_columns) if not sort_orders else sort_orders
 
         for idx, column_name in enumerate(sort_columns):
-            column = get_column(model, column_name)
+            column = labels[column_name] if labels and column_name in labels else get_column(model, column_name)
             order = validated_sort_orders[idx]
             stmt = stmt.order_by(asc(column) if order == 'asc' else desc(column))
 
     return stmt
 
 
-def build_load_strategies(model: type[Model], load_strategies: LoadStrategies | None) -> list[ExecutableOption]:
+_AGGREGATE_FUNCTIONS: dict[str, Callable[[Any], ColumnElement[Any]]] = {
+    'count': func.count,
+    'count_distinct': lambda column: func.count(distinct(column)),
+    'sum': func.sum,
+    'avg': func.avg,
+    'min': func.min,
+    'max': func.max,
+}
+
+
+def build_aggregate_metrics(model: type[Model], metrics: AggregateMetrics) -> dict[str, ColumnElement[Any]]:
     """
-    Build relationship loading strategy options.
+    Build aggregate expressions from metric definitions.
+
+    :param model: The SQLAlchemy model class
+    :param metrics: Aggregate function and column name by metric name, `('count', '*')` counts rows
+    :return:
+    """
+    expressions = {}
+    for name, (function, column_name) in metrics.items():
+        if function not in _AGGREGATE_FUNCTIONS:
+            raise SelectOperatorError(
+                f'Aggregate function {function} is not supported, only supports {", ".join(_AGGREGATE_FUNCTIONS)}'
+            )
+        if column_name == '*':
+            if function != 'count':
+                raise SelectOperatorError(f'Aggregate function {function} requires a column')
+            expressions[name] = func.count()
+        else:
+            expressions[name] = _AGGREGATE_FUNCTIONS[function](get_column(model, column_name))
+    return expressions
+
+
+def parse_having(metrics: Mapping[str, ColumnElement[Any]], **kwargs) -> list[ColumnElement[bool]]:
+    """
+    Parse HAVING filter expressions on aggregate metrics from keyword arguments.
+
+    :param metrics: Aggregate expressions by metric name
+    :param kwargs: Filter expressions using metric__operator=value syntax
+    :return:
+    """
+    filters = []
+    for key, value in kwargs.items():
+        name, op = key.rsplit('__', 1) if '__' in key else (key, 'eq')
+        if name not in metrics:
+            raise ModelColumnError(f'Metric {name} is not found in the aggregate metrics')
+        filters.extend(_create_and_filters(metrics[name], op, value))
+    return filters
+
+
+_LOAD_STRATEGIES: dict[str, Callable[..., Any]] = {
+    'contains_eager': contains_eager,
+    'defaultload': defaultload,
+    'immediateload': immediateload,
+    'joinedload': joinedload,
+    'lazyload': lazyload,
+    'noload': noload,
+    'raiseload': raiseload,
+    'selectinload': selectinload,
+    'subqueryload': subqueryload,
+    # Load
+    'defer': defer,
+    'load_only': load_only,
+    # 'selectin_polymorphic': selectin_polymorphic,
+    'undefer': undefer,
+    'undefer_group': undefer_group,
+    # 'with_expression': with_expression,
+}
+
+_DEFAULT_LOAD_STRATEGY = 'selectinload'
+
+
+def _resolve_load_path(model: type[Model], path: str) -> tuple[type[Model], str]:
+    """
+    Resolve a dotted load path to the model owning its last attribute.
+
+    :param model: SQLAlchemy model class
+    :param path: Attribute path such as `posts.category`
+    :return: The owning model and the last attribute name
+    """
+    *parents, key = path.split('.')
+    owner = model
+    for name in parents:
+        relationships = inspect(owner).relationships
+        if name not in relationships:
+            raise ModelColumnError(f'Invalid relationship column: {path}')
+        owner = relationships[name].mapper.class_
+    return owner, key
+
+
+@lru_cache(maxsize=1024)
+def _compile_load_strategies(model: type[Model], spec: tuple[tuple[str, str], ...]) -> tuple[ExecutableOption, ...]:
+    """
+    Compile resolved loading strategies into loader options, chaining the options of nested paths.
+
+    :param model: SQLAlchemy model class
+    :param spec: Pairs of attribute path and loading strategy name
+    :return:
+    """
+    # Paths sharing a prefix become one tree, so the prefix is loaded once
+    tree: dict[str, list] = {}
+    for path, strategy_name in spec:
+        *parents, key = path.split('.')
+        node = tree
+        for name in parents:
+            node = node.setdefault(name, [None, {}])[1]
+        node.setdefault(key, [None, {}])[0] = strategy_name
+
+    def build(owner: type[Model], node: dict[str, list], prefix: str) -> list[ExecutableOption]:
+        options = []
+        for key, (strategy_name, children) in node.items():
+            path = f'{prefix}{key}'
+            try:
+                attr = getattr(owner, key)
+            except AttributeError:
+                raise ModelColumnError(f'Invalid relationship column: {path}')
+            option = _LOAD_STRATEGIES[strategy_name or _DEFAULT_LOAD_STRATEGY](attr)
+            if children:
+                target = inspect(owner).relationships[key].mapper.class_
+                option = option.options(*build(target, children, f'{path}.'))
+            options.append(option)
+        return options
+
+    return tuple(build(model, tree, ''))
+
+
+@lru_cache(maxsize=1024)
+def _cached_load_plan(model: type[Model], spec: tuple[tuple[str, str], ...]) -> LoadPlan:
+    """
+    Validate loading strategies against the model and compile the options of the fixed ones.
+
+    :param model: SQLAlchemy model class
+    :param spec: Pairs of attribute path and loading strategy name
+    :return:
+    """
+    auto = []
+    for path, strategy_name in spec:
+        owner, key = _resolve_load_path(model, path)
+        if strategy_name == 'auto':
+            if key not in inspect(owner).relationships:
+                raise ModelColumnError(f'Invalid relationship column: {path}')
+            auto.append(path)
+        elif strategy_name not in _LOAD_STRATEGIES:
+            raise LoadingStrategyError(
+                f'Invalid loading strategy: {strategy_name}, only supports {["auto", *_LOAD_STRATEGIES.keys()]}'
+            )
+    options = () if auto else _compile_load_strategies(model, spec)
+    return LoadPlan(model=model, spec=spec, auto=tuple(auto), options=options)
+
+
+def compile_load_plan(model: type[Model], load_strategies: LoadStrategies) -> LoadPlan:
+    """
+    Compile loading strategies into a load plan of the model.
+
+    Plans are cached per model and loading strategies, so passing the same strategies again or
+    passing the plan itself skips their validation.
 
     :param model: SQLAlchemy model class
     :param load_strategies: Loading strategies configuration
     :return:
     """
+    if isinstance(load_strategies, LoadPlan):
+        if load_strategies.model is not model:
+            raise ValueError(f'The load plan is compiled for {load_strategies.model}, not {model}')
+        return load_strategies
+    if isinstance(load_strategies, list):
+        spec = tuple((path, _DEFAULT_LOAD_STRATEGY) for path in load_strategies)
+    else:
+        spec = tuple(load_strategies.items())
+    return _cached_load_plan(model, spec)
+
+
+def build_load_strategies(
+    model: type[Model],
+    load_strategies: LoadStrategies | None,
+    advisor: LoadStrategyAdvisor | None = None,
+) -> list[ExecutableOption]:
+    """
+    Build relationship loading strategy options.
+
+    Dotted paths such as `posts.category` load nested relationships, chained to the options of
+    their parent path. Parent paths without an own strategy use `selectinload`. The compiled options
+    are cached per model and loading strategies.
+
+    :param model: SQLAlchemy model class
+    :param load_strategies: Loading strategies configuration or load plan
+    :param advisor: Advisor choosing the strategy of `auto` relationships, defaults to `default_load_advisor`
+    :return:
+    """
     if load_strategies is None:
         return []
 
-    strategies_map = {
-        'contains_eager': contains_eager,
-        'defaultload': defaultload,
-        'immediateload': immediateload,
-        'joinedload': joinedload,
-        'lazyload': lazyload,
-        'noload': noload,
-        'raiseload': raiseload,
-        'selectinload': selectinload,
-        'subqueryload': subqueryload,
-        # Load
-        'defer': defer,
-        'load_only': load_only,
-        # 'selectin_polymorphic': selectin_polymorphic,
-        'undefer': undefer,
-        'undefer_group': undefer_group,
-        # 'with_expression': with_expression,
-    }
-
-    options = []
-    default_strategy = 'selectinload'
+    plan = compile_load_plan(model, load_strategies)
+    if not plan.auto:
+        return list(plan.options)
 
-    if isinstance(load_strategies, list):
-        for column in load_strategies:
-            try:
-                attr = getattr(model, column)
-                strategy_func = strategies_map[default_strategy]
-                options.append(strategy_func(attr))
-            except AttributeError:
-                raise ModelColumnError(f'Invalid relationship column: {column}')
-
-    elif isinstance(load_strategies, dict):
-        for column, strategy_name in load_strategies.items():
-            if strategy_name not in strategies_map:
-                raise LoadingStrategyError(
-                    f'Invalid loading strategy: {strategy_name}, only supports {list(strategies_map.keys())}'
-                )
-            try:
-                attr = getattr(model, column)
-                strategy_func = strategies_map.get(strategy_name)
-                if strategy_func:
-                    options.append(strategy_func(attr))
-            except AttributeError:
-                raise ModelColumnError(f'Invalid relationship column: {column}')
+    advisor = advisor or default_load_advisor
+    spec = []
+    for path, strategy_name in plan.spec:
+        if strategy_name == 'auto':
+            strategy_name = advisor.choose(*_resolve_load_path(model, path))
+        spec.append((path, strategy_name))
+    return list(_compile_load_strategies(model, tuple(spec)))
 
+
+def _nested_schema(annotation: Any) -> type[BaseModel] | None:
+    """
+    Get the Pydantic model in a field annotation, e.g. in `list[Schema]` or `Schema | None`.
+
+    :param annotation: The field annotation
+    :return:
+    """
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        schema = _nested_schema(arg)
+        if schema is not None:
+            return schema
+    return None
+
+
+def _schema_options(model: type[Model], schema: type[BaseModel], parents: frozenset[type[BaseModel]]) -> list[Any]:
+    mapper = inspect(model)
+    column_keys = {column.key for column in mapper.column_attrs}
+    loaded = {mapper.get_property_by_column(column).key for column in mapper.primary_key}
+    projectable = True
+    options: list[Any] = []
+
+    for name, field in schema.model_fields.items():
+        key = field.validation_alias if isinstance(field.validation_alias, str) else field.alias or name
+        if key in column_keys:
+            loaded.add(key)
+        elif key in mapper.relationships:
+            prop = mapper.relationships[key]
+            # The columns joining the relationship to its parent are needed to load it
+            loaded.update(
+                mapper.get_property_by_column(column).key
+                for column in prop.local_columns
+                if mapper.columns.contains_column(column)
+            )
+            attr = getattr(model, key)
+            option = selectinload(attr) if prop.uselist else joinedload(attr)
+            nested = _nested_schema(field.annotation)
+            # A schema nested in itself is loaded to the depth the data is serialized from
+            if nested is not None and nested not in parents:
+                nested_options = _schema_options(prop.mapper.class_, nested, parents | {schema})
+                if nested_options:
+                    option = option.options(*nested_options)
+            options.append(option)
+        else:
+            # Properties and other attributes may read any column
+            projectable = False
+
+    if projectable:
+        options.insert(0, load_only(*[getattr(model, key) for key in sorted(loaded)]))
     return options
 
 
+@lru_cache(maxsize=256)
+def build_schema_options(model: type[Model], schema: type[BaseModel]) -> tuple[ExecutableOption, ...]:
+    """
+    Build the loading options fetching exactly the data serialized by a response schema.
+
+    Schema fields matching columns are loaded with `load_only`, fields matching relationships are
+    loaded eagerly (`joinedload` for scalar relationships, `selectinload` for collections) and nested
+    schemas are projected the same way. Fields that are not mapped, such as properties, keep every
+    column of their model loaded. The options are cached per model and schema.
+
+    :param model: SQLAlchemy model class
+    :param schema: The Pydantic response schema
+    :return:
+    """
+    return tuple(_schema_options(model, schema, frozenset()))
+
+
+_JOIN_TYPES = get_args(JoinType)
+
+
+def _compile_join_plan(model: type[Model], items: Sequence[str | tuple[str, str] | JoinConfig]) -> JoinPlan:
+    steps = []
+    fill_models = []
+    for v in items:
+        if isinstance(v, JoinConfig):
+            steps.append(JoinStep(target=v.model, onclause=v.join_on, join_type=v.join_type))
+            if v.fill_result and v.model not in fill_models:
+                fill_models.append(v.model)
+            continue
+
+        # A relationship name of the list form is an inner join
+        column, join_type = v if isinstance(v, tuple) else (v, 'inner')
+        if join_type not in _JOIN_TYPES:
+            # SQLAlchemy doesn't support right join
+            raise JoinConditionError(f'Invalid join type: {join_type}, only supports {list(_JOIN_TYPES)}')
+        if column not in inspect(model).relationships:
+            raise ModelColumnError(f'Invalid model column: {column}')
+        steps.append(JoinStep(target=getattr(model, column), onclause=None, join_type=cast(JoinType, join_type)))
+    return JoinPlan(model=model, steps=tuple(steps), fill_models=tuple(fill_models))
+
+
+@lru_cache(maxsize=1024)
+def _cached_join_plan(model: type[Model], spec: tuple[str | tuple[str, str], ...]) -> JoinPlan:
+    return _compile_join_plan(model, spec)
+
+
+def compile_join_plan(model: type[Model], join_conditions: JoinConditions) -> JoinPlan:
+    """
+    Compile JOIN conditions into a join plan of the model.
+
+    Plans of relationship names are cached per model and JOIN conditions. `JoinConfig` conditions
+    hold SQL expressions that are not hashable by value, compile them once and pass the plan instead.
+
+    :param model: SQLAlchemy model class
+    :param join_conditions: JOIN conditions configuration
+    :return:
+    """
+    if isinstance(join_conditions, JoinPlan):
+        if join_conditions.model is not model:
+            raise ValueError(f'The join plan is compiled for {join_conditions.model}, not {model}')
+        return join_conditions
+    if isinstance(join_conditions, dict):
+        return _cached_join_plan(model, tuple(join_conditions.items()))
+    if not isinstance(join_conditions, list):
+        return _cached_join_plan(model, ())
+    if all(isinstance(v, str) for v in join_conditions):
+        return _cached_join_plan(model, tuple(join_conditions))
+    return _compile_join_plan(model, join_conditions)
+
+
 def has_join_fill_result(join_conditions: JoinConditions) -> bool:
     """
     Check if any JoinConfig in join_conditions has fill_result=True.
@@ -368,6 +657,9 @@ def has_join_fill_result(join_conditions: JoinConditions) -> bool:
     :param join_conditions: JOIN conditions configuration
     :return:
     """
+    if isinstance(join_conditions, JoinPlan):
+        return bool(join_conditions.fill_models)
+
     if isinstance(join_conditions, list):
         for v in join_conditions:
             if isinstance(v, JoinConfig) and v.fill_result:
@@ -382,47 +674,94 @@ def apply_join_conditions(model: type[Model], stmt: Select, join_conditions: Joi
 
     :param model: SQLAlchemy model class
     :param stmt: SQLAlchemy Select statement
-    :param join_conditions: JOIN conditions configuration
+    :param join_conditions: JOIN conditions configuration or join plan
     :return:
     """
-    if isinstance(join_conditions, list):
-        for v in join_conditions:
-            if isinstance(v, str):
-                try:
-                    attr = getattr(model, v)
-                    stmt = stmt.join(attr)
-                except AttributeError:
-                    raise ModelColumnError(f'Invalid model column: {v}')
-            elif isinstance(v, JoinConfig):
-                if v.join_type == 'inner':
-                    stmt = stmt.join(v.model, v.join_on)
-                elif v.join_type == 'left':
-                    stmt = stmt.join(v.model, v.join_on, isouter=True)
-                elif v.join_type == 'full':
-                    stmt = stmt.join(v.model, v.join_on, full=True)
-
-                if v.fill_result:
-                    if not any(
-                        col for col in stmt.selected_columns if hasattr(col, 'class_') and col.class_ == v.model
-                    ):
-                        stmt = stmt.add_columns(v.model)
-
-    elif isinstance(join_conditions, dict):
-        for column, join_type in join_conditions.items():
-            allowed_join_types = ['inner', 'left', 'full']  # SQLAlchemy doesn't support right join
-            if join_type not in allowed_join_types:
-                raise JoinConditionError(f'Invalid join type: {join_type}, only supports {allowed_join_types}')
-            try:
-                attr = getattr(model, column)
-                if join_type == 'inner':
-                    stmt = stmt.join(attr)
-                elif join_type == 'left':
-                    stmt = stmt.join(attr, isouter=True)
-                elif join_type == 'full':
-                    stmt = stmt.join(attr, full=True)
-                else:
-                    stmt = stmt.join(attr)
-            except AttributeError:
-                raise ModelColumnError(f'Invalid model column: {column}')
+    return compile_join_plan(model, join_conditions).apply(stmt)
 
-    return stmt
+
+def instance_to_row(instance: Any) -> dict[str, Any]:
+    """
+    Get the loaded column values of a model instance as plain row data.
+
+    :param instance: The SQLAlchemy model instance
+    :return:
+    """
+    state = inspect(instance)
+    loaded = state.dict
+    return {attr.key: loaded[attr.key] for attr in state.mapper.column_attrs if attr.key in loaded}
+
+
+def row_to_instance(model: type[Model], row: dict[str, Any]) -> Model:
+    """
+    Build a detached model instance from row data without marking any attribute as modified.
+
+    :param model: The SQLAlchemy model class
+    :param row: The column values, must include the primary key
+    :return:
+    """
+    instance = inspect(model).class_manager.new_instance()
+    for key, value in row.items():
+        set_committed_value(instance, key, value)
+    make_transient_to_detached(instance)
+    return instance
+
+
+def merge_rows(session: Session, model: type[Model], rows: list[dict[str, Any]]) -> list[Model]:
+    """
+    Materialize row data as persistent instances of a session without emitting SQL.
+
+    Instances already present in the identity map are returned unchanged, so their pending
+    changes are kept, as when the rows are loaded by a query.
+
+    :param session: SQLAlchemy session
+    :param model: The SQLAlchemy model class
+    :param rows: The row data
+    :return:
+    """
+    mapper = inspect(model)
+    keys = [mapper.get_property_by_column(column).key for column in mapper.primary_key]
+    instances = []
+    for row in rows:
+        identity_key = mapper.identity_key_from_primary_key([row[key] for key in keys])
+        instance = session.identity_map.get(identity_key)
+        if instance is None:
+            instance = session.merge(row_to_instance(model, row), load=False)
+        instances.append(instance)
+    return instances
+
+
+def as_sessionmaker(source: SessionSource) -> async_sessionmaker[AsyncSession]:
+    """
+    Get the sessionmaker of an engine or sessionmaker argument.
+
+    :param source: An async engine, or a sessionmaker returned as is
+    :return: A sessionmaker with `autoflush` and `expire_on_commit` disabled for engines
+    """
+    if isinstance(source, AsyncEngine):
+        return async_sessionmaker(source, autoflush=False, expire_on_commit=False)
+    return source
+
+
+_SYNC_SESSION_KEY = '_sqlalchemy_crud_plus_sync'
+
+
+def mark_sync_session(session: Session) -> None:
+    """
+    Mark a sync session whose `CRUDPlus` calls are run by `SyncCRUDPlus` without an event loop.
+
+    :param session: The sync session
+    :return:
+    """
+    session.info[_SYNC_SESSION_KEY] = True
+
+
+def is_sync_session(session: AsyncSession | Session) -> bool:
+    """
+    Check whether a session was marked by `SyncCRUDPlus`, whose calls must not wait on an event loop
+    even when the calling thread runs one.
+
+    :param session: SQLAlchemy session, or the session shim of `SyncCRUDPlus`
+    :return:
+    """
+    return bool(getattr(session, 'sync_session', session).info.get(_SYNC_SESSION_KEY))
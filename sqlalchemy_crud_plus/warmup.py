@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import inspect
+import time
+import warnings
+
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Awaitable, Callable, Iterator, cast
+
+from sqlalchemy import ClauseElement, Column, Executable, Table, event, select
+from sqlalchemy.exc import SAWarning, StatementError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.orm import configure_mappers
+
+from sqlalchemy_crud_plus.crud import CRUDPlus
+
+
+@dataclass
+class WarmupReport:
+    """Compile timings of a warmup, in seconds."""
+
+    models: int = 0
+    statements: int = 0
+    cold: float = 0.0
+    warm: float = 0.0
+    prepared: int = 0
+    elapsed: float = 0.0
+    timings: dict[str, tuple[float, float]] = field(default_factory=dict)
+
+
+class CRUDRegistry:
+    """
+    Registry of the `CRUDPlus` instances whose statements are precompiled by `warmup`.
+    """
+
+    def __init__(self) -> None:
+        self._cruds: dict[type, CRUDPlus] = {}
+
+    def __len__(self) -> int:
+        return len(self._cruds)
+
+    def __iter__(self) -> Iterator[CRUDPlus]:
+        return iter(list(self._cruds.values()))
+
+    def __contains__(self, model: object) -> bool:
+        return model in self._cruds
+
+    def register(self, crud: CRUDPlus) -> CRUDPlus:
+        """
+        Register a `CRUDPlus` instance, replacing the one registered for the same model.
+
+        :param crud: The `CRUDPlus` instance
+        :return: The registered instance, so registration can wrap its creation
+        """
+        self._cruds[crud.model] = crud
+        return crud
+
+    def get(self, model: type) -> CRUDPlus | None:
+        """
+        Get the `CRUDPlus` instance registered for a model.
+
+        :param model: The SQLAlchemy model class
+        :return:
+        """
+        return self._cruds.get(model)
+
+    def unregister(self, model: type) -> None:
+        """
+        Remove the `CRUDPlus` instance registered for a model.
+
+        :param model: The SQLAlchemy model class
+        :return:
+        """
+        self._cruds.pop(model, None)
+
+
+default_registry = CRUDRegistry()
+
+
+def _placeholder(column: Column) -> Any:
+    """
+    Get a value of the column's Python type, only the type of a bound value shapes the compiled statement.
+    """
+    try:
+        return column.type.python_type()
+    except Exception:
+        return 0
+
+
+def _placeholder_pk(crud: CRUDPlus) -> Any:
+    key_columns = crud.primary_key if isinstance(crud.primary_key, list) else [crud.primary_key]
+    pk = [_placeholder(column) for column in key_columns]
+    return tuple(pk) if len(pk) > 1 else pk[0]
+
+
+def read_templates(crud: CRUDPlus) -> dict[str, Executable]:
+    """
+    Build the read statements `CRUDPlus` emits for its most common calls on the model.
+
+    :param crud: The `CRUDPlus` instance
+    :return: The statement by call
+    """
+    pk = _placeholder_pk(crud)
+    key_columns = crud.primary_key if isinstance(crud.primary_key, list) else [crud.primary_key]
+    # Filters given by the caller use the mapped attributes, the primary key filter of `select_model` the columns
+    attr_filters = [
+        getattr(crud.model, column.key) == value
+        for column, value in zip(key_columns, pk if isinstance(pk, tuple) else (pk,))
+    ]
+    return {
+        'select_model': select(crud.model).where(*crud._get_pk_filter(pk)),
+        'count': crud._count_stmt([]),
+        'exists': select(crud.model).where(*attr_filters).limit(1),
+    }
+
+
+def _write_templates(crud: CRUDPlus, session: AsyncSession) -> dict[str, Callable[[], Awaitable[Any]]]:
+    """
+    Build the writes `CRUDPlus` emits for its most common calls on the model, by call.
+
+    The ORM finishes write statements while executing them, so they are warmed through the calls.
+    """
+    pk = _placeholder_pk(crud)
+    columns = cast(Table, crud.model.__table__).columns
+    data = {column.key: None for column in columns if not column.primary_key and column.key != crud.version_column}
+    row = {column.key: _placeholder(column) for column in columns}
+    return {
+        'update_model': partial(crud.update_model, session, pk, data),
+        'delete_model': partial(crud.delete_model, session, pk),
+        'bulk_create_models': partial(crud.bulk_create_models, session, [row]),
+    }
+
+
+class _WriteStopped(Exception):
+    """Stops a warmed write after its statement is compiled, before it reaches the database."""
+
+
+def _stop_writes(conn, cursor, statement, parameters, context, executemany) -> None:
+    # Reads the ORM runs ahead of a write, such as fetching the matched rows, have no side effects
+    if context.isinsert or context.isupdate or context.isdelete:
+        raise _WriteStopped
+
+
+async def _compile_write(conn: AsyncConnection, write: Callable[[], Awaitable[Any]]) -> float:
+    """
+    Run a write call up to the point its statement is compiled into the compiled cache.
+
+    The statement never reaches the database, so no row, sequence or cache is touched, and the call
+    stops before it invalidates caches.
+
+    :param conn: The warmup connection
+    :param write: The write call
+    :return: The compile time
+    """
+    started = time.perf_counter()
+    event.listen(conn.sync_connection, 'before_cursor_execute', _stop_writes)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', SAWarning)
+            await write()
+    except (_WriteStopped, StatementError):
+        # Placeholder values the driver rejects fail after the statement is compiled as well
+        pass
+    finally:
+        event.remove(conn.sync_connection, 'before_cursor_execute', _stop_writes)
+    return time.perf_counter() - started
+
+
+def _cache_compiler(engine: AsyncEngine) -> Callable[[Executable], Any] | None:
+    """
+    Get a function compiling a statement straight into the engine's compiled cache.
+
+    This relies on SQLAlchemy internals, without them the statements are compiled by executing them.
+    """
+    sync_engine = engine.sync_engine
+    compiled_cache = getattr(sync_engine, '_compiled_cache', None)
+    if compiled_cache is None or not hasattr(ClauseElement, '_compile_w_cache'):
+        return None
+
+    def compile_statement(stmt: Executable) -> Any:
+        return getattr(stmt, '_compile_w_cache')(
+            dialect=sync_engine.dialect,
+            compiled_cache=compiled_cache,
+            column_keys=[],
+            for_executemany=False,
+            schema_translate_map=None,
+        )
+
+    return compile_statement
+
+
+async def _timed(call: Callable[[], Any]) -> float:
+    started = time.perf_counter()
+    result = call()
+    if inspect.isawaitable(result):
+        await result
+    return time.perf_counter() - started
+
+
+async def warmup(engine: AsyncEngine, registry: CRUDRegistry | None = None, prepare: bool = False) -> WarmupReport:
+    """
+    Configure the mappers and precompile the common read statements of every registered model into
+    the engine's compiled cache, so the first requests do not pay for compiling them.
+
+    :param engine: The engine the statements are compiled for
+    :param registry: The registry of `CRUDPlus` instances, defaults to `default_registry`
+    :param prepare: If `True`, also execute the reads once on a pooled connection, in a transaction that
+        is rolled back, which warms the connection and the driver, and compile the primary key update,
+        primary key delete and bulk insert of every model without executing them
+    :return: The cold and warm compile time of each read, and with `prepare`, of each write
+    """
+    registry = default_registry if registry is None else registry
+    report = WarmupReport()
+    start = time.perf_counter()
+    configure_mappers()
+
+    reads: dict[str, Executable] = {}
+    for crud in registry:
+        report.models += 1
+        for name, stmt in read_templates(crud).items():
+            reads[f'{crud.model.__name__}.{name}'] = stmt
+
+    async with AsyncExitStack() as stack:
+        conn: AsyncConnection | None = None
+        compile_statement = _cache_compiler(engine)
+        if compile_statement is None or prepare:
+            conn = await stack.enter_async_context(engine.connect())
+            transaction = await conn.begin()
+            stack.push_async_callback(transaction.rollback)
+
+        for key, stmt in reads.items():
+            # The first compile fills the cache, the second measures a request arriving after the warmup
+            if compile_statement is not None:
+                timings = [await _timed(partial(compile_statement, stmt)) for _ in range(2)]
+            else:
+                # Executing compiles through the engine's compiled cache like any request does
+                timings = [await _timed(partial(cast(AsyncConnection, conn).execute, stmt)) for _ in range(2)]
+                report.prepared += 1
+            report.statements += 1
+            report.cold += timings[0]
+            report.warm += timings[1]
+            report.timings[key] = (timings[0], timings[1])
+
+        if prepare:
+            conn = cast(AsyncConnection, conn)
+            if compile_statement is not None:
+                for stmt in reads.values():
+                    await conn.execute(stmt)
+                    report.prepared += 1
+            async with AsyncSession(bind=conn, expire_on_commit=False) as session:
+                for crud in registry:
+                    for name, write in _write_templates(crud, session).items():
+                        timings = [await _compile_write(conn, write) for _ in range(2)]
+                        report.statements += 1
+                        report.cold += timings[0]
+                        report.warm += timings[1]
+                        report.timings[f'{crud.model.__name__}.{name}'] = (timings[0], timings[1])
+
+    report.elapsed = time.perf_counter() - start
+    return report
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Sequence, cast
+
+from sqlalchemy import Table, bindparam, inspect, update
+
+from sqlalchemy_crud_plus.cache import IdentityCache
+from sqlalchemy_crud_plus.errors import ModelColumnError
+from sqlalchemy_crud_plus.types import SessionSource
+from sqlalchemy_crud_plus.utils import as_sessionmaker
+
+if TYPE_CHECKING:
+    from sqlalchemy_crud_plus.crud import CRUDPlus
+
+
+@dataclass
+class WriteBehindStats:
+    """Counters collected by a write-behind buffer."""
+
+    updates: int = 0
+    rows: int = 0
+    flushes: int = 0
+    failures: int = 0
+    flush_time: float = 0.0
+    last_flush_time: float = 0.0
+
+    @property
+    def coalescing_ratio(self) -> float:
+        """Buffered updates per written row."""
+        return self.updates / self.rows if self.rows else 0.0
+
+    @property
+    def flush_latency(self) -> float:
+        """Average seconds per flush."""
+        return self.flush_time / self.flushes if self.flushes else 0.0
+
+
+class WriteBehindBuffer:
+    """
+    Buffer primary key updates of a hot model and write them behind in bulk.
+
+    Updates of the same row are merged while buffered: assigned columns keep the last value,
+    increment columns sum their deltas and are written as `column = column + delta`. A background
+    task flushes the merged rows through executemany UPDATE statements on a session of its own once
+    the oldest buffered update is `window` seconds old, or as soon as `max_rows` rows are buffered.
+
+    Buffered updates are not visible to reads until flushed. A failed flush keeps its rows buffered,
+    merged under the updates that arrived meanwhile, and retries after the next window.
+
+    The version column of a versioned model is incremented once per written row, as by `update_model`.
+    Expected versions cannot be checked behind the caller, a version given in the data is not written.
+    """
+
+    def __init__(
+        self,
+        sessions: SessionSource,
+        window: float = 1.0,
+        max_rows: int = 1000,
+        increment_columns: Sequence[str] = (),
+    ):
+        """
+        :param sessions: Engine or sessionmaker the flush sessions are created from
+        :param window: Maximum seconds an update stays buffered
+        :param max_rows: Number of buffered rows that triggers a flush before the window ends
+        :param increment_columns: Columns whose values are deltas added to the stored value
+        """
+        if window <= 0:
+            raise ValueError('window must be greater than 0')
+        if max_rows <= 0:
+            raise ValueError('max_rows must be greater than 0')
+        self.sessionmaker = as_sessionmaker(sessions)
+        self.window = window
+        self.max_rows = max_rows
+        self.increment_columns = frozenset(increment_columns)
+        self.stats = WriteBehindStats()
+        self.last_error: Exception | None = None
+        self._crud: CRUDPlus | None = None
+        self._pending: dict[tuple, dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+        self._ready = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def __aenter__(self) -> WriteBehindBuffer:
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def bind(self, crud: CRUDPlus) -> None:
+        """
+        Attach the buffer to the `CRUDPlus` instance whose model it writes.
+
+        :param crud: The `CRUDPlus` instance
+        :return:
+        """
+        if self._crud is not None and self._crud is not crud:
+            raise ValueError('The write-behind buffer is already attached to another CRUDPlus instance')
+        for column in self.increment_columns:
+            if column not in crud.model_column_names:
+                raise ModelColumnError(f'Column {column} is not found in {crud.model}')
+        self._crud = crud
+
+    def _merge(self, key: tuple, data: dict[str, Any]) -> None:
+        row = self._pending.setdefault(key, {})
+        for column, value in data.items():
+            if column in self.increment_columns:
+                row[column] = row.get(column, 0) + value
+            else:
+                row[column] = value
+
+    def add(self, pk: Any | Sequence[Any], data: dict[str, Any]) -> None:
+        """
+        Buffer an update of a row, starting the background flush task if needed.
+
+        :param pk: Single value for simple primary key, or tuple for composite primary key
+        :param data: The update data, deltas for increment columns
+        :return:
+        """
+        if self._crud is None:
+            raise ValueError('The write-behind buffer is not attached to a CRUDPlus instance')
+        if self._closed:
+            raise RuntimeError('The write-behind buffer is closed')
+        column_attrs = inspect(self._crud.model).column_attrs
+        for column in data:
+            if column not in column_attrs:
+                raise ModelColumnError(f'Column {column} is not found in {self._crud.model}')
+
+        key = tuple(pk) if isinstance(pk, (tuple, list)) else (pk,)
+        self._merge(key, data)
+        self.stats.updates += 1
+        self._ready.set()
+        if len(self._pending) >= self.max_rows:
+            self._full.set()
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        """
+        Flush the buffered rows once per window until the buffer is closed.
+        """
+        while not self._closed:
+            await self._ready.wait()
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._full.wait(), self.window)
+            try:
+                await self.flush()
+            except Exception as e:
+                # The rows stay buffered and are retried after the next window
+                self.last_error = e
+                if not self._closed:
+                    await asyncio.sleep(self.window)
+
+    async def flush(self) -> int:
+        """
+        Write the buffered rows now.
+
+        :return: The number of rows written
+        """
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            self._ready.clear()
+            self._full.clear()
+            if not pending:
+                return 0
+            try:
+                await self._write(pending)
+            except Exception:
+                self.stats.failures += 1
+                for key, data in pending.items():
+                    newer = self._pending.pop(key, {})
+                    self._pending[key] = data
+                    self._merge(key, newer)
+                self._ready.set()
+                raise
+            return len(pending)
+
+    async def _write(self, pending: dict[tuple, dict[str, Any]]) -> None:
+        crud = cast('CRUDPlus', self._crud)
+        table = cast(Table, crud.model.__table__)
+        mapper = inspect(crud.model)
+        key_columns = list(mapper.primary_key)
+        version = crud.version_column
+        start = time.perf_counter()
+
+        groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+        for key, data in pending.items():
+            data = {column: value for column, value in data.items() if column != version}
+            groups.setdefault(tuple(sorted(data)), []).append(
+                {
+                    **{f'_pk_{column.key}': value for column, value in zip(key_columns, key)},
+                    **{f'_set_{column}': value for column, value in data.items()},
+                }
+            )
+
+        async with self.sessionmaker() as session:
+            async with session.begin():
+                for columns, rows in groups.items():
+                    values = {}
+                    for column in columns:
+                        target = mapper.column_attrs[column].columns[0]
+                        value = bindparam(f'_set_{column}')
+                        values[target.key] = target + value if column in self.increment_columns else value
+                    if version is not None:
+                        target = mapper.column_attrs[version].columns[0]
+                        values[target.key] = target + 1
+                    stmt = (
+                        update(table)
+                        .where(*[column == bindparam(f'_pk_{column.key}') for column in key_columns])
+                        .values(values)
+                    )
+                    await session.execute(stmt, rows)
+                await crud._invalidate_caches(
+                    session,
+                    identity_tags=[
+                        *[IdentityCache.pk_tag(crud._cache_tag, key if len(key) > 1 else key[0]) for key in pending],
+                        IdentityCache.negative_tag(crud._cache_tag),
+                    ],
+                )
+
+        elapsed = time.perf_counter() - start
+        self.stats.rows += len(pending)
+        self.stats.flushes += 1
+        self.stats.flush_time += elapsed
+        self.stats.last_flush_time = elapsed
+
+    async def close(self) -> None:
+        """
+        Stop accepting updates, stop the background task and write the remaining rows.
+
+        :return:
+        """
+        self._closed = True
+        if self._task is not None:
+            # Wake the task for a last flush, after which it sees the buffer closed and exits
+            self._ready.set()
+            self._full.set()
+            await self._task
+            self._task = None
+        await self.flush()
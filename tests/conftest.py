@@ -1,10 +1,12 @@
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Any, AsyncGenerator, Callable, Mapping
 
 import pytest
 import pytest_asyncio
 
-from sqlalchemy import insert
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import Engine, create_engine, event, insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from sqlalchemy_crud_plus import CRUDPlus
 from tests.models.basic import Base, Ins, InsPks
@@ -12,6 +14,42 @@ from tests.models.no_relationship import NoRelBase, NoRelCategory, NoRelPost, No
 from tests.models.relationship import RelationBase, RelCategory, RelPost, RelProfile, RelRole, RelUser, user_role
 from tests.schemas.relationship import CreateRelPost, CreateRelProfile, CreateRelRole, CreateRelUser
 
+_benchmark_results = pytest.StashKey[list[str]]()
+
+
+def pytest_addoption(parser: pytest.Parser):
+    parser.addoption('--benchmark', action='store_true', default=False, help='Run the tests marked as benchmarks')
+
+
+def pytest_configure(config: pytest.Config):
+    config.addinivalue_line('markers', 'benchmark: opt-in timing benchmark, run with --benchmark')
+    config.stash[_benchmark_results] = []
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]):
+    if config.getoption('--benchmark'):
+        return
+    skip = pytest.mark.skip(reason='benchmark, run with --benchmark')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus: int, config: pytest.Config):
+    results = config.stash.get(_benchmark_results, [])
+    if results:
+        terminalreporter.section('benchmarks')
+        for line in results:
+            terminalreporter.write_line(line)
+
+
+@pytest.fixture
+def benchmark_report(request: pytest.FixtureRequest) -> Callable[[str], None]:
+    """Record a line of benchmark results, shown in the terminal summary."""
+    results = request.config.stash[_benchmark_results]
+    return lambda line: results.append(f'{request.node.name}: {line}')
+
+
 _async_engine = create_async_engine('sqlite+aiosqlite:///:memory:', future=True, echo=False)
 _async_db_session = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
 
@@ -25,6 +63,77 @@ async def setup_database():
         await conn.run_sync(NoRelBase.metadata.create_all)
 
 
+@contextmanager
+def statements(db: AsyncSession):
+    """Collect the SQL statements executed on the engine of a session."""
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    engine = db.bind.sync_engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield executed
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@asynccontextmanager
+async def new_session(db: AsyncSession):
+    """Open a second session on the engine of a session."""
+    async with AsyncSession(db.bind, expire_on_commit=False) as session:
+        yield session
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest_asyncio.fixture
+async def sqlite_engine(tmp_path: Path) -> AsyncGenerator[Callable[..., Any], None]:
+    """
+    Provide a factory of SQLite file databases holding the tables of every test model.
+
+    The factory takes the database name, the rows to insert per model, `sync=True` for a sync
+    engine and the engine options. Its engines are disposed after the test.
+    """
+    engines: list[AsyncEngine | Engine] = []
+
+    def create(
+        name: str = 'test',
+        rows: Mapping[type, list[dict[str, Any]]] | None = None,
+        sync: bool = False,
+        **kwargs: Any,
+    ) -> Any:
+        path = tmp_path / f'{name}.db'
+        setup = create_engine(f'sqlite:///{path}')
+        with setup.begin() as conn:
+            Base.metadata.create_all(conn)
+            RelationBase.metadata.create_all(conn)
+            for model, values in (rows or {}).items():
+                conn.execute(insert(model), values)
+        setup.dispose()
+        engine = (
+            create_engine(f'sqlite:///{path}', **kwargs)
+            if sync
+            else create_async_engine(f'sqlite+aiosqlite:///{path}', **kwargs)
+        )
+        engines.append(engine)
+        return engine
+
+    yield create
+    for engine in engines:
+        if isinstance(engine, AsyncEngine):
+            await engine.dispose()
+        else:
+            engine.dispose()
+
+
 @pytest.fixture
 def crud_ins() -> CRUDPlus[Ins]:
     """Provide CRUD instance for Ins model."""
@@ -29,3 +29,50 @@ class InsPks(Base):
     is_deleted: Mapped[bool] = mapped_column(default=False)
     created_time: Mapped[datetime] = mapped_column(init=False, default_factory=datetime.now)
     updated_time: Mapped[datetime | None] = mapped_column(init=False, onupdate=datetime.now)
+
+
+class InsArchive(Base):
+    __tablename__ = 'ins_archive'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(64))
+    is_deleted: Mapped[bool] = mapped_column(default=False)
+    created_time: Mapped[datetime] = mapped_column(init=False, default_factory=datetime.now)
+    updated_time: Mapped[datetime | None] = mapped_column(init=False, default=None)
+
+
+class InsTrash(Base):
+    __tablename__ = 'ins_trash'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    removed: Mapped[bool] = mapped_column('del_flag', default=False)
+    removed_at: Mapped[datetime | None] = mapped_column('del_at', default=None)
+
+
+class InsVersioned(Base):
+    __tablename__ = 'ins_versioned'
+
+    id: Mapped[int] = mapped_column(init=False, primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(64))
+    counter: Mapped[int] = mapped_column(default=0)
+    version: Mapped[int] = mapped_column(init=False, default=1)
+
+    __mapper_args__ = {'version_id_col': version}
+
+
+class InsJob(Base):
+    __tablename__ = 'ins_job'
+
+    id: Mapped[int] = mapped_column(init=False, primary_key=True, autoincrement=True)
+    payload: Mapped[str] = mapped_column(String(64))
+    status: Mapped[str] = mapped_column(String(16), default='pending')
+    worker: Mapped[str | None] = mapped_column(String(16), default=None)
+
+
+class InsTenant(Base):
+    __tablename__ = 'ins_tenant'
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    tenant_id: Mapped[int] = mapped_column(index=True)
+    name: Mapped[str] = mapped_column(String(64))
+    score: Mapped[int | None] = mapped_column(default=None)
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
 
 
 class CreateIns(BaseModel):
@@ -19,3 +21,18 @@ class CreateInsPks(BaseModel):
 
 class UpdateInsPks(BaseModel):
     name: str | None = None
+
+
+class CreateInsVersioned(BaseModel):
+    name: str
+    counter: int = 0
+
+
+class InsDetail(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    is_deleted: bool
+    created_time: datetime
+    updated_time: datetime | None = None
@@ -82,3 +82,27 @@ class RelRoleDetail(BaseModel):
 
     id: int
     name: str
+
+
+class RelCategoryName(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+
+
+class RelPostSummary(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str
+    category: RelCategoryName | None
+
+
+class RelUserWithPosts(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    profile: RelProfileDetail | None
+    posts: list[RelPostSummary]
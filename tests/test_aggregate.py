@@ -0,0 +1,165 @@
+import pytest
+import pytest_asyncio
+
+from sqlalchemy import and_
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from sqlalchemy_crud_plus import CRUDPlus, JoinConfig
+from sqlalchemy_crud_plus.errors import ColumnSortError, ModelColumnError, SelectOperatorError
+from tests.conftest import statements
+from tests.models.basic import InsPks, InsTenant
+from tests.models.relationship import RelPost, RelUser
+
+ROWS = [{'id': 5000 + i, 'tenant_id': i % 3, 'name': f'agg_{i % 4}', 'score': None if i == 0 else i} for i in range(12)]
+IDS = [row['id'] for row in ROWS]
+
+
+@pytest_asyncio.fixture
+async def tenant_rows(db: AsyncSession):
+    crud = CRUDPlus(InsTenant)
+    await crud.bulk_create_models(db, [dict(row) for row in ROWS], commit=True)
+    yield crud
+    await crud.delete_model_by_column(db, allow_multiple=True, id__in=IDS, commit=True)
+
+
+@pytest.mark.asyncio
+async def test_aggregate_totals(db: AsyncSession, tenant_rows: CRUDPlus[InsTenant]):
+    rows = await tenant_rows.aggregate(
+        db,
+        metrics={
+            'n': ('count', '*'),
+            'scored': ('count', 'score'),
+            'total': ('sum', 'score'),
+            'low': ('min', 'score'),
+            'high': ('max', 'score'),
+            'tenants': ('count_distinct', 'tenant_id'),
+        },
+        id__in=IDS,
+    )
+    assert [dict(row) for row in rows] == [
+        {'n': 12, 'scored': 11, 'total': 66, 'low': 1, 'high': 11, 'tenants': 3},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_aggregate_group_by(db: AsyncSession, tenant_rows: CRUDPlus[InsTenant]):
+    rows = await tenant_rows.aggregate(
+        db,
+        InsTenant.id.in_(IDS),
+        metrics={'n': ('count', '*'), 'total': ('sum', 'score'), 'mean': ('avg', 'score')},
+        group_by='tenant_id',
+        sort_columns='total',
+        sort_orders='desc',
+    )
+    assert [(row['tenant_id'], row['n'], row['total']) for row in rows] == [(2, 4, 26), (1, 4, 22), (0, 4, 18)]
+    assert rows[2]['mean'] == 6
+
+    rows = await tenant_rows.aggregate(
+        db,
+        metrics={'total': ('sum', 'score')},
+        group_by=['tenant_id', 'name'],
+        having={'total__ge': 8},
+        sort_columns=['tenant_id', 'name'],
+        limit=2,
+        id__in=IDS,
+    )
+    assert [(row['tenant_id'], row['name'], row['total']) for row in rows] == [(0, 'agg_1', 9), (1, 'agg_2', 10)]
+
+
+@pytest.mark.asyncio
+async def test_aggregate_stream(db: AsyncSession, tenant_rows: CRUDPlus[InsTenant]):
+    streamed = [
+        dict(row)
+        async for row in tenant_rows.aggregate_stream(
+            db, metrics={'n': ('count', '*')}, group_by='name', sort_columns='name', yield_per=2, id__in=IDS
+        )
+    ]
+    assert streamed == [{'name': f'agg_{i}', 'n': 3} for i in range(4)]
+
+
+@pytest.mark.asyncio
+async def test_aggregate_errors(db: AsyncSession, tenant_rows: CRUDPlus[InsTenant]):
+    with pytest.raises(SelectOperatorError):
+        await tenant_rows.aggregate(db, metrics={'x': ('median', 'score')})
+    with pytest.raises(SelectOperatorError):
+        await tenant_rows.aggregate(db, metrics={'x': ('sum', '*')})
+    with pytest.raises(ModelColumnError):
+        await tenant_rows.aggregate(db, metrics={'x': ('sum', 'missing')})
+    with pytest.raises(ModelColumnError):
+        await tenant_rows.aggregate(db, metrics={'x': ('sum', 'score')}, having={'y__gt': 1})
+    with pytest.raises(ColumnSortError):
+        await tenant_rows.aggregate(db, metrics={'x': ('sum', 'score')}, sort_columns='x', sort_orders=['asc', 'desc'])
+    with pytest.raises(ValueError):
+        await tenant_rows.aggregate(db, metrics={})
+
+
+@pytest.mark.asyncio
+async def test_count_many(db: AsyncSession, tenant_rows: CRUDPlus[InsTenant]):
+    facets = {
+        'tenant_0': {'tenant_id': 0},
+        'high': {'score__gt': 6},
+        'unscored': InsTenant.score.is_(None),
+        'all': {},
+    }
+    with statements(db) as executed:
+        counts = await tenant_rows.count_many(db, InsTenant.id.in_(IDS), facets=facets)
+    assert counts == {'tenant_0': 4, 'high': 5, 'unscored': 1, 'all': 12}
+    assert len(executed) == 1
+    assert 'FILTER (WHERE' in executed[0]
+
+    counts = await tenant_rows.count_many(db, facets={'high': {'score__gt': 6}}, group_by='tenant_id', id__in=IDS)
+    assert counts == {0: {'high': 1}, 1: {'high': 2}, 2: {'high': 2}}
+    assert await tenant_rows.count_many(db, group_by='name', id__in=IDS) == {f'agg_{i}': 3 for i in range(4)}
+    assert await tenant_rows.count_many(db, group_by=['tenant_id', 'name'], id__in=IDS, tenant_id=1) == {
+        (1, f'agg_{i}'): 1 for i in range(4)
+    }
+    assert await tenant_rows.count_many(db, facets={'none': {}}, id__in=[-1]) == {'none': 0}
+
+
+@pytest.mark.asyncio
+async def test_count_many_over_one_to_many_join(db: AsyncSession, rel_sample_data: dict):
+    crud = CRUDPlus(RelUser)
+    ids = [user.id for user in rel_sample_data['users']]
+    facets = {'first': {'name': 'user_1'}, 'titled': RelPost.title == 'Post 1', 'all': {}}
+
+    counts = await crud.count_many(db, RelUser.id.in_(ids), facets=facets, join_conditions=['posts'])
+    assert counts == {'first': 1, 'titled': 1, 'all': 3}
+    assert counts['all'] == await crud.count(db, RelUser.id.in_(ids), join_conditions=['posts'])
+    assert await crud.count_many(db, RelUser.id.in_(ids), group_by='name', join_conditions=['posts']) == {
+        f'user_{i}': 1 for i in range(1, 4)
+    }
+
+    stmt, *_ = crud._count_many_stmt(sqlite.dialect(), [RelUser.id.in_(ids)], facets, None, ['posts'], {})
+    assert 'FILTER (WHERE' not in str(stmt.compile(dialect=sqlite.dialect()))
+    assert tuple((await db.execute(stmt)).one()) == (1, 1, 3)
+
+
+@pytest.mark.asyncio
+async def test_count_many_composite_key_over_join(db: AsyncSession, tenant_rows: CRUDPlus[InsTenant]):
+    crud = CRUDPlus(InsPks)
+    db.add_all([InsPks(id=i, name=f'facet_{i}', sex='facet') for i in range(3)])
+    await db.commit()
+    join = JoinConfig(model=InsTenant, join_on=and_(InsPks.id == InsTenant.tenant_id, InsTenant.id.in_(IDS)))
+    try:
+        counts = await crud.count_many(
+            db,
+            facets={'first': {'id': 0}, 'high': InsTenant.score > 6, 'all': {}},
+            join_conditions=[join],
+            sex='facet',
+        )
+        assert counts == {'first': 1, 'high': 3, 'all': 3}
+        assert await crud.count_many(db, group_by='name', join_conditions=[join], sex='facet') == {
+            f'facet_{i}': 1 for i in range(3)
+        }
+    finally:
+        await crud.delete_model_by_column(db, allow_multiple=True, sex='facet', commit=True)
+
+
+def test_count_many_case_fallback():
+    stmt, names, group_size = CRUDPlus(InsTenant)._count_many_stmt(
+        mysql.dialect(), [], {'high': {'score__gt': 6}}, None, None, {}
+    )
+    assert names == ['high']
+    assert group_size == 0
+    assert 'count(CASE WHEN' in str(stmt.compile(dialect=mysql.dialect()))
@@ -0,0 +1,224 @@
+import asyncio
+
+from datetime import datetime
+
+import pytest
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from sqlalchemy_crud_plus import CRUDPlus
+from sqlalchemy_crud_plus.cache import CountCache, LRUStore, SingleFlight, statement_cache_key
+from tests.conftest import FakeClock, statements
+from tests.models.basic import Ins
+from tests.models.relationship import RelPost, RelUser
+
+
+class TestLRUStore:
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        store = LRUStore(maxsize=10, ttl=5, clock=clock)
+        store.set('a', 1)
+        clock.now = 4
+        assert store.get('a') == 1
+        clock.now = 6
+        assert store.get('a') is None
+        assert store.stats.expirations == 1
+
+    def test_lru_eviction(self):
+        store = LRUStore(maxsize=2, ttl=None)
+        store.set('a', 1)
+        store.set('b', 2)
+        store.get('a')
+        store.set('c', 3)
+        assert 'a' in store
+        assert 'b' not in store
+        assert store.stats.evictions == 1
+
+    def test_tag_invalidation(self):
+        store = LRUStore(maxsize=10)
+        store.set('a', 1, tags=['t1'])
+        store.set('b', 2, tags=['t1', 't2'])
+        store.set('c', 3, tags=['t2'])
+        assert store.invalidate('t1') == 2
+        assert len(store) == 1
+        assert store.invalidate('t2') == 1
+        assert len(store) == 0
+
+    def test_invalid_maxsize(self):
+        with pytest.raises(ValueError):
+            LRUStore(maxsize=0)
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_coalesce(self):
+        single_flight = SingleFlight()
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        results = await asyncio.gather(*[single_flight.do('key', loader) for _ in range(10)])
+        assert results == [1] * 10
+        assert calls == 1
+        assert single_flight.coalesced == 9
+        assert len(single_flight) == 0
+
+    @pytest.mark.asyncio
+    async def test_error_propagation(self):
+        single_flight = SingleFlight()
+
+        async def loader():
+            await asyncio.sleep(0.01)
+            raise RuntimeError('boom')
+
+        results = await asyncio.gather(*[single_flight.do('key', loader) for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_leader_cancellation(self):
+        single_flight = SingleFlight()
+        calls = []
+        leader_cancelled = asyncio.Event()
+
+        def loader(caller: str):
+            async def load():
+                calls.append(caller)
+                try:
+                    await asyncio.sleep(0.02)
+                except asyncio.CancelledError:
+                    leader_cancelled.set()
+                    raise
+                return caller
+
+            return load
+
+        leader = asyncio.ensure_future(single_flight.do('key', loader('leader')))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(single_flight.do('key', loader(f'follower_{i}'))) for i in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        # The leader's loader is cancelled with it, the first follower runs the call again for the others
+        assert await asyncio.gather(*followers) == ['follower_0'] * 3
+        assert leader.cancelled()
+        assert leader_cancelled.is_set()
+        assert calls == ['leader', 'follower_0']
+        assert len(single_flight) == 0
+
+    @pytest.mark.asyncio
+    async def test_loader_cancelled_without_waiters(self):
+        single_flight = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def loader():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        callers = [asyncio.ensure_future(single_flight.do('key', loader)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await asyncio.sleep(0)
+        assert len(single_flight) == 0
+
+
+def test_statement_cache_key_normalizes_params():
+    crud = CRUDPlus(Ins)
+    key1 = statement_cache_key(crud._count_stmt([Ins.id.in_([1, 2])]))
+    key2 = statement_cache_key(crud._count_stmt([Ins.id.in_([1, 2])]))
+    key3 = statement_cache_key(crud._count_stmt([Ins.id.in_([1, 3])]))
+    assert key1 == key2
+    assert key1 != key3
+
+
+@pytest.mark.asyncio
+async def test_count_cache_hit(db: AsyncSession, sample_ins: list[Ins]):
+    crud = CRUDPlus(Ins, count_cache=CountCache())
+
+    with statements(db) as executed:
+        first = await crud.count(db, name='item_1', is_deleted=False)
+        second = await crud.count(db, is_deleted=False, name='item_1')
+
+    assert first == second
+    assert len(executed) == 1
+    assert crud.count_cache.stats.hits == 1
+    assert crud.count_cache.stats.misses == 1
+    assert crud.count_cache.stats.hit_rate == 0.5
+
+
+@pytest.mark.asyncio
+async def test_count_cache_invalidated_by_write(db: AsyncSession, sample_ins: list[Ins]):
+    crud = CRUDPlus(Ins, count_cache=CountCache())
+    before = await crud.count(db, name__startswith='item_')
+
+    await crud.bulk_create_models(db, [{'name': 'item_new', 'created_time': datetime.now()}], commit=True)
+
+    assert len(crud.count_cache) == 0
+    assert await crud.count(db, name__startswith='item_') == before + 1
+
+    await crud.delete_model_by_column(db, name='item_new', commit=True)
+    assert await crud.count(db, name__startswith='item_') == before
+
+
+@pytest.mark.asyncio
+async def test_count_cache_bypassed_with_uncommitted_writes(db: AsyncSession, sample_ins: list[Ins]):
+    cache = CountCache()
+    crud = CRUDPlus(Ins, count_cache=cache)
+    before = await crud.count(db)
+
+    await crud.bulk_create_models(db, [{'name': 'uncommitted', 'created_time': datetime.now()}])
+    assert await crud.count(db) == before + 1
+    assert len(cache) == 0
+
+    await db.rollback()
+    assert await crud.count(db) == before
+    assert len(cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_count_cache_ttl(db: AsyncSession, sample_ins: list[Ins]):
+    clock = FakeClock()
+    crud = CRUDPlus(Ins, count_cache=CountCache(ttl=10, clock=clock))
+
+    with statements(db) as executed:
+        await crud.count(db)
+        await crud.count(db)
+        clock.now = 11
+        await crud.count(db)
+
+    assert len(executed) == 2
+    assert crud.count_cache.stats.expirations == 1
+
+
+@pytest.mark.asyncio
+async def test_count_cache_single_flight(db: AsyncSession, sample_ins: list[Ins]):
+    crud = CRUDPlus(Ins, count_cache=CountCache())
+
+    with statements(db) as executed:
+        results = await asyncio.gather(*[crud.count(db, is_deleted=True) for _ in range(20)])
+
+    assert len(set(results)) == 1
+    assert len(executed) == 1
+    assert crud.count_cache.stats.coalesced == 19
+
+
+@pytest.mark.asyncio
+async def test_count_cache_shared_join_invalidation(db: AsyncSession, rel_sample_data: dict):
+    cache = CountCache()
+    user_crud = CRUDPlus(RelUser, count_cache=cache)
+    post_crud = CRUDPlus(RelPost, count_cache=cache)
+
+    await user_crud.count(db, join_conditions=['posts'])
+    await user_crud.count(db)
+    assert len(cache) == 2
+
+    await post_crud.update_model(db, rel_sample_data['posts'][0].id, {'title': 'changed'}, commit=True)
+    assert len(cache) == 1
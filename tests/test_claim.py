@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+from typing import Callable
+
+import pytest
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from sqlalchemy_crud_plus import CRUDPlus
+from tests.models.basic import InsJob
+
+
+async def create_jobs(session: AsyncSession, count: int, prefix: str) -> list[int]:
+    jobs = [InsJob(payload=f'{prefix}_{i}') for i in range(count)]
+    session.add_all(jobs)
+    await session.commit()
+    return [job.id for job in jobs]
+
+
+@pytest.mark.asyncio
+async def test_claim_batch(db: AsyncSession):
+    crud = CRUDPlus(InsJob)
+    ids = await create_jobs(db, 5, 'claim')
+
+    claimed = await crud.claim_batch(
+        db, 3, {'status': 'running', 'worker': 'w1'}, InsJob.id.in_(ids), status='pending', commit=True
+    )
+
+    assert sorted(job.id for job in claimed) == ids[:3]
+    assert all(job.status == 'running' and job.worker == 'w1' for job in claimed)
+    assert await crud.count(db, id__in=ids, status='pending') == 2
+
+    claimed = await crud.claim_batch(
+        db, 3, {'status': 'running'}, InsJob.id.in_(ids), status='pending', sort_columns='id', sort_orders='desc'
+    )
+    assert sorted(job.id for job in claimed) == ids[3:]
+    assert await crud.claim_batch(db, 3, {'status': 'running'}, InsJob.id.in_(ids), status='pending') == []
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_claim_batch_without_update_returning(db: AsyncSession, monkeypatch: pytest.MonkeyPatch):
+    crud = CRUDPlus(InsJob)
+    ids = await create_jobs(db, 4, 'fallback')
+    monkeypatch.setattr(db.bind.dialect, 'update_returning', False)
+
+    claimed = await crud.claim_batch(db, 3, {'status': 'running'}, InsJob.id.in_(ids), status='pending', commit=True)
+
+    assert sorted(job.id for job in claimed) == ids[:3]
+    assert all(job.status == 'running' for job in claimed)
+
+
+@pytest.mark.asyncio
+async def test_claim_batch_invalid_size(db: AsyncSession):
+    with pytest.raises(ValueError):
+        await CRUDPlus(InsJob).claim_batch(db, 0, {'status': 'running'})
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('workers', [1, 2, 4, 8])
+async def test_claim_batch_concurrent_workers(sqlite_engine: Callable, workers: int):
+    session_factory = async_sessionmaker(sqlite_engine('queue'), expire_on_commit=False)
+    crud = CRUDPlus(InsJob)
+    async with session_factory() as session:
+        ids = await create_jobs(session, 400, 'bench')
+    processed: list[int] = []
+
+    async def worker(name: str) -> None:
+        async with session_factory() as session:
+            while jobs := await crud.claim_batch(
+                session, 10, {'status': 'done', 'worker': name}, status='pending', commit=True
+            ):
+                processed.extend(job.id for job in jobs)
+                await asyncio.sleep(0)
+
+    await asyncio.gather(*[worker(f'w{i}') for i in range(workers)])
+    assert sorted(processed) == ids
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_claim_batch_throughput_benchmark(sqlite_engine: Callable, benchmark_report: Callable):
+    # SQLite serializes writers, the sweep shows the contention overhead rather than scaling
+    for workers in (1, 2, 4, 8):
+        session_factory = async_sessionmaker(sqlite_engine(f'queue_{workers}'), expire_on_commit=False)
+        crud = CRUDPlus(InsJob)
+        async with session_factory() as session:
+            ids = await create_jobs(session, 2000, 'bench')
+        processed: list[int] = []
+
+        async def worker(name: str) -> None:
+            async with session_factory() as session:
+                while jobs := await crud.claim_batch(
+                    session, 10, {'status': 'done', 'worker': name}, status='pending', commit=True
+                ):
+                    processed.extend(job.id for job in jobs)
+                    await asyncio.sleep(0)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker(f'w{i}') for i in range(workers)])
+        elapsed = time.perf_counter() - start
+
+        assert sorted(processed) == ids
+        benchmark_report(f'{workers} workers: {len(processed) / elapsed:.0f} jobs/s')
@@ -0,0 +1,163 @@
+import asyncio
+import time
+
+from datetime import datetime
+from typing import Callable
+
+import pytest
+
+from sqlalchemy import event, func
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import object_session
+
+from sqlalchemy_crud_plus import CRUDPlus
+from sqlalchemy_crud_plus.concurrency import gather_reads
+from sqlalchemy_crud_plus.errors import ConcurrentReadError, ModelColumnError
+from tests.models.basic import Ins
+
+DELAY = 0.01
+
+
+def slow_database(sqlite_engine: Callable) -> AsyncEngine:
+    """SQLite file database whose `sleep()` function blocks for `DELAY` seconds."""
+    rows = [{'id': i, 'name': f'read_{i}', 'created_time': datetime.now()} for i in range(1, 11)]
+    engine = sqlite_engine('reads', rows={Ins: rows}, pool_size=10)
+
+    @event.listens_for(engine.sync_engine, 'connect')
+    def register_sleep(dbapi_connection, connection_record):
+        dbapi_connection.create_function('sleep', 0, lambda: time.sleep(DELAY) or 0)
+
+    return engine
+
+
+def detail_reads(crud: CRUDPlus[Ins]):
+    # The function is evaluated per scanned row, so every read takes at least DELAY seconds
+    slow = func.sleep() == 0
+    return {
+        'item': lambda s: crud.select_model(s, 1, slow),
+        'total': lambda s: crud.count(s, slow),
+        'deleted': lambda s: crud.count(s, slow, is_deleted=True),
+        'exists': lambda s: crud.exists(s, slow, name='read_2'),
+        'latest': lambda s: crud.select_models_order(s, 'id', 'desc', slow, limit=3),
+    }
+
+
+@pytest.mark.asyncio
+async def test_gather_reads(sqlite_engine: Callable):
+    engine = slow_database(sqlite_engine)
+    results = await gather_reads(engine, detail_reads(CRUDPlus(Ins)))
+
+    assert results['item'].name == 'read_1'
+    assert object_session(results['item']) is None
+    assert results['total'] == 10
+    assert results['deleted'] == 0
+    assert results['exists'] is True
+    assert [ins.id for ins in results['latest']] == [10, 9, 8]
+
+
+@pytest.mark.asyncio
+async def test_gather_reads_overlap(sqlite_engine: Callable):
+    engine = slow_database(sqlite_engine)
+    reads = detail_reads(CRUDPlus(Ins))
+
+    async def in_flight(concurrency: int) -> tuple[int, list]:
+        running, peak, connections = 0, 0, []
+        all_started = asyncio.Event()
+
+        def track(read):
+            async def run(session: AsyncSession):
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                connection = await session.connection()
+                connections.append(connection.sync_connection.connection.dbapi_connection)
+                if running == len(reads):
+                    all_started.set()
+                # Reads waiting for each other only all start when none of them is serialized behind another
+                if concurrency >= len(reads):
+                    await asyncio.wait_for(all_started.wait(), 5)
+                try:
+                    return await read(session)
+                finally:
+                    running -= 1
+
+            return run
+
+        await gather_reads(engine, {name: track(read) for name, read in reads.items()}, concurrency=concurrency)
+        return peak, connections
+
+    peak, connections = await in_flight(len(reads))
+    assert peak == len(reads)
+    assert len({id(connection) for connection in connections}) == len(reads)
+    assert (await in_flight(1))[0] == 1
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_gather_reads_latency_benchmark(sqlite_engine: Callable, benchmark_report: Callable):
+    engine = slow_database(sqlite_engine)
+    reads = detail_reads(CRUDPlus(Ins))
+    await gather_reads(engine, reads)  # Open the pooled connections
+
+    start = time.perf_counter()
+    async with AsyncSession(engine) as session:
+        for read in reads.values():
+            await read(session)
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await gather_reads(engine, reads)
+    concurrent = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await gather_reads(engine, reads, concurrency=1)
+    capped = time.perf_counter() - start
+
+    benchmark_report(
+        f'{len(reads)} reads of at least {DELAY:.3f}s: serial {serial:.3f}s, '
+        f'gather_reads {concurrent:.3f}s, concurrency=1 {capped:.3f}s'
+    )
+
+
+@pytest.mark.asyncio
+async def test_gather_reads_aggregates_errors(sqlite_engine: Callable):
+    engine = slow_database(sqlite_engine)
+    crud = CRUDPlus(Ins)
+    reads = {
+        'total': lambda s: crud.count(s),
+        'bad_column': lambda s: crud.count(s, missing=1),
+        'slow': lambda s: crud.count(s, func.sleep() == 0),
+    }
+    with pytest.raises(ConcurrentReadError) as exc_info:
+        await gather_reads(engine, reads, timeout=DELAY * 3)
+
+    assert exc_info.value.results == {'total': 10}
+    assert set(exc_info.value.errors) == {'bad_column', 'slow'}
+    assert isinstance(exc_info.value.errors['bad_column'], ModelColumnError)
+    assert isinstance(exc_info.value.errors['slow'], asyncio.TimeoutError)
+
+
+@pytest.mark.asyncio
+async def test_gather_reads_cancellation(sqlite_engine: Callable):
+    engine = slow_database(sqlite_engine)
+    crud = CRUDPlus(Ins)
+    started = asyncio.Event()
+    cancelled = []
+
+    async def blocked(session: AsyncSession):
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    task = asyncio.ensure_future(gather_reads(engine, {'total': lambda s: crud.count(s), 'blocked': blocked}))
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert cancelled == [True]
+    with pytest.raises(ValueError):
+        await gather_reads(engine, {}, concurrency=0)
@@ -1,10 +1,12 @@
+from datetime import datetime
+
 import pytest
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from sqlalchemy_crud_plus import CRUDPlus
 from sqlalchemy_crud_plus.errors import ModelColumnError
-from tests.models.basic import Ins
+from tests.models.basic import Ins, InsArchive, InsTrash
 
 
 @pytest.mark.asyncio
@@ -438,3 +440,112 @@ async def test_delete_model_by_column_with_custom_deleted_at_column(
         assert updated_item is not None
         assert updated_item.is_deleted is True
         assert updated_item.updated_time is not None
+
+
+@pytest.mark.asyncio
+async def test_delete_model_by_column_in_batches(db: AsyncSession, sample_ins: list[Ins], crud_ins: CRUDPlus[Ins]):
+    ids = [item.id for item in sample_ins]
+    batches = []
+
+    async def on_progress(progress):
+        batches.append(progress.rows)
+
+    count = await crud_ins.delete_model_by_column(
+        db, allow_multiple=True, batch_size=4, batch_interval=0.001, on_progress=on_progress, id__in=ids
+    )
+
+    assert count == 10
+    assert batches == [4, 8, 10]
+    assert await crud_ins.count(db, id__in=ids) == 0
+
+
+@pytest.mark.asyncio
+async def test_logical_delete_in_batches(db: AsyncSession, sample_ins: list[Ins], crud_ins: CRUDPlus[Ins]):
+    ids = [item.id for item in sample_ins]
+
+    count = await crud_ins.delete_model_by_column(
+        db, allow_multiple=True, logical_deletion=True, batch_size=3, id__in=ids, is_deleted=False
+    )
+
+    assert count == 5
+    assert await crud_ins.count(db, id__in=ids, is_deleted=True) == 10
+
+
+@pytest.mark.asyncio
+async def test_delete_model_by_column_in_batches_invalid_size(db: AsyncSession, crud_ins: CRUDPlus[Ins]):
+    with pytest.raises(ValueError):
+        await crud_ins.delete_model_by_column(db, allow_multiple=True, batch_size=0, name='item_1')
+
+
+@pytest.mark.asyncio
+async def test_purge_deleted(db: AsyncSession, sample_ins: list[Ins], crud_ins: CRUDPlus[Ins]):
+    ids = [item.id for item in sample_ins]
+    await crud_ins.delete_model_by_column(
+        db,
+        allow_multiple=True,
+        logical_deletion=True,
+        deleted_at_column='updated_time',
+        deleted_at_factory=datetime(2020, 1, 1),
+        id__in=ids[:6],
+        commit=True,
+    )
+    reported = []
+
+    progress = await crud_ins.purge_deleted(
+        db,
+        before=datetime(2021, 1, 1),
+        archive=InsArchive,
+        deleted_at_column='updated_time',
+        batch_size=4,
+        on_progress=lambda p: reported.append(p.rows),
+    )
+
+    assert progress.rows >= 6
+    assert progress.rows_per_second > 0
+    assert reported[-1] == progress.rows
+    assert await crud_ins.count(db, id__in=ids) == 4
+    archived = await CRUDPlus(InsArchive).select_models(db, id__in=ids[:6])
+    assert [item.name for item in archived] == [item.name for item in sample_ins[:6]]
+    assert all(item.is_deleted for item in archived)
+
+
+@pytest.mark.asyncio
+async def test_purge_deleted_keeps_recent_rows(db: AsyncSession, sample_ins: list[Ins], crud_ins: CRUDPlus[Ins]):
+    ids = [item.id for item in sample_ins]
+    await crud_ins.delete_model_by_column(
+        db, allow_multiple=True, logical_deletion=True, deleted_at_column='updated_time', id__in=ids, commit=True
+    )
+
+    progress = await crud_ins.purge_deleted(
+        db, before=datetime(2021, 1, 1), deleted_at_column='updated_time', resume_after=ids[-1]
+    )
+
+    assert progress.batches == 0
+    assert await crud_ins.count(db, id__in=ids) == 10
+
+
+@pytest.mark.asyncio
+async def test_purge_deleted_invalid_column(db: AsyncSession, crud_ins: CRUDPlus[Ins]):
+    with pytest.raises(ModelColumnError):
+        await crud_ins.purge_deleted(db, before=datetime(2021, 1, 1))
+
+
+@pytest.mark.asyncio
+async def test_purge_deleted_attribute_names(db: AsyncSession):
+    crud = CRUDPlus(InsTrash)
+    await crud.bulk_create_models(
+        db,
+        [
+            {'id': 7301, 'removed': True, 'removed_at': datetime(2020, 1, 1)},
+            {'id': 7302, 'removed': True, 'removed_at': datetime(2022, 1, 1)},
+            {'id': 7303, 'removed': False, 'removed_at': None},
+        ],
+        commit=True,
+    )
+
+    progress = await crud.purge_deleted(
+        db, before=datetime(2021, 1, 1), deleted_flag_column='removed', deleted_at_column='removed_at'
+    )
+
+    assert progress.rows == 1
+    assert [item.id for item in await crud.select_models(db, id__in=[7301, 7302, 7303])] == [7302, 7303]
@@ -0,0 +1,200 @@
+from datetime import datetime
+from types import MappingProxyType
+
+import pytest
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from sqlalchemy_crud_plus import CRUDPlus, IdentityCache
+from tests.conftest import FakeClock, new_session, statements
+from tests.models.basic import Ins, InsArchive, InsPks
+from tests.models.relationship import RelProfile
+
+
+@pytest.mark.asyncio
+async def test_identity_cache_primary_key_hit(db: AsyncSession, sample_ins: list[Ins]):
+    crud = CRUDPlus(Ins, identity_cache=IdentityCache())
+    item = sample_ins[0]
+    await crud.select_model(db, item.id)
+
+    async with new_session(db) as session:
+        with statements(session) as executed:
+            cached = await crud.select_model(session, item.id)
+
+        assert executed == []
+        assert cached.id == item.id
+        assert cached.name == item.name
+        assert cached in session
+        assert not session.dirty
+
+    assert crud.identity_cache.stats.hits == 1
+    assert crud.identity_cache.stats.hit_rate == 0.5
+
+
+@pytest.mark.asyncio
+async def test_identity_cache_composite_primary_key(db: AsyncSession):
+    crud = CRUDPlus(InsPks, identity_cache=IdentityCache())
+    await crud.bulk_create_models(
+        db, [{'id': 4000, 'name': 'identity_pks', 'sex': 'men', 'created_time': datetime.now()}], commit=True
+    )
+    await crud.select_model(db, (4000, 'men'))
+
+    with statements(db) as executed:
+        cached = await crud.select_model(db, (4000, 'men'))
+
+    assert executed == []
+    assert cached.name == 'identity_pks'
+
+
+@pytest.mark.asyncio
+async def test_identity_cache_unique_column(db: AsyncSession, rel_sample_profiles: list[RelProfile]):
+    crud = CRUDPlus(RelProfile, identity_cache=IdentityCache())
+    profile = rel_sample_profiles[0]
+    await crud.select_model_by_column(db, user_id=profile.user_id)
+
+    with statements(db) as executed:
+        cached = await crud.select_model_by_column(db, user_id__eq=profile.user_id)
+        await crud.select_model_by_column(db, bio=profile.bio)
+
+    assert cached.id == profile.id
+    assert len(executed) == 1
+
+
+@pytest.mark.asyncio
+async def test_identity_cache_negative_ttl(db: AsyncSession, sample_ins: list[Ins]):
+    clock = FakeClock()
+    crud = CRUDPlus(Ins, identity_cache=IdentityCache(negative_ttl=5, clock=clock))
+
+    with statements(db) as executed:
+        assert await crud.select_model(db, 99999) is None
+        assert await crud.select_model(db, 99999) is None
+        clock.now = 6
+        assert await crud.select_model(db, 99999) is None
+
+    assert len(executed) == 2
+
+
+@pytest.mark.asyncio
+async def test_identity_cache_negative_entry_invalidated_by_create(db: AsyncSession, sample_ins: list[Ins]):
+    crud = CRUDPlus(Ins, identity_cache=IdentityCache())
+    new_id = sample_ins[-1].id + 1000
+    assert await crud.select_model(db, new_id) is None
+
+    await crud.bulk_create_models(db, [{'id': new_id, 'name': 'created', 'created_time': datetime.now()}], commit=True)
+
+    assert (await crud.select_model(db, new_id)).name == 'created'
+
+
+@pytest.mark.asyncio
+async def test_identity_cache_invalidated_by_update_model(db: AsyncSession, sample_ins: list[Ins]):
+    crud = CRUDPlus(Ins, identity_cache=IdentityCache())
+    item_id, other_id = sample_ins[0].id, sample_ins[1].id
+    await crud.select_model(db, item_id)
+    await crud.select_model(db, other_id)
+
+    await crud.update_model(db, item_id, {'name': 'renamed'}, commit=True)
+
+    assert len(crud.identity_cache) == 1
+    async with new_session(db) as session:
+        assert (await crud.select_model(session, item_id)).name == 'renamed'
+
+
+@pytest.mark.asyncio
+async def test_identity_cache_invalidated_by_delete_model(db: AsyncSession, sample_ins: list[Ins]):
+    crud = CRUDPlus(Ins, identity_cache=IdentityCache())
+    item_id = sample_ins[0].id
+    await crud.select_model(db, item_id)
+
+    await crud.delete_model(db, item_id, commit=True)
+
+    assert await crud.select_model(db, item_id) is None
+
+
+@pytest.mark.asyncio
+async def test_identity_cache_invalidated_by_column_and_bulk_writes(db: AsyncSession, sample_ins: list[Ins]):
+    crud = CRUDPlus(Ins, identity_cache=IdentityCache())
+    first, second = sample_ins[0].id, sample_ins[1].id
+    await crud.select_model(db, first)
+
+    await crud.update_model_by_column(db, {'name': 'by_column'}, id=first, commit=True)
+    async with new_session(db) as session:
+        assert (await crud.select_model(session, first)).name == 'by_column'
+
+    await crud.bulk_update_models(db, [{'id': first, 'name': 'bulk'}], commit=True)
+    async with new_session(db) as session:
+        assert (await crud.select_model(session, first)).name == 'bulk'
+
+    await crud.select_model(db, second)
+    await crud.delete_model_by_column(db, id=second, commit=True)
+    assert await crud.select_model(db, second) is None
+
+
+@pytest.mark.asyncio
+async def test_identity_cache_bypassed_with_uncommitted_writes(db: AsyncSession, sample_ins: list[Ins]):
+    crud = CRUDPlus(Ins, identity_cache=IdentityCache())
+    item_id = sample_ins[0].id
+
+    await crud.update_model(db, item_id, {'name': 'uncommitted'})
+    assert (await crud.select_model(db, item_id)).name == 'uncommitted'
+    assert len(crud.identity_cache) == 0
+
+    await db.rollback()
+    async with new_session(db) as session:
+        assert (await crud.select_model(session, item_id)).name == 'item_1'
+
+
+@pytest.mark.asyncio
+async def test_select_snapshot(db: AsyncSession, sample_ins: list[Ins]):
+    crud = CRUDPlus(Ins, identity_cache=IdentityCache())
+    item = sample_ins[0]
+
+    async with new_session(db) as session:
+        snapshot = await crud.select_snapshot(session, item.id)
+        with statements(session) as executed:
+            cached = await crud.select_snapshot(session, item.id)
+
+        assert executed == []
+        assert isinstance(cached, MappingProxyType)
+        assert cached['name'] == item.name
+        assert len(session.identity_map) == 0
+        with pytest.raises(TypeError):
+            snapshot['name'] = 'changed'
+
+    assert await crud.select_snapshot(db, 99999) is None
+    assert crud.identity_cache.memory_usage() > 0
+
+
+@pytest.mark.asyncio
+async def test_identity_cache_shared_by_models(db: AsyncSession, sample_ins: list[Ins]):
+    cache = IdentityCache()
+    ins_crud, archive_crud = CRUDPlus(Ins, identity_cache=cache), CRUDPlus(InsArchive, identity_cache=cache)
+    item = sample_ins[0]
+    await archive_crud.bulk_create_models(
+        db, [{'id': item.id, 'name': 'archived', 'created_time': datetime.now()}], commit=True
+    )
+
+    assert (await ins_crud.select_model(db, item.id)).name == item.name
+    assert (await archive_crud.select_model(db, item.id)).name == 'archived'
+    assert (await ins_crud.select_snapshot(db, item.id))['name'] == item.name
+    assert (await archive_crud.select_snapshot(db, item.id))['name'] == 'archived'
+
+    # Writes to one table leave the entries of the other in place
+    await archive_crud.update_model(db, item.id, {'name': 'renamed'}, commit=True)
+    async with new_session(db) as session:
+        with statements(session) as executed:
+            assert (await ins_crud.select_model(session, item.id)).name == item.name
+        assert executed == []
+        assert (await archive_crud.select_model(session, item.id)).name == 'renamed'
+
+
+@pytest.mark.asyncio
+async def test_identity_cache_copies_mutable_values(db: AsyncSession):
+    cache = IdentityCache()
+    row = {'id': 1, 'tags': ['a'], 'extra': {'level': 1}}
+    cache.set(db, ('ins', 'pk', 1), row, 1, 'ins')
+    row['tags'].append('b')
+
+    snapshot = cache.get(db, ('ins', 'pk', 1))
+    assert snapshot == {'id': 1, 'tags': ['a'], 'extra': {'level': 1}}
+    snapshot['extra']['level'] = 2
+    assert cache.get(db, ('ins', 'pk', 1))['extra'] == {'level': 1}
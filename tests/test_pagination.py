@@ -1,9 +1,13 @@
+from datetime import datetime
+
 import pytest
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from sqlalchemy_crud_plus import CRUDPlus
-from tests.models.basic import Ins
+from sqlalchemy_crud_plus import CRUDPlus, JoinConfig
+from tests.conftest import statements
+from tests.models.basic import Ins, InsPks
+from tests.models.relationship import RelPost, RelUser
 
 
 class TestPaginationBasic:
@@ -179,3 +183,74 @@ class TestPaginationWithRelationships:
     ):
         results = await crud_ins.select_models(db, is_deleted=False, created_time__is_not=None, limit=2, offset=1)
         assert len(results) <= 2
+
+
+class TestPrimaryKeyFirstPagination:
+    @pytest.mark.asyncio
+    async def test_join_does_not_split_pages(self, db: AsyncSession, rel_sample_data: dict):
+        crud = CRUDPlus(RelUser)
+        ids = sorted(user.id for user in rel_sample_data['users'])
+
+        joined = await crud.select_models_order(
+            db, 'id', 'desc', RelUser.id.in_(ids), join_conditions=['posts'], limit=2, offset=1, pk_first=True
+        )
+        assert [user.id for user in joined] == ids[::-1][1:3]
+
+        with statements(db) as executed:
+            page = await crud.select_models_order(
+                db,
+                'name',
+                'asc',
+                RelUser.id.in_(ids),
+                join_conditions=['posts'],
+                load_strategies={'posts': 'joinedload'},
+                limit=2,
+                pk_first=True,
+            )
+        assert [user.name for user in page] == sorted(user.name for user in rel_sample_data['users'])[:2]
+        assert all(len(user.posts) == 2 for user in page)
+        assert len(executed) == 2
+        assert 'DISTINCT' in executed[0]
+
+    @pytest.mark.asyncio
+    async def test_deep_offset(self, db: AsyncSession, sample_ins: list[Ins], crud_ins: CRUDPlus[Ins]):
+        ids = [ins.id for ins in sample_ins]
+        expected = await crud_ins.select_models_order(db, 'name', 'desc', Ins.id.in_(ids), limit=3, offset=4)
+        page = await crud_ins.select_models_order(db, 'name', 'desc', Ins.id.in_(ids), limit=3, offset=4, pk_first=True)
+        assert [ins.id for ins in page] == [ins.id for ins in expected]
+
+        page = await crud_ins.select_models(db, Ins.id.in_(ids), limit=2, offset=len(ids) - 1, pk_first=True)
+        assert [ins.id for ins in page] == [max(ids)]
+        assert await crud_ins.select_models(db, Ins.id.in_(ids), offset=len(ids), pk_first=True) == []
+
+    @pytest.mark.asyncio
+    async def test_composite_primary_key(self, db: AsyncSession, crud_ins_pks: CRUDPlus[InsPks]):
+        rows = [
+            {
+                'id': 6000 + i // 2,
+                'name': f'pk_first_{i}',
+                'sex': 'men' if i % 2 else 'women',
+                'created_time': datetime.now(),
+            }
+            for i in range(6)
+        ]
+        await crud_ins_pks.bulk_create_models(db, rows, commit=True)
+
+        page = await crud_ins_pks.select_models_order(
+            db, 'name', 'desc', name__startswith='pk_first_', limit=2, offset=1, pk_first=True
+        )
+        assert [ins.name for ins in page] == ['pk_first_4', 'pk_first_3']
+
+    @pytest.mark.asyncio
+    async def test_fill_result_is_rejected(self, db: AsyncSession):
+        with pytest.raises(ValueError):
+            await CRUDPlus(RelUser).select_models(
+                db,
+                join_conditions=[JoinConfig(model=RelPost, join_on=RelUser.id == RelPost.author_id, fill_result=True)],
+                pk_first=True,
+            )
+
+    @pytest.mark.asyncio
+    async def test_count_distinct_over_join(self, db: AsyncSession, rel_sample_data: dict):
+        ids = [user.id for user in rel_sample_data['users']]
+        assert await CRUDPlus(RelUser).count(db, RelUser.id.in_(ids), join_conditions=['posts']) == len(ids)
@@ -0,0 +1,90 @@
+import asyncio
+
+from contextlib import AsyncExitStack
+
+import pytest
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from sqlalchemy_crud_plus import CRUDPlus, ReadCoalescer
+from tests.conftest import statements
+from tests.models.basic import Ins
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_reads_execute_once(db: AsyncSession, sample_ins: list[Ins]):
+    crud = CRUDPlus(Ins, read_coalescer=ReadCoalescer())
+    ids = [ins.id for ins in sample_ins]
+
+    async with AsyncExitStack() as stack:
+        sessions = [await stack.enter_async_context(AsyncSession(db.bind, expire_on_commit=False)) for _ in range(200)]
+        with statements(db) as executed:
+            results = await asyncio.gather(
+                *[crud.select_models_order(session, 'id', 'asc', id__in=ids) for session in sessions]
+            )
+
+        assert len(executed) == 1
+        assert crud.read_coalescer.coalesced == 199
+        assert len(crud.read_coalescer) == 0
+        for session, result in zip(sessions, results):
+            assert [ins.id for ins in result] == ids
+            assert all(ins in session for ins in result)
+            assert not session.dirty
+
+
+@pytest.mark.asyncio
+async def test_different_parameters_are_not_coalesced(db: AsyncSession, sample_ins: list[Ins]):
+    crud = CRUDPlus(Ins, read_coalescer=ReadCoalescer())
+
+    with statements(db) as executed:
+        first, second = await asyncio.gather(
+            crud.select_models(db, id=sample_ins[0].id),
+            crud.select_models(db, id=sample_ins[1].id),
+        )
+
+    assert len(executed) == 2
+    assert first[0].id == sample_ins[0].id
+    assert second[0].id == sample_ins[1].id
+
+
+@pytest.mark.asyncio
+async def test_write_detaches_reads_in_flight(db: AsyncSession, sample_ins: list[Ins]):
+    coalescer = ReadCoalescer()
+    crud = CRUDPlus(Ins, read_coalescer=coalescer)
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_loader():
+        started.set()
+        await release.wait()
+        return []
+
+    stmt = await crud.select(id=sample_ins[0].id)
+    leader = asyncio.create_task(coalescer.load(db, stmt, Ins, slow_loader))
+    await started.wait()
+    assert len(coalescer) == 1
+
+    assert coalescer.invalidate(Ins.__tablename__) == 1
+    assert len(coalescer) == 0
+
+    release.set()
+    assert await leader == []
+    assert coalescer.coalesced == 0
+
+
+@pytest.mark.asyncio
+async def test_leader_error_propagates(db: AsyncSession):
+    coalescer = ReadCoalescer()
+    crud = CRUDPlus(Ins, read_coalescer=coalescer)
+    stmt = await crud.select(name='missing')
+
+    async def failing_loader():
+        await asyncio.sleep(0.01)
+        raise RuntimeError('boom')
+
+    results = await asyncio.gather(
+        *[coalescer.load(db, stmt, Ins, failing_loader) for _ in range(5)], return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(coalescer) == 0
@@ -1,11 +1,26 @@
+import time
+
+from typing import Callable
+
 import pytest
 
+from sqlalchemy import inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from sqlalchemy_crud_plus import CRUDPlus
+from sqlalchemy_crud_plus import CRUDPlus, utils
 from sqlalchemy_crud_plus.errors import LoadingStrategyError, ModelColumnError
-from tests.models.relationship import RelCategory, RelUser
+from sqlalchemy_crud_plus.loading import LoadStrategyAdvisor
+from sqlalchemy_crud_plus.types import JoinConfig
+from sqlalchemy_crud_plus.utils import (
+    apply_join_conditions,
+    build_load_strategies,
+    compile_join_plan,
+    compile_load_plan,
+)
+from tests.conftest import statements
+from tests.models.relationship import RelCategory, RelPost, RelProfile, RelUser
+from tests.schemas.relationship import RelPostDetail, RelUserWithPosts
 
 
 @pytest.mark.asyncio
@@ -486,3 +501,179 @@ async def test_combined_load_options_and_load_strategies(
     assert hasattr(user, 'posts')
     assert hasattr(user, 'profile')
     assert isinstance(user.posts, list)
+
+
+@pytest.mark.asyncio
+async def test_load_strategies_auto(db: AsyncSession, rel_sample_data: dict):
+    users = rel_sample_data['users']
+    posts = rel_sample_data['posts']
+    advisor = LoadStrategyAdvisor(min_parents=1, subquery_fanout=1)
+    crud_user = CRUDPlus(RelUser, load_advisor=advisor)
+    crud_post = CRUDPlus(RelPost, load_advisor=advisor)
+
+    post = await crud_post.select_model(db, posts[0].id, load_strategies={'author': 'auto'})
+    assert post.author.id == posts[0].author_id
+    assert advisor.fanout(RelPost, 'author') is None
+
+    ids = [user.id for user in users]
+    loaded = await crud_user.select_models(
+        db, RelUser.id.in_(ids), load_strategies={'posts': 'auto', 'profile': 'auto'}
+    )
+    assert sum(len(user.posts) for user in loaded) == len(posts)
+    assert advisor.fanout(RelUser, 'posts') == len(posts) / len(users)
+    assert advisor.choose(RelUser, 'posts') == 'subqueryload'
+
+    again = await crud_user.select_models_order(db, 'id', 'asc', RelUser.id.in_(ids), load_strategies={'posts': 'auto'})
+    assert [len(user.posts) for user in again] == [len(user.posts) for user in sorted(loaded, key=lambda u: u.id)]
+
+
+@pytest.mark.asyncio
+async def test_load_strategies_nested_paths(db: AsyncSession, rel_sample_data: dict, rel_crud_user: CRUDPlus[RelUser]):
+    ids = [user.id for user in rel_sample_data['users']]
+    strategies = {'posts': 'selectinload', 'posts.category': 'joinedload', 'posts.author.profile': 'joinedload'}
+
+    with statements(db) as executed:
+        users = await rel_crud_user.select_models(db, RelUser.id.in_(ids), load_strategies=strategies)
+        posts = [post for user in users for post in user.posts]
+        assert len(posts) == len(rel_sample_data['posts'])
+        assert {post.category.name for post in posts if post.category_id is not None}
+        assert any(post.author.profile is not None for post in posts)
+    # Users, posts joined with their category, and authors (selectinload by default) joined with their profile
+    assert len(executed) == 3
+
+
+@pytest.mark.asyncio
+async def test_load_strategies_nested_paths_invalid(db: AsyncSession, rel_crud_user: CRUDPlus[RelUser]):
+    with pytest.raises(ModelColumnError):
+        await rel_crud_user.select_models(db, load_strategies={'posts.missing': 'joinedload'})
+    with pytest.raises(ModelColumnError):
+        await rel_crud_user.select_models(db, load_strategies=['name.posts'])
+    with pytest.raises(LoadingStrategyError):
+        await rel_crud_user.select_models(db, load_strategies={'posts.category': 'invalid'})
+
+
+@pytest.mark.asyncio
+async def test_response_schema_projection(db: AsyncSession, rel_sample_data: dict, rel_crud_user: CRUDPlus[RelUser]):
+    ids = [user.id for user in rel_sample_data['users']]
+    db.expunge_all()
+
+    with statements(db) as executed:
+        users = await rel_crud_user.select_models_order(
+            db, 'id', 'asc', RelUser.id.in_(ids), response_schema=RelUserWithPosts
+        )
+        data = [RelUserWithPosts.model_validate(user) for user in users]
+    # Users joined with their profile, and posts joined with their category
+    assert len(executed) == 2
+    assert all('parent_id' not in statement for statement in executed)
+    assert sum(len(user.posts) for user in data) == len(rel_sample_data['posts'])
+
+    category = next(post.category for user in users for post in user.posts if post.category is not None)
+    assert 'parent_id' not in inspect(category).dict
+
+
+@pytest.mark.asyncio
+async def test_response_schema_select_model(db: AsyncSession, rel_sample_data: dict, rel_crud_post: CRUDPlus[RelPost]):
+    post_id = rel_sample_data['posts'][0].id
+    db.expunge_all()
+
+    post = await rel_crud_post.select_model(db, post_id, response_schema=RelPostDetail)
+    assert RelPostDetail.model_validate(post).id == post_id
+    assert post is await rel_crud_post.select_model_by_column(db, id=post_id, response_schema=RelPostDetail)
+
+
+@pytest.mark.asyncio
+async def test_join_and_load_plans(db: AsyncSession, rel_sample_data: dict, rel_crud_user: CRUDPlus[RelUser]):
+    ids = [user.id for user in rel_sample_data['users']]
+    join_plan = compile_join_plan(
+        RelUser, [JoinConfig(model=RelProfile, join_on=RelUser.id == RelProfile.user_id, fill_result=True)]
+    )
+    load_plan = compile_load_plan(RelUser, {'posts': 'selectinload', 'posts.category': 'joinedload'})
+
+    rows = await rel_crud_user.select_models(
+        db, RelUser.id.in_(ids), join_conditions=join_plan, load_strategies=load_plan
+    )
+    assert len(rows) == len(ids)
+    assert all(profile is None or profile.user_id == user.id for user, profile in rows)
+    assert all('posts' in inspect(user).dict for user, _ in rows)
+    assert await rel_crud_user.count(db, RelUser.id.in_(ids), join_conditions=compile_join_plan(RelUser, ['posts']))
+
+    with pytest.raises(ValueError):
+        await rel_crud_user.select_models(db, load_strategies=compile_load_plan(RelPost, ['author']))
+
+
+def test_plans_skip_per_call_compilation(monkeypatch: pytest.MonkeyPatch):
+    compiled = []
+
+    def counting_compile(*args):
+        compiled.append(args)
+        return compile_join(*args)
+
+    compile_join = utils._compile_join_plan
+    monkeypatch.setattr(utils, '_compile_join_plan', counting_compile)
+
+    def from_specs():
+        join_conditions = [
+            'posts',
+            JoinConfig(model=RelProfile, join_on=RelUser.id == RelProfile.user_id, join_type='inner'),
+        ]
+        stmt = apply_join_conditions(RelUser, select(RelUser), join_conditions)
+        return stmt.options(*build_load_strategies(RelUser, {'roles': 'selectinload', 'posts.category': 'joinedload'}))
+
+    join_plan = compile_join_plan(
+        RelUser,
+        ['posts', JoinConfig(model=RelProfile, join_on=RelUser.id == RelProfile.user_id, join_type='inner')],
+    )
+    load_plan = compile_load_plan(RelUser, {'roles': 'selectinload', 'posts.category': 'joinedload'})
+
+    def from_plans():
+        return join_plan.apply(select(RelUser)).options(*build_load_strategies(RelUser, load_plan))
+
+    assert str(from_specs()) == str(from_plans())
+
+    # Conditions holding JoinConfig expressions are compiled on every call, plans never are
+    compiled.clear()
+    lookups = utils._cached_load_plan.cache_info()
+    for _ in range(3):
+        from_plans()
+    assert compiled == []
+    assert utils._cached_load_plan.cache_info() == lookups
+    assert compile_join_plan(RelUser, join_plan) is join_plan
+    assert compile_load_plan(RelUser, load_plan) is load_plan
+
+    for _ in range(3):
+        from_specs()
+    assert len(compiled) == 3
+    # Loading strategies given by value are looked up, not compiled again
+    assert utils._cached_load_plan.cache_info().misses == lookups.misses
+
+
+@pytest.mark.benchmark
+def test_plans_per_call_overhead_benchmark(benchmark_report: Callable):
+    calls = 2000
+
+    def per_call(build) -> float:
+        start = time.perf_counter()
+        for _ in range(calls):
+            build()
+        return (time.perf_counter() - start) / calls
+
+    def from_specs():
+        join_conditions = [
+            'posts',
+            JoinConfig(model=RelProfile, join_on=RelUser.id == RelProfile.user_id, join_type='inner'),
+        ]
+        stmt = apply_join_conditions(RelUser, select(RelUser), join_conditions)
+        return stmt.options(*build_load_strategies(RelUser, {'roles': 'selectinload', 'posts.category': 'joinedload'}))
+
+    join_plan = compile_join_plan(
+        RelUser,
+        ['posts', JoinConfig(model=RelProfile, join_on=RelUser.id == RelProfile.user_id, join_type='inner')],
+    )
+    load_plan = compile_load_plan(RelUser, {'roles': 'selectinload', 'posts.category': 'joinedload'})
+
+    def from_plans():
+        return join_plan.apply(select(RelUser)).options(*build_load_strategies(RelUser, load_plan))
+
+    assert str(from_specs()) == str(from_plans())
+    specs, plans = per_call(from_specs), per_call(from_plans)
+    benchmark_report(f'per call: specs {specs * 1e6:.1f}us, plans {plans * 1e6:.1f}us')
@@ -0,0 +1,316 @@
+import asyncio
+import pickle
+import time
+
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from sqlalchemy_crud_plus import CRUDPlus, IdentityCache, ReadCoalescer
+from sqlalchemy_crud_plus.cache import MemoryCacheBackend, ResultCache, dumps_rows, loads_rows
+from sqlalchemy_crud_plus.errors import CacheBackendError
+from sqlalchemy_crud_plus.redis_cache import _INVALIDATE_SCRIPT, _SET_SCRIPT, RedisCacheBackend, RedisClient
+from tests.conftest import FakeClock, new_session, statements
+from tests.models.basic import Ins
+
+
+class FakeRedisServer:
+    """In-memory server implementing the subset of Redis commands used by the cache backend."""
+
+    def __init__(self):
+        self.data: dict[bytes, tuple[object, float | None]] = {}
+        self.server: asyncio.Server | None = None
+        self.port = 0
+        self.delay = 0.0
+        self.scripts = {_SET_SCRIPT: self._set_script, _INVALIDATE_SCRIPT: self._invalidate_script}
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, '127.0.0.1', 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def _get(self, key: bytes):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def _set_script(self, keys: list[bytes], argv: list[bytes]) -> bytes:
+        ttl = int(argv[1]) / 1000 if argv[1] else None
+        self.data[keys[0]] = (argv[0], None if ttl is None else time.monotonic() + ttl)
+        for tag_key in keys[1:]:
+            members = self._get(tag_key)
+            expires_at = None if ttl is None else time.monotonic() + ttl
+            if members is not None and ttl is not None:
+                # Only extended, and kept persistent
+                current = self.data[tag_key][1]
+                expires_at = None if current is None else max(current, expires_at)
+            self.data[tag_key] = ((members or set()) | {keys[0]}, expires_at)
+        return b':1\r\n'
+
+    def _invalidate_script(self, keys: list[bytes], argv: list[bytes]) -> bytes:
+        members = self._get(keys[0]) or set()
+        for key in [*members, keys[0]]:
+            self.data.pop(key, None)
+        return b':%d\r\n' % len(members)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                header = await reader.readuntil(b'\r\n')
+                args = []
+                for _ in range(int(header[1:-2])):
+                    length = int((await reader.readuntil(b'\r\n'))[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                writer.write(self.dispatch(args[0].upper().decode(), args[1:]))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    def dispatch(self, command: str, args: list[bytes]) -> bytes:
+        if command == 'PING':
+            return b'+PONG\r\n'
+        if command == 'GET':
+            value = self._get(args[0])
+            return b'$-1\r\n' if value is None else b'$%d\r\n%s\r\n' % (len(value), value)
+        if command == 'SET':
+            expires_at = time.monotonic() + int(args[3]) / 1000 if len(args) > 2 else None
+            self.data[args[0]] = (args[1], expires_at)
+            return b'+OK\r\n'
+        if command == 'DEL':
+            deleted = sum(1 for key in args if self.data.pop(key, None) is not None)
+            return b':%d\r\n' % deleted
+        if command == 'EVAL':
+            # Scripts are run by Python equivalents, the server has no Lua interpreter
+            keys = args[2 : 2 + int(args[1])]
+            return self.scripts[args[0].decode()](keys, args[2 + int(args[1]) :])
+        if command == 'SCAN':
+            keys = [key for key in self.data if key.startswith(args[2].rstrip(b'*'))]
+            return b'*2\r\n$1\r\n0\r\n*%d\r\n' % len(keys) + b''.join(b'$%d\r\n%s\r\n' % (len(k), k) for k in keys)
+        return b'-ERR unknown command\r\n'
+
+
+@asynccontextmanager
+async def redis_server():
+    server = FakeRedisServer()
+    await server.start()
+    try:
+        yield server
+    finally:
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_result_cache_hit_rehydrates_into_session(db: AsyncSession, sample_ins: list[Ins]):
+    crud = CRUDPlus(Ins, result_cache=ResultCache())
+    first = await crud.select_models_order(db, 'id', 'asc', name__startswith='item_')
+
+    async with new_session(db) as session:
+        with statements(session) as executed:
+            second = await crud.select_models_order(session, 'id', 'asc', name__startswith='item_')
+
+        assert executed == []
+        assert [ins.id for ins in second] == [ins.id for ins in first]
+        assert [ins.name for ins in second] == [ins.name for ins in first]
+        assert all(ins in session for ins in second)
+        assert not session.dirty
+
+    assert crud.result_cache.stats.hits == 1
+    assert crud.result_cache.stats.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_keep_pending_changes(db: AsyncSession, sample_ins: list[Ins]):
+    pk = sample_ins[0].id
+    result_crud = CRUDPlus(Ins, result_cache=ResultCache())
+    identity_crud = CRUDPlus(Ins, identity_cache=IdentityCache())
+    reads = [
+        lambda session: result_crud.select_models(session, id=pk),
+        lambda session: identity_crud.select_model(session, pk),
+    ]
+    for read in reads:
+        async with new_session(db) as session:
+            await read(session)
+            instance = await session.get(Ins, pk)
+            instance.name = 'local-change'
+            with statements(session) as executed:
+                result = await read(session)
+            # Served by the cache, the read does not autoflush
+            assert executed == []
+            assert (result[0] if isinstance(result, list) else result) is instance
+            assert instance.name == 'local-change'
+            assert instance in session.dirty
+
+    crud = CRUDPlus(Ins, read_coalescer=ReadCoalescer())
+    async with new_session(db) as leader, new_session(db) as follower:
+        instance = await crud.select_model(follower, pk)
+        instance.name = 'local-change'
+        _, followed = await asyncio.gather(crud.select_models(leader, id=pk), crud.select_models(follower, id=pk))
+        assert crud.read_coalescer.coalesced == 1
+        assert followed[0] is instance
+        assert instance.name == 'local-change'
+        assert instance in follower.dirty
+
+
+@pytest.mark.asyncio
+async def test_result_cache_select_model(db: AsyncSession, sample_ins: list[Ins]):
+    crud = CRUDPlus(Ins, result_cache=ResultCache())
+    item = sample_ins[0]
+
+    assert (await crud.select_model(db, item.id)).name == item.name
+    async with new_session(db) as session:
+        with statements(session) as executed:
+            cached = await crud.select_model(session, item.id)
+            missing = await crud.select_model(session, 99999)
+            missing_again = await crud.select_model(session, 99999)
+
+    assert cached.id == item.id
+    assert missing is None and missing_again is None
+    assert len(executed) == 1
+
+
+@pytest.mark.asyncio
+async def test_result_cache_invalidated_by_write(db: AsyncSession, sample_ins: list[Ins]):
+    crud = CRUDPlus(Ins, result_cache=ResultCache())
+    item_id = sample_ins[0].id
+    assert (await crud.select_models(db, id=item_id))[0].name == 'item_1'
+
+    await crud.update_model(db, item_id, {'name': 'renamed'}, commit=True)
+
+    async with new_session(db) as session:
+        assert (await crud.select_models(session, id=item_id))[0].name == 'renamed'
+
+
+@pytest.mark.asyncio
+async def test_result_cache_bypassed_for_loader_options(db: AsyncSession, sample_ins: list[Ins]):
+    crud = CRUDPlus(Ins, result_cache=ResultCache())
+    await crud.select_models(db, load_strategies={'name': 'defer'})
+
+    assert crud.result_cache.stats.misses == 0
+    assert crud.result_cache.stats.hits == 0
+
+
+@pytest.mark.asyncio
+async def test_result_cache_lru_and_ttl(db: AsyncSession, sample_ins: list[Ins]):
+    clock = FakeClock()
+    backend = MemoryCacheBackend(maxsize=1, clock=clock)
+    crud = CRUDPlus(Ins, result_cache=ResultCache(backend=backend, ttl=10))
+
+    await crud.select_models(db, id=sample_ins[0].id)
+    await crud.select_models(db, id=sample_ins[1].id)
+    assert len(backend.store) == 1
+    assert backend.store.stats.evictions == 1
+
+    clock.now = 11
+    await crud.select_models(db, id=sample_ins[1].id)
+    assert crud.result_cache.stats.hits == 0
+    assert crud.result_cache.stats.misses == 3
+
+
+@pytest.mark.asyncio
+async def test_result_cache_redis_backend(db: AsyncSession, sample_ins: list[Ins]):
+    async with redis_server() as server:
+        client = RedisClient(port=server.port)
+        crud = CRUDPlus(Ins, result_cache=ResultCache(backend=RedisCacheBackend(client)))
+        item_id = sample_ins[0].id
+
+        first = await crud.select_models(db, id=item_id)
+        async with new_session(db) as session:
+            with statements(session) as executed:
+                second = await crud.select_models(session, id=item_id)
+        assert executed == []
+        assert [ins.id for ins in second] == [ins.id for ins in first]
+
+        await crud.delete_model(db, item_id, commit=True)
+        assert await crud.select_models(db, id=item_id) == []
+        assert crud.result_cache.stats.errors == 0
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_tag_outlives_values():
+    async with redis_server() as server:
+        client = RedisClient(port=server.port)
+        backend = RedisCacheBackend(client)
+        await backend.set('long', b'1', ttl=10, tags=['ins'])
+        await backend.set('short', b'2', ttl=0.05, tags=['ins'])
+        await backend.set('forever', b'3', tags=['other'])
+        await backend.set('later', b'4', ttl=0.05, tags=['other'])
+        await asyncio.sleep(0.1)
+
+        # The short TTL of the last value did not shorten the tag sets
+        await backend.invalidate('ins')
+        await backend.invalidate('other')
+        assert [await backend.get(key) for key in ('long', 'short', 'forever', 'later')] == [None] * 4
+        assert server.data == {}
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_result_cache_backend_failure_falls_back(db: AsyncSession, sample_ins: list[Ins]):
+    async with redis_server() as server:
+        port = server.port
+
+    crud = CRUDPlus(Ins, result_cache=ResultCache(backend=RedisCacheBackend(RedisClient(port=port, timeout=1))))
+    result = await crud.select_models(db, id=sample_ins[0].id)
+
+    assert len(result) == 1
+    assert crud.result_cache.stats.errors == 2
+
+
+@pytest.mark.asyncio
+async def test_redis_client_cancelled_command():
+    async with redis_server() as server:
+        client = RedisClient(port=server.port)
+        await client.execute('SET', 'a', 'first')
+        await client.execute('SET', 'b', 'second')
+
+        server.delay = 0.2
+        task = asyncio.create_task(client.execute('GET', 'a'))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        server.delay = 0
+
+        # The reply of the cancelled command must not be read as the reply of the next one
+        assert await client.execute('GET', 'b') == b'second'
+        with pytest.raises(CacheBackendError):
+            await client.execute('UNKNOWN')
+        assert await client.execute('PING') == 'PONG'
+        await client.close()
+
+
+def test_result_cache_serializer():
+    rows = [
+        {
+            'id': 1,
+            'name': 'row',
+            'created_time': datetime(2024, 1, 2, 3, 4, 5),
+            'day': date(2024, 1, 2),
+            'delay': timedelta(seconds=90),
+            'amount': Decimal('1.10'),
+            'token': uuid4(),
+            'payload': b'\x00\xff',
+            'extra': {'tags': ['a'], 'score': None},
+        }
+    ]
+    assert loads_rows(dumps_rows(rows)) == rows
+    assert ResultCache().loads is loads_rows
+
+    # Data read back from a shared backend is never unpickled
+    with pytest.raises(ValueError):
+        loads_rows(pickle.dumps(rows))
+    with pytest.raises(TypeError):
+        dumps_rows([{'value': object()}])
@@ -0,0 +1,170 @@
+import asyncio
+import random
+
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError, ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from sqlalchemy_crud_plus.routing import (
+    LatencyWeightedPolicy,
+    LeastOutstandingPolicy,
+    Replica,
+    ReplicaRouter,
+    RoutingCRUDPlus,
+)
+from tests.conftest import FakeClock
+from tests.models.basic import Ins
+
+
+def databases(sqlite_engine: Callable, *names: str) -> list[AsyncEngine]:
+    """Create SQLite file databases holding one `Ins` row named after the database."""
+    return [
+        sqlite_engine(name, rows={Ins: [{'id': 1, 'name': name, 'created_time': datetime.now()}]}) for name in names
+    ]
+
+
+def broken_engine(tmp_path: Path) -> AsyncEngine:
+    return create_async_engine(f'sqlite+aiosqlite:///{tmp_path / "missing" / "replica.db"}')
+
+
+@pytest.mark.asyncio
+async def test_reads_round_robin_across_replicas(sqlite_engine: Callable):
+    primary, *replicas = databases(sqlite_engine, 'primary', 'replica_0', 'replica_1')
+    router = ReplicaRouter(primary, replicas)
+    crud = RoutingCRUDPlus(Ins, router)
+
+    async with router.session() as session:
+        names = [(await crud.select_models(session))[0].name for _ in range(4)]
+        assert (await crud.select_model(session, 1)).name == 'replica_0'
+        assert await crud.count(session) == 1
+        assert await crud.exists(session, name='replica_0')
+        assert (await crud.aggregate(session, metrics={'n': ('count', '*')}, name='replica_1'))[0]['n'] == 1
+        assert not session.in_transaction()
+
+    assert names == ['replica_0', 'replica_1', 'replica_0', 'replica_1']
+    assert all(replica.latency is not None for replica in router.replicas)
+
+
+@pytest.mark.asyncio
+async def test_select_rows_reads_replica(sqlite_engine: Callable):
+    primary, replica = databases(sqlite_engine, 'primary', 'replica_0')
+    router = ReplicaRouter(primary, [replica])
+    crud = RoutingCRUDPlus(Ins, router)
+
+    async with router.session() as session:
+        assert [row['name'] for row in await crud.select_rows(session, sort_columns='id')] == ['replica_0']
+        assert router.replicas[0].latency is not None
+
+        await crud.bulk_create_models(session, [{'name': 'pending', 'created_time': datetime.now()}], flush=True)
+        assert [row['name'] for row in await crud.select_rows(session, sort_columns='id')] == ['primary', 'pending']
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_window(sqlite_engine: Callable):
+    primary, replica = databases(sqlite_engine, 'primary', 'replica_0')
+    clock = FakeClock()
+    router = ReplicaRouter(primary, [replica], read_your_writes=5, clock=clock)
+    crud = RoutingCRUDPlus(Ins, router)
+
+    async with router.session() as session:
+        await crud.update_model(session, 1, {'name': 'written'}, commit=True)
+        assert (await crud.select_model(session, 1)).name == 'written'
+        await session.commit()
+
+        clock.now = 6
+        assert (await crud.select_model(session, 1)).name == 'replica_0'
+
+
+@pytest.mark.asyncio
+async def test_open_transaction_reads_primary(sqlite_engine: Callable):
+    primary, replica = databases(sqlite_engine, 'primary', 'replica_0')
+    router = ReplicaRouter(primary, [replica], read_your_writes=0)
+    crud = RoutingCRUDPlus(Ins, router)
+
+    async with router.session() as session:
+        await crud.bulk_create_models(session, [{'name': 'pending', 'created_time': datetime.now()}], flush=True)
+        assert await crud.count(session) == 2
+        await session.rollback()
+        assert await crud.count(session) == 1
+
+
+@pytest.mark.asyncio
+async def test_failover_to_next_replica_and_primary(tmp_path: Path, sqlite_engine: Callable):
+    primary, replica = databases(sqlite_engine, 'primary', 'replica_1')
+    clock = FakeClock()
+    router = ReplicaRouter(primary, [broken_engine(tmp_path), replica], cooldown=10, clock=clock)
+    crud = RoutingCRUDPlus(Ins, router)
+
+    async with router.session() as session:
+        assert (await crud.select_model(session, 1)).name == 'replica_1'
+        assert router.replicas[0].failures == 1
+        assert router.candidates() == [router.replicas[1]]
+
+        clock.now = 11
+        assert len(router.candidates()) == 2
+
+    router = ReplicaRouter(primary, [broken_engine(tmp_path)])
+    crud = RoutingCRUDPlus(Ins, router)
+    async with router.session() as session:
+        assert (await crud.select_model(session, 1)).name == 'primary'
+
+
+@pytest.mark.asyncio
+async def test_failover_only_on_connection_errors(sqlite_engine: Callable):
+    primary, replica = databases(sqlite_engine, 'primary', 'replica_0')
+    router = ReplicaRouter(primary, [replica])
+    replica_state = router.replicas[0]
+
+    async def invalid_statement(_):
+        raise ProgrammingError('SELECT', {}, Exception('syntax error'))
+
+    async with router.session() as session:
+        with pytest.raises(ProgrammingError):
+            await router.read(session, invalid_statement)
+        assert (replica_state.failures, replica_state.unavailable_until, replica_state.outstanding) == (0, 0, 0)
+
+        async def invalidated_on_replica(read_session):
+            if read_session is not session:
+                raise DBAPIError('SELECT', {}, Exception('connection lost'), connection_invalidated=True)
+            return await read_session.scalar(select(Ins.name))
+
+        assert await router.read(session, invalidated_on_replica) == 'primary'
+        assert replica_state.failures == 1
+
+
+@pytest.mark.asyncio
+async def test_failover_from_stalled_replica(sqlite_engine: Callable):
+    primary, stalled, replica = databases(sqlite_engine, 'primary', 'replica_0', 'replica_1')
+    router = ReplicaRouter(primary, [stalled, replica], timeout=0.05)
+    crud = RoutingCRUDPlus(Ins, router)
+    stalled_sessions = router.replicas[0].sessionmaker
+
+    async def read_name(read_session):
+        if read_session.bind is stalled_sessions.kw['bind']:
+            await asyncio.sleep(10)
+        return await read_session.scalar(select(Ins.name))
+
+    async with router.session() as session:
+        assert await router.read(session, read_name) == 'replica_1'
+        assert (router.replicas[0].failures, router.replicas[0].outstanding) == (1, 0)
+        assert (await crud.select_model(session, 1)).name == 'replica_1'
+
+
+def test_least_outstanding_policy():
+    replicas = [Replica(name=f'replica_{i}', sessionmaker=None, outstanding=n) for i, n in enumerate([3, 1, 2])]  # type: ignore[arg-type]
+    assert LeastOutstandingPolicy().choose(replicas) is replicas[1]
+
+
+def test_latency_weighted_policy():
+    fast = Replica(name='fast', sessionmaker=None, latency=0.001)  # type: ignore[arg-type]
+    slow = Replica(name='slow', sessionmaker=None, latency=0.1)  # type: ignore[arg-type]
+    policy = LatencyWeightedPolicy(rng=random.Random(0))
+
+    chosen = [policy.choose([fast, slow]) for _ in range(1000)]
+    assert chosen.count(fast) > 900
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import time
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Callable
+
+import pytest
+
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from sqlalchemy_crud_plus import CRUDPlus
+from sqlalchemy_crud_plus.serialize import RowSerializer
+from tests.models.basic import Ins
+from tests.models.relationship import RelPost, RelUser
+from tests.schemas.basic import CreateIns, InsDetail
+
+ROWS = 20000
+
+
+def listing(sqlite_engine: Callable, rows: int = ROWS) -> AsyncEngine:
+    """SQLite file database with a large `ins` table."""
+    now = datetime.now()
+    data = [{'name': f'row_{i}', 'is_deleted': i % 2 == 0, 'created_time': now} for i in range(rows)]
+    return sqlite_engine('listing', rows={Ins: data})
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Thread pool counting the chunks submitted to it."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+@asynccontextmanager
+async def loop_lag(interval: float = 0.001):
+    """Record how late a ticker task wakes up, the event loop lag."""
+    lags = []
+
+    async def tick():
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - start - interval)
+
+    task = asyncio.create_task(tick())
+    await asyncio.sleep(interval * 2)
+    try:
+        yield lags
+    finally:
+        task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_select_rows(db: AsyncSession, sample_ins: list[Ins], crud_ins: CRUDPlus[Ins]):
+    rows = await crud_ins.select_rows(db, sort_columns='id', sort_orders='desc', limit=2, is_deleted=False)
+    assert [row['id'] for row in rows] == sorted((ins.id for ins in sample_ins if not ins.is_deleted), reverse=True)[:2]
+    assert set(rows[0]) == {'id', 'name', 'is_deleted', 'created_time', 'updated_time'}
+    assert all(type(row) is dict for row in rows)
+
+    rows = await crud_ins.select_rows(db, response_schema=CreateIns, id=sample_ins[0].id)
+    assert rows == [{'name': sample_ins[0].name, 'is_deleted': sample_ins[0].is_deleted}]
+
+
+@pytest.mark.asyncio
+async def test_select_rows_join(db: AsyncSession, rel_sample_data: dict, rel_crud_user: CRUDPlus[RelUser]):
+    authors = {post.author_id for post in rel_sample_data['posts']}
+    ids = [user.id for user in rel_sample_data['users']]
+    rows = await rel_crud_user.select_rows(
+        db, RelUser.id.in_(ids), RelPost.title.is_not(None), join_conditions=['posts']
+    )
+    assert {row['id'] for row in rows} == authors
+    assert set(rows[0]) == {'id', 'name'}
+
+
+@pytest.mark.asyncio
+async def test_row_serializer(db: AsyncSession, sample_ins: list[Ins], crud_ins: CRUDPlus[Ins]):
+    rows = await crud_ins.select_rows(db, sort_columns='id', id__in=[ins.id for ins in sample_ins])
+    serializer = RowSerializer(InsDetail, chunk_size=3)
+
+    models = await serializer.to_models(rows)
+    assert models == [InsDetail.model_validate(ins) for ins in sorted(sample_ins, key=lambda ins: ins.id)]
+    data = await serializer.to_json(rows)
+    assert json.loads(data) == [model.model_dump(mode='json') for model in models]
+    assert await serializer.to_json([]) == b'[]'
+    assert await serializer.to_models([]) == []
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        assert await RowSerializer(InsDetail, pool, chunk_size=4).to_json(rows) == data
+
+    with pytest.raises(ValueError):
+        RowSerializer(InsDetail, chunk_size=0)
+
+
+@pytest.mark.asyncio
+async def test_row_serializer_large_result(sqlite_engine: Callable):
+    crud = CRUDPlus(Ins)
+    adapter = TypeAdapter(list[InsDetail])
+    async with AsyncSession(listing(sqlite_engine)) as session:
+        rows = await crud.select_rows(session)
+    assert len(rows) == ROWS
+
+    async with loop_lag() as inline_lags:
+        inline = adapter.dump_json(adapter.validate_python(rows))
+        await asyncio.sleep(0.01)
+
+    with CountingExecutor(max_workers=2) as pool:
+        serializer = RowSerializer(InsDetail, pool, chunk_size=500)
+        await serializer.to_json(rows[:1])
+        pool.submitted = 0
+        async with loop_lag() as pooled_lags:
+            pooled = await serializer.to_json(rows)
+    # The result is encoded off the event loop in chunks and joined into the same JSON
+    assert pool.submitted == ROWS // 500
+    assert pooled == inline
+    # Inline encoding blocks the loop for its whole duration, the pool only for the chunk handoffs
+    assert max(pooled_lags) < max(inline_lags)
@@ -0,0 +1,146 @@
+import time
+
+from typing import Callable
+
+import pytest
+
+from sqlalchemy import event, func
+from sqlalchemy.exc import IntegrityError
+
+from sqlalchemy_crud_plus import CRUDPlus
+from sqlalchemy_crud_plus.errors import PartialShardWriteError, ShardingError, ShardTimeoutError
+from sqlalchemy_crud_plus.sharding import ShardedCRUDPlus, _sort_key
+from tests.models.basic import InsTenant
+
+ROWS = [
+    {'id': i, 'tenant_id': i % 6, 'name': f'row_{i}', 'score': None if i % 7 == 0 else (i * 37) % 11}
+    for i in range(1, 31)
+]
+
+
+def shard_of(tenant_id: int) -> str:
+    return f'shard_{tenant_id % 3}'
+
+
+async def sharded_crud(sqlite_engine: Callable, **kwargs):
+    engines = {f'shard_{i}': sqlite_engine(f'shard_{i}') for i in range(3)}
+    crud = ShardedCRUDPlus(InsTenant, shard_of, engines, shard_column='tenant_id', **kwargs)
+    await crud.bulk_create_models([dict(row) for row in ROWS])
+    return crud, engines
+
+
+@pytest.mark.asyncio
+async def test_writes_are_routed_by_shard_key(sqlite_engine: Callable):
+    crud, engines = await sharded_crud(sqlite_engine)
+    for name, sessionmaker in crud.shards.items():
+        async with sessionmaker() as session:
+            rows = await CRUDPlus(InsTenant).select_models(session)
+        assert rows
+        assert all(shard_of(row.tenant_id) == name for row in rows)
+
+    await crud.update_model(1, {'name': 'updated'}, shard_key=1)
+    assert (await crud.select_model(1, shard_key=1)).name == 'updated'
+    assert await crud.delete_model(1, shard_key=1) == 1
+    assert await crud.select_model(1) is None
+
+    assert await crud.update_model_by_column({'score': 100}, allow_multiple=True, tenant_id=2) == 5
+    assert await crud.delete_model_by_column(allow_multiple=True, tenant_id__eq=2) == 5
+
+
+@pytest.mark.asyncio
+async def test_write_without_shard_key_is_rejected(sqlite_engine: Callable):
+    crud, _ = await sharded_crud(sqlite_engine)
+    with pytest.raises(ShardingError):
+        await crud.delete_model_by_column(name='row_1')
+    with pytest.raises(ShardingError):
+        await crud.bulk_create_models([{'id': 100, 'name': 'no_tenant'}])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ('sort_columns', 'sort_orders'),
+    [
+        ('id', 'asc'),
+        ('id', 'desc'),
+        (['score', 'id'], ['desc', 'asc']),
+        (['score', 'name'], ['asc', 'desc']),
+    ],
+)
+async def test_scatter_gather_sorted_page(sqlite_engine: Callable, sort_columns, sort_orders):
+    crud, engines = await sharded_crud(sqlite_engine)
+    # The same rows in one database give the expected global order
+    async with engines['shard_0'].begin() as conn:
+        await conn.execute(InsTenant.__table__.delete())
+        await conn.execute(InsTenant.__table__.insert(), ROWS)
+    async with crud.shards['shard_0']() as session:
+        expected = await CRUDPlus(InsTenant).select_models_order(session, sort_columns, sort_orders)
+    async with engines['shard_0'].begin() as conn:
+        await conn.execute(InsTenant.__table__.delete().where(InsTenant.tenant_id % 3 != 0))
+
+    merged = await crud.select_models_order(sort_columns, sort_orders)
+    assert [row.id for row in merged] == [row.id for row in expected]
+
+    page = await crud.select_models_order(sort_columns, sort_orders, limit=7, offset=5)
+    assert [row.id for row in page] == [row.id for row in expected][5:12]
+
+
+@pytest.mark.asyncio
+async def test_scatter_gather_count_and_exists(sqlite_engine: Callable):
+    crud, _ = await sharded_crud(sqlite_engine)
+    assert await crud.count() == len(ROWS)
+    assert await crud.count(name__startswith='row_1') == 11
+    assert await crud.count(tenant_id=4) == 5
+    assert await crud.exists(name='row_30')
+    assert not await crud.exists(name='missing')
+    assert not await crud.exists(tenant_id=1, name='row_2')
+
+
+@pytest.mark.asyncio
+async def test_shard_timeout(sqlite_engine: Callable):
+    crud, engines = await sharded_crud(sqlite_engine, timeout=0.2)
+    for name, engine in engines.items():
+        # Evaluated once per row, the 10 rows of shard_1 take 0.5 seconds
+        delay = 0.05 if name == 'shard_1' else 0
+
+        @event.listens_for(engine.sync_engine, 'connect')
+        def register_sleep(dbapi_connection, connection_record, delay=delay):
+            dbapi_connection.create_function('sleep', 0, lambda: time.sleep(delay) or 0)
+
+        await engine.dispose()
+
+    with pytest.raises(ShardTimeoutError):
+        await crud.count(func.sleep() == 0)
+    assert await crud.count(func.sleep() == 0, tenant_id=0) == 5
+
+
+def test_sort_key_null_placement():
+    rows = [InsTenant(id=i, tenant_id=0, name=f'row_{i}', score=score) for i, score in enumerate([2, None, 1])]
+    ordered = {
+        (order, nulls_largest): [
+            row.score for row in sorted(rows, key=_sort_key(InsTenant, 'score', order, nulls_largest))
+        ]
+        for order in ('asc', 'desc')
+        for nulls_largest in (False, True)
+    }
+    assert ordered == {
+        ('asc', False): [None, 1, 2],
+        ('desc', False): [2, 1, None],
+        ('asc', True): [1, 2, None],
+        ('desc', True): [None, 2, 1],
+    }
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_partial_failure(sqlite_engine: Callable):
+    crud, _ = await sharded_crud(sqlite_engine)
+    # Row 1 of tenant 1 already exists on shard_1
+    rows = [{'id': 100, 'tenant_id': 0, 'name': 'new_0'}, {'id': 1, 'tenant_id': 1, 'name': 'duplicate'}]
+
+    with pytest.raises(PartialShardWriteError) as exc_info:
+        await crud.bulk_create_models(rows)
+
+    assert exc_info.value.committed == {'shard_0': 1}
+    assert set(exc_info.value.errors) == {'shard_1'}
+    assert (await crud.select_model(100, shard_key=0)).name == 'new_0'
+    with pytest.raises(IntegrityError):
+        await crud.bulk_create_models(rows[1:])
@@ -0,0 +1,246 @@
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable
+
+import pytest
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+
+from sqlalchemy_crud_plus import CRUDPlus, IdentityCache, ReadCoalescer, ResultCache
+from sqlalchemy_crud_plus.errors import MultipleResultsError
+from sqlalchemy_crud_plus.sync import SyncCRUDPlus
+from tests.models.basic import Ins, InsVersioned
+from tests.models.relationship import RelPost, RelUser
+from tests.schemas.basic import CreateIns, CreateInsVersioned
+
+
+def sync_database(sqlite_engine: Callable, name: str = 'sync') -> sessionmaker[Session]:
+    """SQLite file database of every test model, with a sync sessionmaker."""
+    return sessionmaker(sqlite_engine(name, sync=True), expire_on_commit=False)
+
+
+def test_sync_crud(sqlite_engine: Callable):
+    crud = SyncCRUDPlus(Ins)
+    sessions = sync_database(sqlite_engine)
+    with sessions() as session:
+        created = crud.create_model(session, CreateIns(name='sync_1'), commit=True)
+        crud.bulk_create_models(
+            session, [{'name': f'sync_{i}', 'created_time': datetime.now()} for i in range(2, 6)], commit=True
+        )
+
+        assert crud.count(session) == 5
+        assert crud.exists(session, name='sync_3')
+        assert crud.select_model(session, created.id).name == 'sync_1'
+        assert [ins.name for ins in crud.select_models_order(session, 'id', 'desc', limit=2)] == ['sync_5', 'sync_4']
+        assert crud.update_model(session, created.id, {'name': 'renamed'}, commit=True) == 1
+        assert crud.select_model_by_column(session, name='renamed').id == created.id
+        assert crud.delete_model_by_column(session, allow_multiple=True, name__in=['sync_4', 'sync_5']) == 2
+        session.commit()
+        assert crud.count(session) == 3
+
+        with pytest.raises(MultipleResultsError):
+            crud.delete_model_by_column(session, name__like='sync_%')
+
+        assert isinstance(crud.select(name='renamed'), type(select(Ins)))
+        assert crud.model is Ins
+        assert crud.primary_key is crud.crud.primary_key
+
+
+def test_sync_crud_stream_and_relationships(sqlite_engine: Callable):
+    users, posts = SyncCRUDPlus(RelUser), SyncCRUDPlus(RelPost)
+    sessions = sync_database(sqlite_engine)
+    with sessions() as session:
+        users.bulk_create_models(session, [{'id': i, 'name': f'user_{i}'} for i in range(1, 4)])
+        posts.bulk_create_models(
+            session, [{'id': i, 'title': f'post_{i}', 'author_id': 1 + i % 2} for i in range(1, 6)], commit=True
+        )
+
+        groups = posts.aggregate_stream(session, metrics={'total': ('count', '*')}, group_by='author_id', yield_per=1)
+        assert {row['author_id']: row['total'] for row in groups} == {1: 2, 2: 3}
+
+        loaded = users.select_models(session, load_strategies={'posts': 'selectinload'})
+        assert sorted(len(user.posts) for user in loaded) == [0, 2, 3]
+        assert users.count(session, join_conditions=['posts']) == 2
+
+
+def test_sync_crud_version_and_cache(sqlite_engine: Callable):
+    cache = IdentityCache()
+    crud = SyncCRUDPlus(InsVersioned, identity_cache=cache)
+    sessions = sync_database(sqlite_engine)
+    with sessions() as session:
+        created = crud.create_model(session, CreateInsVersioned(name='versioned'), commit=True)
+        assert crud.select_model(session, created.id).version == 1
+    with sessions() as session:
+        assert crud.increment(session, created.id, {'counter': 5}, commit=True) == 1
+    with sessions() as session:
+        current = crud.select_model(session, created.id)
+        assert (current.counter, current.version) == (5, 2)
+        assert crud.update_model(session, created.id, {'name': 'versioned'}, current=current) == 0
+    assert cache.stats.invalidations > 0
+
+
+def test_sync_crud_in_thread_pool(sqlite_engine: Callable):
+    crud = SyncCRUDPlus(Ins)
+    sessions = sync_database(sqlite_engine)
+
+    def worker(n: int) -> int:
+        with sessions() as session:
+            crud.bulk_create_models(
+                session,
+                [{'name': f'worker_{n}_{i}', 'created_time': datetime.now()} for i in range(50)],
+                commit=True,
+            )
+            return crud.count(session, name__startswith=f'worker_{n}_')
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert list(pool.map(worker, range(8))) == [50] * 8
+
+
+def test_sync_crud_errors(db: AsyncSession):
+    with pytest.raises(ValueError):
+        SyncCRUDPlus(Ins, read_coalescer=ReadCoalescer())
+    assert not hasattr(SyncCRUDPlus, 'update_model_deferred')
+    assert SyncCRUDPlus.select_model.__doc__ == CRUDPlus.select_model.__doc__
+
+
+@pytest.mark.asyncio
+async def test_sync_async_bulk_create_match(sqlite_engine: Callable):
+    rows = [{'name': f'bulk_{i}', 'created_time': datetime(2024, 1, 1)} for i in range(500)]
+
+    crud = SyncCRUDPlus(Ins)
+    sessions = sync_database(sqlite_engine, 'sync_bulk')
+    with sessions() as session:
+        crud.bulk_create_models(session, rows, commit=True)
+        sync_rows = crud.select_rows(session, sort_columns='id')
+
+    async_crud = CRUDPlus(Ins)
+    async with AsyncSession(sqlite_engine('async_bulk')) as session:
+        await async_crud.bulk_create_models(session, rows, commit=True)
+        async_rows = await async_crud.select_rows(session, sort_columns='id')
+
+    assert len(sync_rows) == len(rows)
+    assert sync_rows == async_rows
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_sync_async_bulk_throughput_benchmark(sqlite_engine: Callable, benchmark_report: Callable):
+    rows, batches = 500, 10
+
+    def data(batch: int) -> list[dict]:
+        return [{'name': f'bench_{batch}_{i}', 'created_time': datetime.now()} for i in range(rows)]
+
+    crud = SyncCRUDPlus(Ins)
+    sessions = sync_database(sqlite_engine, 'sync_bench')
+    with sessions() as session:
+        start = time.perf_counter()
+        for batch in range(batches):
+            crud.bulk_create_models(session, data(batch), commit=True)
+        sync_count = crud.count(session)
+        sync_elapsed = time.perf_counter() - start
+
+    async_crud = CRUDPlus(Ins)
+    async with AsyncSession(sqlite_engine('async_bench')) as session:
+        start = time.perf_counter()
+        for batch in range(batches):
+            await async_crud.bulk_create_models(session, data(batch), commit=True)
+        async_count = await async_crud.count(session)
+        async_elapsed = time.perf_counter() - start
+
+    total = rows * batches
+    assert sync_count == async_count == total
+    benchmark_report(
+        f'bulk insert of {total} rows, rows/s: sync {total / sync_elapsed:.0f}, async {total / async_elapsed:.0f}'
+    )
+
+
+def test_sync_session_shim_is_unwrapped(sqlite_engine: Callable):
+    sessions = sync_database(sqlite_engine)
+    with sessions() as session:
+        crud = SyncCRUDPlus(Ins, identity_cache=IdentityCache())
+        crud.create_model(session, CreateIns(name='shim'), flush=True)
+        # The cache invalidation listener is registered on the sync session itself
+        assert isinstance(session, Session)
+        session.rollback()
+        assert crud.count(session) == 0
+
+
+def test_sync_crud_batch_interval(sqlite_engine: Callable):
+    crud = SyncCRUDPlus(Ins)
+    reported = []
+    sessions = sync_database(sqlite_engine)
+    with sessions() as session:
+        crud.bulk_create_models(
+            session, [{'name': f'batch_{i}', 'created_time': datetime.now()} for i in range(6)], commit=True
+        )
+
+        updated = crud.update_model_by_column(
+            session,
+            {'is_deleted': True},
+            allow_multiple=True,
+            batch_size=2,
+            batch_interval=0.01,
+            on_progress=lambda p: reported.append(p.batches),
+            name__startswith='batch_',
+        )
+        assert (updated, reported) == (6, [1, 2, 3])
+        assert (
+            crud.delete_model_by_column(
+                session,
+                allow_multiple=True,
+                logical_deletion=True,
+                deleted_at_column='updated_time',
+                deleted_at_factory=datetime(2020, 1, 1),
+                batch_size=4,
+                batch_interval=0.01,
+                id__le=4,
+            )
+            == 4
+        )
+
+        progress = crud.purge_deleted(
+            session, before=datetime(2021, 1, 1), deleted_at_column='updated_time', batch_size=1, batch_interval=0.01
+        )
+        assert progress.rows == progress.batches == 4
+        assert crud.count(session) == 2
+
+
+def test_sync_crud_invalidates_on_commit(sqlite_engine: Callable):
+    crud = SyncCRUDPlus(Ins, result_cache=ResultCache())
+    sessions = sync_database(sqlite_engine)
+    with sessions() as writer, sessions() as reader:
+        created = crud.create_model(writer, CreateIns(name='before'), commit=True)
+        crud.update_model(writer, created.id, {'name': 'after'})
+        # Cached by another session while the write is not committed
+        assert [ins.name for ins in crud.select_models(reader, id=created.id)] == ['before']
+        writer.commit()
+
+    with sessions() as session:
+        assert [ins.name for ins in crud.select_models(session, id=created.id)] == ['after']
+
+
+@pytest.mark.asyncio
+async def test_sync_crud_on_thread_with_event_loop(sqlite_engine: Callable):
+    # Sync calls from a coroutine block the loop, but must not wait on it
+    crud = SyncCRUDPlus(Ins, result_cache=ResultCache())
+    sessions = sync_database(sqlite_engine, 'sync_loop')
+    with sessions() as session:
+        crud.bulk_create_models(
+            session, [{'name': f'loop_{i}', 'created_time': datetime.now()} for i in range(4)], commit=True
+        )
+        assert [ins.name for ins in crud.select_models(session, name='loop_0')] == ['loop_0']
+
+        updated = crud.update_model_by_column(
+            session,
+            {'name': 'loop_0'},
+            allow_multiple=True,
+            batch_size=2,
+            batch_interval=0.01,
+            name__startswith='loop_',
+        )
+        assert updated == 4
+        assert len(crud.select_models(session, name='loop_0')) == 4
@@ -0,0 +1,192 @@
+import pytest
+
+from sqlalchemy import select
+from sqlalchemy.dialects import mysql, postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from sqlalchemy_crud_plus import CRUDPlus
+from sqlalchemy_crud_plus.errors import ModelColumnError
+from sqlalchemy_crud_plus.unit_of_work import UnitOfWork, upsert_stmt
+from tests.conftest import statements
+from tests.models.basic import InsVersioned
+from tests.models.relationship import RelPost, RelRole, RelUser, user_role
+
+
+def tables_of(executed: list[str]) -> list[tuple[str, str]]:
+    return [(sql.split()[0], sql.split()[2 if sql.startswith(('INSERT', 'DELETE')) else 1]) for sql in executed]
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_groups_statements(db: AsyncSession):
+    users, posts, roles = CRUDPlus(RelUser), CRUDPlus(RelPost), CRUDPlus(RelRole)
+    uow = UnitOfWork(db, chunk_size=2)
+    # Recorded children first, executed parents first
+    for i in range(3):
+        uow.create(posts, {'id': 6000 + i, 'title': f'uow_post_{i}', 'author_id': 6000 + i % 2})
+    for i in range(2):
+        uow.create(user_role, {'user_id': 6000 + i, 'role_id': 6000})
+    uow.create(users, {'id': 6000, 'name': 'uow_user_0'})
+    uow.create(users, {'id': 6001, 'name': 'uow_user_1'})
+    uow.create(roles, {'id': 6000, 'name': 'uow_role'})
+
+    with statements(db) as executed:
+        report = await uow.flush()
+
+    assert tables_of(executed) == [
+        ('INSERT', 'rel_role'),
+        ('INSERT', 'rel_user'),
+        ('INSERT', 'rel_post'),
+        ('INSERT', 'rel_post'),
+        ('INSERT', 'user_role'),
+    ]
+    assert report.statements == 5
+    assert report.rows == 8
+    assert report.elapsed > 0
+    assert uow.report is report
+    assert report.tables == ['rel_role', 'rel_user', 'rel_post', 'user_role']
+    assert await posts.count(db, author_id=6001) == 1
+    assert await users.count(db, id__in=[6000, 6001]) == 2
+
+    uow.update(posts, 6000, {'title': 'uow_first'})
+    uow.update(posts, 6000, {'category_id': None})
+    uow.update(posts, 6001, {'title': 'uow_second'})
+    uow.update(posts, 6000, {'title': 'uow_merged'})
+    uow.update(users, 6001, {'name': 'uow_renamed'})
+    uow.delete(user_role, (6001, 6000))
+    uow.delete(posts, 6002)
+    uow.delete(users, 6002)
+    with statements(db) as executed:
+        report = await uow.flush()
+
+    # One UPDATE per table and set of columns, deletes run children first
+    assert tables_of(executed) == [
+        ('UPDATE', 'rel_user'),
+        ('UPDATE', 'rel_post'),
+        ('UPDATE', 'rel_post'),
+        ('DELETE', 'user_role'),
+        ('DELETE', 'rel_post'),
+        ('DELETE', 'rel_user'),
+    ]
+    assert report.rows == 5
+    titles = await db.scalars(select(RelPost.title).where(RelPost.id.in_([6000, 6001, 6002])).order_by(RelPost.id))
+    assert titles.all() == ['uow_merged', 'uow_second']
+    assert (await users.select_model(db, 6001)).name == 'uow_renamed'
+    assert (await db.execute(select(user_role).where(user_role.c.user_id.in_([6000, 6001])))).all() == [(6000, 6000)]
+
+    uow.delete(user_role, (6000, 6000))
+    uow.delete(posts, 6000)
+    uow.delete(posts, 6001)
+    uow.delete(roles, 6000)
+    uow.delete(users, 6000)
+    uow.delete(users, 6001)
+    assert (await uow.flush()).statements == 4
+    assert await users.count(db, id__in=[6000, 6001]) == 0
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_upsert(db: AsyncSession):
+    roles = CRUDPlus(RelRole)
+    async with UnitOfWork(db) as uow:
+        uow.upsert(roles, {'id': 6100, 'name': 'uow_a'})
+        uow.upsert(user_role, {'user_id': 6100, 'role_id': 6100})
+    async with UnitOfWork(db) as uow:
+        uow.upsert(roles, {'id': 6100, 'name': 'uow_b'})
+        uow.upsert(roles, {'id': 6101, 'name': 'uow_c'})
+        uow.upsert(user_role, {'user_id': 6100, 'role_id': 6100})
+
+    assert uow.report is not None
+    assert uow.report.statements == 2
+    names = await db.scalars(select(RelRole.name).where(RelRole.id.in_([6100, 6101])).order_by(RelRole.id))
+    assert names.all() == ['uow_b', 'uow_c']
+    assert len((await db.execute(select(user_role).where(user_role.c.user_id == 6100))).all()) == 1
+
+    async with UnitOfWork(db) as uow:
+        uow.delete(user_role, (6100, 6100))
+        uow.delete(roles, 6100)
+        uow.delete(roles, 6101)
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_update_increments_version(db: AsyncSession):
+    crud = CRUDPlus(InsVersioned)
+    async with UnitOfWork(db) as uow:
+        uow.create(crud, {'id': 6300, 'name': 'uow_v1'})
+        uow.create(crud, {'id': 6301, 'name': 'uow_v2'})
+
+    with statements(db) as executed:
+        async with UnitOfWork(db) as uow:
+            uow.update(crud, 6300, {'name': 'uow_v1_updated', 'version': 7})
+            uow.update(crud, 6301, {'name': 'uow_v2_updated'})
+    assert len([sql for sql in executed if sql.startswith('UPDATE')]) == 1
+
+    rows = await db.execute(
+        select(InsVersioned.name, InsVersioned.version).where(InsVersioned.id.in_([6300, 6301])).order_by('id')
+    )
+    assert rows.all() == [('uow_v1_updated', 2), ('uow_v2_updated', 2)]
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_rollback(db: AsyncSession):
+    roles = CRUDPlus(RelRole)
+    uow = UnitOfWork(db)
+    uow.create(roles, {'id': 6200, 'name': 'uow_kept_out'})
+    uow.create(roles, {'id': 6200, 'name': 'uow_duplicate'})
+    with pytest.raises(Exception):
+        await uow.flush()
+    assert await roles.count(db, id=6200) == 0
+
+    # Recorded operations are kept after a failed flush, so it can be retried once the cause is fixed
+    with pytest.raises(Exception):
+        await uow.flush()
+    uow._rows.clear()
+    assert (await uow.flush()).statements == 0
+
+    with pytest.raises(RuntimeError):
+        async with UnitOfWork(db) as uow:
+            uow.create(roles, {'id': 6201, 'name': 'uow_discarded'})
+            raise RuntimeError
+    assert uow.report is None
+    assert await roles.count(db, id=6201) == 0
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_without_commit_keeps_caller_work(db: AsyncSession):
+    roles = CRUDPlus(RelRole)
+    await roles.bulk_create_models(db, [{'id': 6210, 'name': 'uow_caller'}], flush=True)
+
+    uow = UnitOfWork(db, commit=False)
+    uow.create(roles, {'id': 6211, 'name': 'uow_first'})
+    uow.create(roles, {'id': 6210, 'name': 'uow_duplicate'})
+    with pytest.raises(Exception):
+        await uow.flush()
+    # Only the savepoint of the flush is rolled back, the caller's transaction and row are kept
+    assert db.in_transaction()
+    assert [role.name for role in await roles.select_models(db, id__in=[6210, 6211])] == ['uow_caller']
+
+    await roles.delete_model(db, 6210, flush=True)
+    assert (await uow.flush()).rows == 2
+    await db.commit()
+    names = {role.id: role.name for role in await roles.select_models(db, id__in=[6210, 6211])}
+    assert names == {6210: 'uow_duplicate', 6211: 'uow_first'}
+    await roles.delete_model_by_column(db, allow_multiple=True, id__in=[6210, 6211], commit=True)
+
+
+def test_unit_of_work_errors(db: AsyncSession):
+    uow = UnitOfWork(db)
+    with pytest.raises(ModelColumnError):
+        uow.create(CRUDPlus(RelRole), {'missing': 1})
+    with pytest.raises(ValueError):
+        uow.delete(user_role, 1)
+    with pytest.raises(ValueError):
+        UnitOfWork(db, chunk_size=0)
+
+
+def test_upsert_stmt_dialects():
+    table = RelRole.__table__
+    key_columns = list(table.primary_key.columns)
+    pg = upsert_stmt(postgresql.dialect(), table, key_columns, ['name'])
+    assert 'ON CONFLICT (id) DO UPDATE' in str(pg.compile(dialect=postgresql.dialect()))
+    pg = upsert_stmt(postgresql.dialect(), table, key_columns, [])
+    assert 'DO NOTHING' in str(pg.compile(dialect=postgresql.dialect()))
+    my = upsert_stmt(mysql.dialect(), table, key_columns, ['name'])
+    assert 'ON DUPLICATE KEY UPDATE' in str(my.compile(dialect=mysql.dialect()))
@@ -1,10 +1,17 @@
+import asyncio
+
+from typing import Callable
+
 import pytest
+import pytest_asyncio
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from sqlalchemy_crud_plus import CRUDPlus
-from tests.models.basic import Ins, InsPks
-from tests.schemas.basic import CreateIns, CreateInsPks, UpdateIns
+from sqlalchemy_crud_plus.errors import ModelColumnError, StaleVersionError
+from tests.conftest import statements
+from tests.models.basic import Ins, InsPks, InsVersioned
+from tests.schemas.basic import CreateIns, CreateInsPks, CreateInsVersioned, UpdateIns
 
 
 @pytest.mark.asyncio
@@ -303,3 +310,312 @@ async def test_bulk_update_models_pk_mode_false_with_commit(db: AsyncSession, cr
     )
 
     assert result == 2
+
+
+@pytest.mark.asyncio
+async def test_update_model_by_column_in_batches(db: AsyncSession, sample_ins: list[Ins], crud_ins: CRUDPlus[Ins]):
+    ids = [item.id for item in sample_ins]
+    reported = []
+
+    count = await crud_ins.update_model_by_column(
+        db,
+        {'name': 'batched'},
+        allow_multiple=True,
+        batch_size=3,
+        on_progress=lambda progress: reported.append((progress.batches, progress.rows, progress.last_key)),
+        id__in=ids,
+    )
+
+    assert count == 10
+    assert reported == [(1, 3, ids[2]), (2, 6, ids[5]), (3, 9, ids[8]), (4, 10, ids[9])]
+    assert not db.in_transaction()
+    assert await crud_ins.count(db, id__in=ids, name='batched') == 10
+
+
+@pytest.mark.asyncio
+async def test_update_model_by_column_in_batches_resume(
+    db: AsyncSession, sample_ins: list[Ins], crud_ins: CRUDPlus[Ins]
+):
+    ids = [item.id for item in sample_ins]
+
+    count = await crud_ins.update_model_by_column(
+        db, {'name': 'resumed'}, allow_multiple=True, batch_size=4, resume_after=ids[5], id__in=ids
+    )
+
+    assert count == 4
+    assert await crud_ins.count(db, id__in=ids, name='resumed') == 4
+    assert await crud_ins.count(db, id__in=ids[:6], name='resumed') == 0
+
+
+@pytest.mark.asyncio
+async def test_update_model_by_column_in_batches_composite_key(db: AsyncSession, crud_ins_pks: CRUDPlus[InsPks]):
+    create_data = [
+        CreateInsPks(id=3000 + i // 2, name=f'batch_pks_{i}', sex=['male', 'female'][i % 2]) for i in range(5)
+    ]
+    async with db.begin():
+        await crud_ins_pks.create_models(db, create_data)
+
+    count = await crud_ins_pks.update_model_by_column(
+        db, {'is_deleted': True}, allow_multiple=True, batch_size=2, name__startswith='batch_pks_'
+    )
+
+    assert count == 5
+    assert await crud_ins_pks.count(db, name__startswith='batch_pks_', is_deleted=True) == 5
+
+
+@pytest.mark.asyncio
+async def test_update_model_by_column_in_batches_requires_allow_multiple(db: AsyncSession, crud_ins: CRUDPlus[Ins]):
+    with pytest.raises(ValueError):
+        await crud_ins.update_model_by_column(db, {'name': 'x'}, batch_size=10, name='item_1')
+
+
+@pytest_asyncio.fixture
+async def versioned_rows(db: AsyncSession) -> list[InsVersioned]:
+    rows = [InsVersioned(name=f'versioned_{i}') for i in range(3)]
+    db.add_all(rows)
+    await db.commit()
+    return rows
+
+
+def test_version_column_from_mapper():
+    assert CRUDPlus(InsVersioned).version_column == 'version'
+    assert CRUDPlus(Ins).version_column is None
+    with pytest.raises(ModelColumnError):
+        CRUDPlus(Ins, version_column='version')
+
+
+@pytest.mark.asyncio
+async def test_update_model_expected_version(db: AsyncSession, versioned_rows: list[InsVersioned]):
+    crud = CRUDPlus(InsVersioned)
+    row_id = versioned_rows[0].id
+
+    assert await crud.update_model(db, row_id, {'counter': 1}, expected_version=1, commit=True) == 1
+    assert await crud.update_model(db, row_id, {'counter': 2}, expected_version=1, commit=True) == 0
+    assert await crud.update_model(db, row_id, {'counter': 3, 'version': 2}, commit=True) == 1
+
+    row = await crud.select_model(db, row_id)
+    await db.refresh(row)
+    assert (row.counter, row.version) == (3, 3)
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_models_version_conflict(db: AsyncSession, versioned_rows: list[InsVersioned]):
+    crud = CRUDPlus(InsVersioned)
+    first, second, third = (row.id for row in versioned_rows)
+
+    with pytest.raises(StaleVersionError) as exc_info:
+        await crud.bulk_update_models(
+            db,
+            [
+                {'id': first, 'version': 1, 'name': 'won'},
+                {'id': second, 'version': 5, 'name': 'lost'},
+                {'id': third, 'version': 1, 'name': 'won'},
+            ],
+        )
+    await db.commit()
+
+    assert exc_info.value.conflicts == [second]
+    assert await crud.count(db, id__in=[first, third], name='won', version=2) == 2
+    assert await crud.count(db, id=second, version=1) == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_models_versioned_executemany(db: AsyncSession, versioned_rows: list[InsVersioned]):
+    crud = CRUDPlus(InsVersioned)
+    first, second, third = (row.id for row in versioned_rows)
+
+    with statements(db) as executed:
+        await crud.bulk_update_models(
+            db,
+            [
+                {'id': first, 'name': 'unchecked'},
+                {'id': second, 'name': 'unchecked'},
+                {'id': third, 'version': 1, 'name': 'checked'},
+            ],
+            commit=True,
+        )
+
+    # The rows without an expected version share one executemany
+    assert len([sql for sql in executed if sql.startswith('UPDATE')]) == 2
+    assert await crud.count(db, id__in=[first, second], name='unchecked', version=2) == 2
+    assert await crud.count(db, id=third, name='checked', version=2) == 1
+
+
+@pytest.mark.asyncio
+async def test_version_checked_updates_under_contention(sqlite_engine: Callable):
+    session_factory = async_sessionmaker(sqlite_engine('versioned'), expire_on_commit=False)
+    crud = CRUDPlus(InsVersioned)
+    async with session_factory() as session:
+        row_id = (await crud.create_model(session, CreateInsVersioned(name='contended'), commit=True)).id
+    conflicts = 0
+
+    async def increment(times: int) -> None:
+        nonlocal conflicts
+        async with session_factory() as session:
+            done = 0
+            while done < times:
+                row = await crud.select_snapshot(session, row_id)
+                await session.commit()
+                await asyncio.sleep(0)
+                updated = await crud.update_model(
+                    session, row_id, {'counter': row['counter'] + 1}, expected_version=row['version'], commit=True
+                )
+                if updated:
+                    done += 1
+                else:
+                    conflicts += 1
+
+    await asyncio.gather(*[increment(5) for _ in range(20)])
+
+    async with session_factory() as session:
+        row = await crud.select_snapshot(session, row_id)
+
+    assert row['counter'] == 100
+    assert row['version'] == 101
+    assert conflicts > 0
+
+
+@pytest.mark.asyncio
+async def test_increment(db: AsyncSession, versioned_rows: list[InsVersioned]):
+    crud = CRUDPlus(InsVersioned)
+    row_id = versioned_rows[0].id
+
+    assert await crud.increment(db, row_id, {'counter': 5}) == 1
+    assert await crud.increment(db, row_id, {'counter': -2}, returning=True, commit=True) == {'counter': 3}
+    assert await crud.increment(db, -1, {'counter': 1}, returning=True) is None
+    assert await crud.increment(db, -1, {'counter': 1}) == 0
+    assert await crud.count(db, id=row_id, counter=3, version=3) == 1
+
+    with pytest.raises(ModelColumnError):
+        await crud.increment(db, row_id, {'missing': 1})
+
+
+@pytest.mark.asyncio
+async def test_increment_many(db: AsyncSession, versioned_rows: list[InsVersioned], monkeypatch):
+    crud = CRUDPlus(InsVersioned)
+    first, second, third = (row.id for row in versioned_rows)
+
+    assert await crud.increment_many(db, {first: {'counter': 1}, second: {'counter': 1}}) == 2
+    new_values = await crud.increment_many(
+        db, {first: {'counter': 10}, second: {'counter': -1}, third: {'counter': 2}}, returning=True, batch_size=2
+    )
+    assert new_values == {first: {'counter': 11}, second: {'counter': 0}, third: {'counter': 2}}
+
+    # Databases without UPDATE ... RETURNING read the new values back in the same transaction
+    monkeypatch.setattr(db.get_bind().dialect, 'update_returning', False)
+    assert await crud.increment_many(db, {third: {'counter': 3}}, returning=True, commit=True) == {
+        third: {'counter': 5}
+    }
+    assert await crud.increment_many(db, {}) == 0
+
+    with pytest.raises(ValueError):
+        await crud.increment_many(db, {first: {'counter': 1}}, batch_size=0)
+
+
+def test_increment_delta_case():
+    crud = CRUDPlus(InsVersioned)
+    delta = crud._increment_delta([1, 2], {1: {'counter': 1}, 2: {'counter': 3}}, 'counter')
+    assert str(delta.compile(compile_kwargs={'literal_binds': True})) == (
+        'CASE ins_versioned.id WHEN 1 THEN 1 WHEN 2 THEN 3 ELSE 0 END'
+    )
+    assert crud._increment_delta([1, 2], {1: {'counter': 2}, 2: {'counter': 2}}, 'counter') == 2
+
+    delta = CRUDPlus(InsPks)._increment_delta([(1, 'men'), (2, 'men')], {(1, 'men'): {'id': 1}, (2, 'men'): {}}, 'id')
+    assert 'CASE WHEN (ins_pks.id = 1 AND ins_pks.sex =' in str(delta.compile(compile_kwargs={'literal_binds': True}))
+
+
+@pytest.mark.asyncio
+async def test_increment_under_contention(sqlite_engine: Callable):
+    session_factory = async_sessionmaker(sqlite_engine('counters'), expire_on_commit=False)
+    crud = CRUDPlus(InsVersioned)
+    async with session_factory() as session:
+        row_id = (await crud.create_model(session, CreateInsVersioned(name='contended'), commit=True)).id
+
+    async def increment(times: int) -> None:
+        async with session_factory() as session:
+            for _ in range(times):
+                await crud.increment(session, row_id, {'counter': 1}, commit=True)
+                await asyncio.sleep(0)
+
+    await asyncio.gather(*[increment(5) for _ in range(20)])
+
+    async with session_factory() as session:
+        row = await crud.select_snapshot(session, row_id)
+
+    assert row['counter'] == 100
+    assert row['version'] == 101
+
+
+@pytest.mark.asyncio
+async def test_update_model_diff(db: AsyncSession, versioned_rows: list[InsVersioned]):
+    crud = CRUDPlus(InsVersioned)
+    row = versioned_rows[0]
+
+    with statements(db) as executed:
+        assert await crud.update_model(db, row.id, {'name': row.name, 'counter': 0}, current=row) == 0
+    assert executed == []
+
+    with statements(db) as executed:
+        assert await crud.update_model(db, row.id, {'name': row.name, 'counter': 7}, current=row, commit=True) == 1
+    assert len(executed) == 1
+    assert 'name' not in executed[0].split('WHERE')[0]
+
+    snapshot = await crud.select_snapshot(db, row.id)
+    assert await crud.update_model(db, row.id, {'counter': 7, 'version': snapshot['version']}, current=snapshot) == 0
+    assert await crud.update_model(db, row.id, {'counter': 8, 'version': 1}, current=snapshot) == 0
+    assert await crud.update_model(db, row.id, {'counter': 8, 'version': 2}, current=snapshot, commit=True) == 1
+    assert await crud.count(db, id=row.id, counter=8, version=3) == 1
+    assert (crud.diff_stats.compared, crud.diff_stats.skipped) == (5, 2)
+    assert crud.diff_stats.skip_rate == 0.4
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_models_diff(db: AsyncSession, crud_ins: CRUDPlus[Ins]):
+    rows = [await crud_ins.create_model(db, CreateIns(name=f'diff_{i}')) for i in range(3)]
+    await db.commit()
+    snapshots = [{'id': row.id, 'name': row.name, 'is_deleted': row.is_deleted} for row in rows]
+
+    with statements(db) as executed:
+        updated = await crud_ins.bulk_update_models(
+            db,
+            [
+                {'id': rows[0].id, 'name': 'diff_0'},
+                {'id': rows[1].id, 'name': 'diff_changed', 'is_deleted': False},
+                {'id': rows[2].id, 'is_deleted': True},
+            ],
+            current=snapshots,
+            commit=True,
+        )
+    assert updated == 2
+    assert len([sql for sql in executed if sql.startswith('UPDATE')]) == 2
+    assert crud_ins.diff_stats.skipped == 1
+    assert await crud_ins.count(db, id__in=[row.id for row in rows], name='diff_changed') == 1
+    assert await crud_ins.count(db, id=rows[2].id, is_deleted=True) == 1
+
+    assert await crud_ins.bulk_update_models(db, [{'id': rows[0].id, 'name': 'diff_0'}], current=snapshots) == 0
+    with pytest.raises(ValueError):
+        await crud_ins.bulk_update_models(db, [{'name': 'x'}], pk_mode=False, current=snapshots, name='diff_0')
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_models_diff_missing_key(db: AsyncSession, crud_ins: CRUDPlus[Ins]):
+    rows = [await crud_ins.create_model(db, CreateIns(name=f'diff_key_{i}')) for i in range(2)]
+    await db.commit()
+    ids = [row.id for row in rows]
+
+    with pytest.raises(ValueError, match='Primary key id is missing from the update data'):
+        await crud_ins.bulk_update_models(db, [{'name': 'x'}], current=rows)
+    with pytest.raises(ValueError, match='Primary key id is missing from the current row snapshot'):
+        await crud_ins.bulk_update_models(db, [{'id': ids[0], 'name': 'x'}], current=[{'name': 'diff_key_0'}])
+    with pytest.raises(ValueError, match='has no identity'):
+        await crud_ins.bulk_update_models(db, [{'id': ids[0], 'name': 'x'}], current=[Ins(name='diff_key_0')])
+
+    db.expire(rows[0])
+    updated = await crud_ins.bulk_update_models(
+        db,
+        [{'id': ids[0], 'name': 'diff_key_expired'}, {'id': ids[1], 'name': 'diff_key_1'}],
+        current=rows,
+        commit=True,
+    )
+    assert updated == 1
+    assert await crud_ins.count(db, id=ids[0], name='diff_key_expired') == 1
@@ -10,7 +10,8 @@ from sqlalchemy_crud_plus.errors import (
     ModelColumnError,
     SelectOperatorError,
 )
-from sqlalchemy_crud_plus.types import JoinConfig
+from sqlalchemy_crud_plus.loading import LoadStrategyAdvisor
+from sqlalchemy_crud_plus.types import JoinConfig, JoinPlan, LoadPlan
 from sqlalchemy_crud_plus.utils import (
     _create_and_filters,
     _create_arithmetic_filters,
@@ -18,6 +19,8 @@ from sqlalchemy_crud_plus.utils import (
     apply_join_conditions,
     apply_sorting,
     build_load_strategies,
+    compile_join_plan,
+    compile_load_plan,
     get_column,
     get_sqlalchemy_filter,
     parse_filters,
@@ -250,6 +253,36 @@ class TestBuildLoadStrategies:
             strategies = build_load_strategies(RelUser, {'posts': strategy_type})
             assert len(strategies) == 1
 
+    def test_auto_strategy(self):
+        advisor = LoadStrategyAdvisor(min_parents=10, subquery_fanout=5)
+        assert advisor.choose(RelPost, 'author') == 'joinedload'
+        assert advisor.choose(RelUser, 'profile') == 'joinedload'
+        assert advisor.choose(RelUser, 'posts') == 'selectinload'
+
+        stmt = select(RelPost).options(*build_load_strategies(RelPost, {'author': 'auto'}, advisor))
+        assert 'JOIN rel_user' in str(stmt)
+
+        advisor.record(RelUser, 'posts', parents=5, children=100)
+        assert advisor.fanout(RelUser, 'posts') is None
+        advisor.record(RelUser, 'posts', parents=5, children=0)
+        assert advisor.fanout(RelUser, 'posts') == 10
+        assert advisor.choose(RelUser, 'posts') == 'subqueryload'
+
+    def test_nested_paths_share_prefix(self):
+        strategies = build_load_strategies(
+            RelUser, {'posts': 'selectinload', 'posts.category': 'joinedload', 'roles': 'selectinload'}
+        )
+        assert len(strategies) == 2
+        assert build_load_strategies(RelUser, ['posts.category', 'posts.author'])[0] is not None
+
+    def test_nested_paths_cached(self):
+        spec = {'posts.category.parent': 'joinedload'}
+        assert build_load_strategies(RelUser, spec)[0] is build_load_strategies(RelUser, dict(spec))[0]
+
+    def test_auto_strategy_invalid_column(self):
+        with pytest.raises(ModelColumnError):
+            build_load_strategies(RelUser, {'name': 'auto'})
+
     def test_invalid_strategy(self):
         with pytest.raises(LoadingStrategyError):
             build_load_strategies(RelUser, {'posts': 'invalid_strategy'})
@@ -433,6 +466,56 @@ class TestJoinConfig:
         assert join_config.join_type in ['inner', 'left', 'full']
 
 
+class TestPlans:
+    def test_join_plan_cached(self):
+        plan = compile_join_plan(RelUser, {'posts': 'left', 'profile': 'inner'})
+        assert isinstance(plan, JoinPlan)
+        assert compile_join_plan(RelUser, {'posts': 'left', 'profile': 'inner'}) is plan
+        assert compile_join_plan(RelUser, plan) is plan
+        assert [step.join_type for step in plan.steps] == ['left', 'inner']
+        assert {plan: 1}[plan] == 1
+        assert str(plan.apply(select(RelUser))) == str(
+            apply_join_conditions(RelUser, select(RelUser), {'posts': 'left', 'profile': 'inner'})
+        )
+
+    def test_join_plan_fill_models(self):
+        config = JoinConfig(model=RelPost, join_on=RelUser.id == RelPost.author_id, fill_result=True)
+        plan = compile_join_plan(RelUser, ['profile', config, config])
+        assert plan.fill_models == (RelPost,)
+        assert len(plan.steps) == 3
+        assert len(plan.apply(select(RelUser)).selected_columns) == len(select(RelUser, RelPost).selected_columns)
+
+    def test_join_plan_validated(self):
+        with pytest.raises(ModelColumnError):
+            compile_join_plan(RelUser, ['name'])
+        with pytest.raises(JoinConditionError):
+            compile_join_plan(RelUser, {'posts': 'right'})
+        with pytest.raises(ValueError):
+            compile_join_plan(RelPost, compile_join_plan(RelUser, ['posts']))
+
+    def test_load_plan_cached(self):
+        plan = compile_load_plan(RelUser, {'posts': 'joinedload', 'posts.category': 'selectinload'})
+        assert isinstance(plan, LoadPlan)
+        assert compile_load_plan(RelUser, {'posts': 'joinedload', 'posts.category': 'selectinload'}) is plan
+        assert plan.auto == ()
+        assert len(plan.options) == 1
+        assert build_load_strategies(RelUser, plan) == list(plan.options)
+
+    def test_load_plan_auto(self):
+        plan = compile_load_plan(RelUser, {'posts': 'auto', 'profile': 'joinedload'})
+        assert plan.auto == ('posts',)
+        assert plan.options == ()
+        assert len(build_load_strategies(RelUser, plan, LoadStrategyAdvisor())) == 2
+
+    def test_load_plan_validated(self):
+        with pytest.raises(ModelColumnError):
+            compile_load_plan(RelUser, ['missing.posts'])
+        with pytest.raises(LoadingStrategyError):
+            compile_load_plan(RelUser, {'posts': 'invalid'})
+        with pytest.raises(ValueError):
+            compile_load_plan(RelPost, compile_load_plan(RelUser, ['posts']))
+
+
 class TestPrivateFunctions:
     def test_create_or_filters(self):
         column = get_column(Ins, 'name')
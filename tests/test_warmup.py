@@ -0,0 +1,107 @@
+from typing import Callable
+
+import pytest
+
+from sqlalchemy import event
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from sqlalchemy_crud_plus import CountCache, CRUDPlus
+from sqlalchemy_crud_plus import warmup as warmup_module
+from sqlalchemy_crud_plus.warmup import CRUDRegistry, read_templates, warmup
+from tests.models.basic import Ins, InsPks, InsVersioned
+
+
+def cache_hits(sqlite_engine: Callable) -> tuple[AsyncEngine, list[tuple[str, bool]]]:
+    """SQLite file database, and the compiled cache outcome of each executed statement."""
+    engine = sqlite_engine('warmup')
+    executed = []
+
+    @event.listens_for(engine.sync_engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement.split()[0], context.cache_hit == CacheStats.CACHE_HIT))
+
+    return engine, executed
+
+
+def test_registry():
+    registry = CRUDRegistry()
+    crud = registry.register(CRUDPlus(Ins))
+    assert Ins in registry
+    assert registry.get(Ins) is crud
+    replaced = registry.register(CRUDPlus(Ins))
+    assert list(registry) == [replaced]
+    registry.unregister(Ins)
+    assert len(registry) == 0
+    assert registry.get(Ins) is None
+
+
+@pytest.mark.asyncio
+async def test_warmup_fills_compiled_cache(sqlite_engine: Callable):
+    registry = CRUDRegistry()
+    ins, pks = registry.register(CRUDPlus(Ins)), registry.register(CRUDPlus(InsPks))
+    engine, executed = cache_hits(sqlite_engine)
+    report = await warmup(engine, registry)
+    assert executed == []
+    assert (report.models, report.statements, report.prepared) == (2, 6, 0)
+    assert set(report.timings) == {f'{model}.{name}' for model in ('Ins', 'InsPks') for name in read_templates(ins)}
+
+    async with AsyncSession(engine) as session:
+        await ins.select_model(session, 1)
+        await ins.count(session)
+        await ins.exists(session, id=1)
+        await pks.select_model(session, (1, 'men'))
+        await ins.count(session, name='x')
+    assert [hit for _, hit in executed] == [True, True, True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_warmup_without_compile_internals(sqlite_engine: Callable, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(warmup_module, '_cache_compiler', lambda engine: None)
+    registry = CRUDRegistry()
+    crud = registry.register(CRUDPlus(Ins))
+    engine, executed = cache_hits(sqlite_engine)
+    report = await warmup(engine, registry)
+    # Each read is executed twice, the second execution finds the statement compiled
+    assert [hit for _, hit in executed] == [False, True] * 3
+    assert (report.models, report.statements, report.prepared) == (1, 3, 3)
+    executed.clear()
+
+    async with AsyncSession(engine) as session:
+        await crud.select_model(session, 1)
+        await crud.count(session)
+        await crud.exists(session, id=1)
+    assert [hit for _, hit in executed] == [True, True, True]
+
+    report = await warmup(engine, registry, prepare=True)
+    assert (report.statements, report.prepared) == (6, 3)
+
+
+@pytest.mark.asyncio
+async def test_warmup_prepare(sqlite_engine: Callable):
+    registry = CRUDRegistry()
+    count_cache = CountCache()
+    crud = registry.register(CRUDPlus(InsVersioned, count_cache=count_cache))
+    engine, executed = cache_hits(sqlite_engine)
+    report = await warmup(engine, registry, prepare=True)
+    assert (report.statements, report.prepared) == (6, 3)
+    assert 'InsVersioned.bulk_create_models' in report.timings
+    # The writes are compiled without reaching the database or invalidating caches
+    assert [statement for statement, _ in executed] == ['SELECT'] * 3
+    assert count_cache.stats.invalidations == 0
+    executed.clear()
+
+    async with AsyncSession(engine) as session:
+        assert await crud.count(session) == 0
+        await crud.bulk_create_models(session, [{'id': 1, 'name': 'warm', 'counter': 0, 'version': 1}])
+        await crud.update_model(session, 1, {'name': 'warmer', 'counter': 1})
+        await crud.delete_model(session, 1)
+        await session.commit()
+    assert executed == [('SELECT', True), ('INSERT', True), ('UPDATE', True), ('DELETE', True)]
+
+
+def test_read_templates_match_crud_statements():
+    crud = CRUDPlus(Ins)
+    templates = read_templates(crud)
+    assert templates['count'].compare(crud._count_stmt([]))
+    assert str(templates['select_model']) == str(templates['exists'].limit(None))
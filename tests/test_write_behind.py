@@ -0,0 +1,163 @@
+import asyncio
+
+from typing import Callable
+
+import pytest
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from sqlalchemy_crud_plus import CRUDPlus
+from sqlalchemy_crud_plus.cache import IdentityCache
+from sqlalchemy_crud_plus.errors import ModelColumnError
+from sqlalchemy_crud_plus.write_behind import WriteBehindBuffer
+from tests.models.basic import InsTenant, InsVersioned
+
+WINDOW = 0.05
+
+
+def counters(sqlite_engine: Callable) -> tuple[async_sessionmaker, list[str]]:
+    """SQLite file database with three counter rows, and a list of the executed UPDATE statements."""
+    rows = [{'id': i, 'tenant_id': 0, 'name': f'hot_{i}', 'score': 0} for i in range(1, 4)]
+    engine = sqlite_engine('counters', rows={InsTenant: rows})
+    executed = []
+
+    @event.listens_for(engine.sync_engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE'):
+            executed.append(statement)
+
+    return async_sessionmaker(engine, expire_on_commit=False), executed
+
+
+async def scores(sessions: async_sessionmaker) -> dict[int, tuple[str, int]]:
+    async with sessions() as session:
+        rows = await session.execute(select(InsTenant.id, InsTenant.name, InsTenant.score).order_by(InsTenant.id))
+        return {row.id: (row.name, row.score) for row in rows}
+
+
+@pytest.mark.asyncio
+async def test_write_behind_coalesces_updates(sqlite_engine: Callable):
+    sessions, executed = counters(sqlite_engine)
+    buffer = WriteBehindBuffer(sessions, window=WINDOW, increment_columns=['score'])
+    crud = CRUDPlus(InsTenant, write_behind=buffer)
+    for i in range(100):
+        await crud.update_model_deferred(1 + i % 2, {'score': 1}, name=f'seen_{i}')
+    await crud.update_model_deferred(3, {'score': 5})
+    assert len(buffer) == 3
+    assert executed == []
+
+    await asyncio.sleep(WINDOW * 4)
+    assert len(buffer) == 0
+    assert await scores(sessions) == {1: ('seen_98', 50), 2: ('seen_99', 50), 3: ('hot_3', 5)}
+    # One executemany per set of columns
+    assert len(executed) == 2
+    assert all('score=(ins_tenant.score + ?)' in sql for sql in executed)
+    assert buffer.stats.updates == 101
+    assert buffer.stats.rows == 3
+    assert buffer.stats.flushes == 1
+    assert buffer.stats.coalescing_ratio == pytest.approx(101 / 3)
+    assert buffer.stats.flush_latency > 0
+
+    await crud.update_model_deferred(1, {'score': 2})
+    await buffer.close()
+    assert (await scores(sessions))[1] == ('seen_98', 52)
+    with pytest.raises(RuntimeError):
+        await crud.update_model_deferred(1, {'score': 1})
+
+
+@pytest.mark.asyncio
+async def test_write_behind_increments_version(sqlite_engine: Callable):
+    rows = [{'id': i, 'name': f'versioned_{i}', 'counter': 0, 'version': 1} for i in range(1, 3)]
+    sessions = async_sessionmaker(sqlite_engine('versioned', rows={InsVersioned: rows}), expire_on_commit=False)
+    buffer = WriteBehindBuffer(sessions, increment_columns=['counter'])
+    crud = CRUDPlus(InsVersioned, write_behind=buffer)
+    for _ in range(3):
+        await crud.update_model_deferred(1, {'counter': 1})
+    await crud.update_model_deferred(2, {'name': 'renamed', 'version': 9})
+    await buffer.close()
+
+    async with sessions() as session:
+        result = await session.execute(
+            select(InsVersioned.name, InsVersioned.counter, InsVersioned.version).order_by(InsVersioned.id)
+        )
+        # The merged updates of a row are one write, and one version
+        assert result.all() == [('versioned_1', 3, 2), ('renamed', 0, 2)]
+
+
+@pytest.mark.asyncio
+async def test_write_behind_size_threshold(sqlite_engine: Callable):
+    sessions, executed = counters(sqlite_engine)
+    async with WriteBehindBuffer(sessions, window=10, max_rows=2, increment_columns=['score']) as buffer:
+        crud = CRUDPlus(InsTenant, write_behind=buffer)
+        await crud.update_model_deferred(1, {'score': 1})
+        await crud.update_model_deferred(2, {'score': 1})
+        for _ in range(10):
+            if not len(buffer):
+                break
+            await asyncio.sleep(0.01)
+        assert buffer.stats.rows == 2
+        # Drained on close, long before the window ends
+        await crud.update_model_deferred(3, {'score': 7})
+
+    assert buffer.stats.flushes == 2
+    assert await scores(sessions) == {1: ('hot_1', 1), 2: ('hot_2', 1), 3: ('hot_3', 7)}
+
+
+@pytest.mark.asyncio
+async def test_write_behind_invalidates_caches(sqlite_engine: Callable):
+    sessions, _ = counters(sqlite_engine)
+    cache = IdentityCache()
+    buffer = WriteBehindBuffer(sessions, window=10)
+    crud = CRUDPlus(InsTenant, identity_cache=cache, write_behind=buffer)
+    async with sessions() as session:
+        assert (await crud.select_model(session, 1)).name == 'hot_1'
+    await crud.update_model_deferred(1, {'name': 'renamed'})
+    async with sessions() as session:
+        assert (await crud.select_model(session, 1)).name == 'hot_1'
+    await buffer.close()
+    async with sessions() as session:
+        assert (await crud.select_model(session, 1)).name == 'renamed'
+
+
+@pytest.mark.asyncio
+async def test_write_behind_keeps_failed_rows(sqlite_engine: Callable):
+    sessions, _ = counters(sqlite_engine)
+    buffer = WriteBehindBuffer(sessions, window=10, increment_columns=['score'])
+    crud = CRUDPlus(InsTenant, write_behind=buffer)
+    await crud.update_model_deferred(1, {'score': 1, 'name': 'first'})
+
+    async with sessions.kw['bind'].connect() as conn:
+        await conn.exec_driver_sql('ALTER TABLE ins_tenant RENAME TO ins_tenant_moved')
+        await conn.commit()
+        with pytest.raises(Exception):
+            await buffer.flush()
+        assert buffer.stats.failures == 1
+        await crud.update_model_deferred(1, {'score': 2, 'name': 'second'})
+        await conn.exec_driver_sql('ALTER TABLE ins_tenant_moved RENAME TO ins_tenant')
+        await conn.commit()
+
+    assert await buffer.flush() == 1
+    assert (await scores(sessions))[1] == ('second', 3)
+    await buffer.close()
+
+
+@pytest.mark.asyncio
+async def test_write_behind_errors(db: AsyncSession):
+    buffer = WriteBehindBuffer(db.bind, increment_columns=['score'])
+    with pytest.raises(ValueError):
+        await CRUDPlus(InsTenant).update_model_deferred(1, {'score': 1})
+    with pytest.raises(ValueError):
+        buffer.add(1, {'score': 1})
+    crud = CRUDPlus(InsTenant, write_behind=buffer)
+    with pytest.raises(ModelColumnError):
+        await crud.update_model_deferred(1, {'missing': 1})
+    with pytest.raises(ValueError):
+        CRUDPlus(InsTenant, write_behind=buffer)
+    with pytest.raises(ModelColumnError):
+        CRUDPlus(InsTenant, write_behind=WriteBehindBuffer(db.bind, increment_columns=['missing']))
+    with pytest.raises(ValueError):
+        WriteBehindBuffer(db.bind, window=0)
+    with pytest.raises(ValueError):
+        WriteBehindBuffer(db.bind, max_rows=0)
+    assert crud.write_behind is buffer